@@ -0,0 +1,194 @@
+"""Benchmark JSON serialization cost and its share of request time.
+
+Compares the previous serialization paths with the current ones:
+
+- response: ``model_dump(mode="json")`` + stdlib ``json.dumps`` (Starlette
+  ``JSONResponse``, FastAPI's response_model path before the Rust fast path)
+  versus ``FastJSONResponse``
+- log line: ``structlog.processors.JSONRenderer()`` (stdlib) versus
+  ``JSONRenderer(serializer=render_log_json)``
+
+Then measures ``POST /api/v1/referral/tests/match`` end to end (catalog
+stubbed, INFO JSON logs written to a null stream) with each pipeline, and
+reports the serialization share of request time.
+
+Usage:
+    python benchmarks/json_serialization.py [--requests 2000] [--tests 10]
+"""
+import argparse
+import asyncio
+import io
+import json
+import statistics
+import sys
+import time
+import timeit
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+import httpx
+import structlog
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+from app.core.logging import setup_logging
+from app.core.serialization import JSON_BACKEND, FastJSONResponse, render_log_json
+from app.dependencies import AuthContext, get_current_user
+from app.middleware.logging import LoggingMiddleware
+from app.middleware.request_id import RequestIDMiddleware
+from app.routers import referral
+from app.schemas.referral import ConfidenceScores, MatchedTest, ReferralData, ScanResponse
+from app.schemas.test_match import TestMatchResponse
+from app.services.test_matcher import TestMatcherService
+
+# INFO lines logged by one /tests/match request with the stubbed matcher
+LOG_LINES_PER_REQUEST = 4
+
+LOG_EVENT = {
+    "method": "POST",
+    "path": "/api/v1/referral/tests/match",
+    "status_code": 200,
+    "duration_ms": 3.21,
+    "phase_ms": {"catalog_match": 1.52, "serialize": 0.04},
+    "event": "Request completed",
+    "request_id": "7f80a553-84bb-4f4d-ad7e-a941bef5182f",
+    "service": "ai-referral-service",
+    "environment": "production",
+    "level": "info",
+    "logger": "app.middleware.logging",
+    "timestamp": "2026-01-12T10:30:00.123456Z",
+}
+
+
+def legacy_render(self: Any, content: Any) -> bytes:
+    """Previous response path: Python dict, then stdlib json."""
+    if isinstance(content, BaseModel):
+        content = content.model_dump(mode="json", by_alias=True)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def matched(count: int) -> list[MatchedTest]:
+    return [
+        MatchedTest(original=f"Test {i}", matched="Full Blood Count", test_id=f"FBC-{i}", confidence=0.93)
+        for i in range(count)
+    ]
+
+
+async def stub_match_tests(self: TestMatcherService, test_names: list[str]) -> list[MatchedTest]:
+    return [MatchedTest(original=n, matched=n, test_id=n, confidence=1.0) for n in test_names]
+
+
+def per_call_us(func: Callable[[], Any], number: int = 5000) -> float:
+    """Return the best-of-5 cost of one call in microseconds."""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1_000_000
+
+
+def configure_renderer(fast: bool) -> None:
+    """Point the JSON log pipeline at the stdlib or fast renderer."""
+    config = structlog.get_config()
+    processors = list(config["processors"])
+    processors[-1] = (
+        structlog.processors.JSONRenderer(serializer=render_log_json)
+        if fast
+        else structlog.processors.JSONRenderer()
+    )
+    structlog.configure(processors=processors)
+
+
+async def request_us(app: FastAPI, requests: int, tests: int) -> float:
+    """Return the median /tests/match latency in microseconds."""
+    body = {"tests": [f"Test {i}" for i in range(tests)]}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        samples = []
+        for i in range(requests + 200):
+            start = time.perf_counter()
+            response = await client.post("/api/v1/referral/tests/match", json=body)
+            if i >= 200:
+                samples.append((time.perf_counter() - start) * 1_000_000)
+            assert response.status_code == 200, response.text
+    return statistics.median(samples)
+
+
+async def main(requests: int, tests: int) -> None:
+    """Run the benchmark and print summary tables.
+
+    Args:
+        requests: Number of timed requests per pipeline
+        tests: Number of matched tests in each response
+    """
+    print(f"JSON backend: {JSON_BACKEND}\n")
+
+    scan = ScanResponse(
+        success=True,
+        data=ReferralData(
+            patient={"firstName": "Jane", "lastName": "Citizen"},
+            doctor={"name": "Dr Smith", "providerNumber": "1234567A"},
+            tests=[f"Test {i}" for i in range(tests)],
+            matched_tests=matched(tests),
+            confidence=ConfidenceScores(patient=0.9, doctor=0.8, tests=0.85, overall=0.85),
+        ),
+        processing_time_ms=2500,
+        timestamp=datetime(2026, 1, 12, 10, 30),
+    )
+    match = TestMatchResponse(success=True, data=matched(tests))
+    error = {"error": "ValidationError", "message": "Request validation failed", "details": None}
+
+    stdlib_renderer = structlog.processors.JSONRenderer()
+    fast_renderer = structlog.processors.JSONRenderer(serializer=render_log_json)
+    rows = [
+        ("ScanResponse", lambda: legacy_render(None, scan), lambda: FastJSONResponse(scan).body),
+        ("TestMatchResponse", lambda: legacy_render(None, match), lambda: FastJSONResponse(match).body),
+        ("error dict", lambda: legacy_render(None, error), lambda: FastJSONResponse(error).body),
+        (
+            "log line",
+            lambda: stdlib_renderer(None, "info", dict(LOG_EVENT)),
+            lambda: fast_renderer(None, "info", dict(LOG_EVENT)),
+        ),
+    ]
+    print(f"{'payload':<18} {'before µs':>10} {'after µs':>9} {'speedup':>8}")
+    costs = {}
+    for name, before, after in rows:
+        before_us, after_us = per_call_us(before), per_call_us(after)
+        costs[name] = (before_us, after_us)
+        print(f"{name:<18} {before_us:>10.2f} {after_us:>9.2f} {before_us / after_us:>7.1f}x")
+
+    # End to end: INFO JSON logs go to a null stream through the real pipeline
+    stdout, sys.stdout = sys.stdout, io.StringIO()
+    try:
+        setup_logging("bench", "production", "INFO", log_json=True)
+    finally:
+        sys.stdout = stdout
+    TestMatcherService.match_tests = stub_match_tests  # type: ignore[method-assign]
+
+    app = FastAPI()
+    app.add_middleware(LoggingMiddleware)
+    app.add_middleware(RequestIDMiddleware)
+    app.include_router(referral.router)
+    app.dependency_overrides[get_current_user] = lambda: AuthContext(
+        user_id="bench-user", organization_id="bench-org", roles=[]
+    )
+
+    fast_render = FastJSONResponse.render
+    print(f"\n{'pipeline':<10} {'request µs':>11} {'serialization µs':>17} {'share':>7}")
+    for label, fast in (("before", False), ("after", True)):
+        FastJSONResponse.render = fast_render if fast else legacy_render  # type: ignore[method-assign]
+        configure_renderer(fast)
+        total = await request_us(app, requests, tests)
+        index = 1 if fast else 0
+        serialization = (
+            costs["TestMatchResponse"][index] + LOG_LINES_PER_REQUEST * costs["log line"][index]
+        )
+        print(f"{label:<10} {total:>11.1f} {serialization:>17.1f} {serialization / total:>6.1%}")
+    FastJSONResponse.render = fast_render  # type: ignore[method-assign]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000, help="Timed requests per pipeline")
+    parser.add_argument("--tests", type=int, default=10, help="Matched tests per response")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.tests))
@@ -0,0 +1,466 @@
+"""End-to-end load test of the service against local fake upstreams.
+
+Starts ``tests.fakes.upstreams`` (fake Claude Messages API, catalog, OAuth
+and JWKS) and, per scenario, a fresh ``uvicorn app.main:app`` process wired
+to it with JWT auth enabled. Each scenario drives ``/scan`` or
+``/tests/match`` with a fixed number of concurrent clients for a fixed
+duration and reports throughput, latency percentiles, event loop lag
+(sampled from the app's ``/metrics``), peak RSS of the app process and the
+upstream calls made. No Anthropic credits or real catalog are involved.
+
+Results are written as JSON together with the commit and machine they came
+from; ``--compare`` prints the change against an earlier results file, so
+runs on two commits (on the same machine) can be compared directly.
+
+Usage:
+    python benchmarks/load_test.py [--scenarios scan match] [--duration 20]
+    python benchmarks/load_test.py --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+from jose import jwt
+from prometheus_client.parser import text_string_to_metric_families
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SCAN_PATH = "/api/v1/referral/scan"
+MATCH_PATH = "/api/v1/referral/tests/match"
+MATCH_TESTS = ["FBC", "UEC", "LFT", "TFT", "HbA1c", "CRP"]
+
+# endpoint, concurrent clients, extra app settings and fake upstream behaviour
+# (see tests/fakes/upstreams.py)
+SCENARIOS: dict[str, dict[str, Any]] = {
+    "match": {"endpoint": "match", "concurrency": 32, "upstreams": {}},
+    "scan": {"endpoint": "scan", "concurrency": 16, "upstreams": {}},
+    "scan-high-concurrency": {"endpoint": "scan", "concurrency": 64, "upstreams": {}},
+    "scan-slow-claude": {
+        "endpoint": "scan",
+        "concurrency": 16,
+        "upstreams": {"claude_latency_ms": 3000, "claude_jitter_ms": 800},
+    },
+    "scan-claude-errors": {
+        "endpoint": "scan",
+        "concurrency": 16,
+        "upstreams": {"claude_error_rate": 0.1},
+    },
+    # ~6.4 MB phone photos: peak RSS shows whether the image memory budget holds
+    "scan-large-images": {
+        "endpoint": "scan",
+        "concurrency": 16,
+        "upstreams": {},
+        "image": {"width": 3000, "grain": 0.25},
+    },
+    # Compare with scan-slow-claude: a fast model, a fifth of whose answers are escalated
+    "scan-cascade": {
+        "endpoint": "scan",
+        "concurrency": 16,
+        "env": {"ANTHROPIC_MODEL_ROUTING": "cascade"},
+        "upstreams": {
+            "claude_latency_ms": 3000,
+            "claude_jitter_ms": 800,
+            "claude_model_latency_ms": {"claude-haiku-4-5-20251001": 1000},
+            "claude_low_confidence_rates": {"claude-haiku-4-5-20251001": 0.2},
+        },
+    },
+}
+
+
+def free_port() -> int:
+    """Find a free local TCP port.
+
+    Returns:
+        Port number
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def start_server(app: str, port: int, env: dict[str, str] | None = None) -> subprocess.Popen[bytes]:
+    """Start a uvicorn server process from the repository root.
+
+    Args:
+        app: ASGI app import path
+        port: Port to listen on
+        env: Extra environment variables
+
+    Returns:
+        Server process
+    """
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        env={**os.environ, **(env or {})},
+    )
+
+
+def stop_server(process: subprocess.Popen[bytes]) -> None:
+    """Stop a server process.
+
+    Args:
+        process: Server process
+    """
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+async def wait_until(client: httpx.AsyncClient, url: str, timeout: float = 60.0) -> None:
+    """Poll a URL until it answers 200.
+
+    Args:
+        client: HTTP client
+        url: URL to poll
+        timeout: Seconds before giving up
+
+    Raises:
+        TimeoutError: If the URL does not answer 200 in time
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get(url)).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise TimeoutError(f"{url} not ready after {timeout:.0f}s")
+
+
+def peak_rss_mb(pid: int) -> float | None:
+    """Read a process's peak resident set size (Linux only).
+
+    Args:
+        pid: Process ID
+
+    Returns:
+        Peak RSS in MB, or None where ``/proc`` is unavailable
+    """
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+async def loop_lag_stats(client: httpx.AsyncClient, url: str) -> tuple[float, float, float]:
+    """Read the app's event loop lag metrics.
+
+    Args:
+        client: HTTP client
+        url: App ``/metrics`` URL
+
+    Returns:
+        Latest lag sample, and the sum and count of all samples (seconds)
+    """
+    text = (await client.get(url)).text
+    latest = total = count = 0.0
+    for family in text_string_to_metric_families(text):
+        for sample in family.samples:
+            if sample.name == "event_loop_lag_seconds":
+                latest = sample.value
+            elif sample.name == "event_loop_lag_samples_seconds_sum":
+                total = sample.value
+            elif sample.name == "event_loop_lag_samples_seconds_count":
+                count = sample.value
+    return latest, total, count
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Pick a percentile from sorted values (nearest rank).
+
+    Args:
+        sorted_values: Values in ascending order
+        fraction: Percentile as a fraction (0.95 for p95)
+
+    Returns:
+        Percentile value, or 0.0 without values
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(
+    name: str,
+    scenario: dict[str, Any],
+    upstream_url: str,
+    token: str,
+    issuer: str,
+    args: argparse.Namespace,
+) -> dict[str, Any]:
+    """Run one scenario against a fresh app process.
+
+    Args:
+        name: Scenario name
+        scenario: Scenario definition (see ``SCENARIOS``)
+        upstream_url: Fake upstreams base URL
+        token: Bearer token accepted by the app
+        issuer: Token issuer
+        args: Parsed arguments
+
+    Returns:
+        Scenario results
+    """
+    port = free_port()
+    app_url = f"http://127.0.0.1:{port}"
+    env = {
+        "ANTHROPIC_API_KEY": "sk-ant-load-test",
+        "ANTHROPIC_BASE_URL": upstream_url,
+        "TEST_CATALOG_SERVICE_URL": upstream_url,
+        "OAUTH_ENABLED": "true",
+        "OAUTH_TOKEN_URL": f"{upstream_url}/oauth/token",
+        "JWT_ENABLED": "true",
+        "JWT_JWKS_URL": f"{upstream_url}/.well-known/jwks.json",
+        "JWT_ISSUER": issuer,
+        "JWT_AUDIENCE": "",
+        "LOG_LEVEL": "WARNING",
+        "TRACING_ENABLED": "false",
+        **scenario.get("env", {}),
+        **dict(setting.split("=", 1) for setting in args.app_env),
+    }
+    headers = {"Authorization": f"Bearer {token}"}
+    concurrency = scenario["concurrency"]
+
+    async def call(client: httpx.AsyncClient) -> int:
+        if scenario["endpoint"] == "scan":
+            response = await client.post(
+                SCAN_PATH, files={"image": ("referral.jpg", image, "image/jpeg")}, headers=headers
+            )
+        else:
+            response = await client.post(MATCH_PATH, json={"tests": MATCH_TESTS}, headers=headers)
+        return response.status_code
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=300.0) as control:
+        await control.put(f"{upstream_url}/_fake/config", json=scenario["upstreams"])
+        # A real referral image, so scans pass the pre-flight quality checks
+        response = await control.get(
+            f"{upstream_url}/_fake/referral-image",
+            params=scenario.get("image", {"width": args.image_width}),
+        )
+        image = response.content
+        process = start_server("app.main:app", port, env)
+        try:
+            await wait_until(control, f"{app_url}/ready")
+            async with httpx.AsyncClient(base_url=app_url, limits=limits, timeout=300.0) as client:
+                # Warm up connections, the SDK client and the OAuth token cache
+                await asyncio.gather(*(call(client) for _ in range(min(concurrency, args.warmup))))
+                await control.put(f"{upstream_url}/_fake/config", json=scenario["upstreams"])
+
+                latencies: list[float] = []
+                statuses: Counter[int] = Counter()
+                lag_max = 0.0
+                _, lag_sum_start, lag_count_start = await loop_lag_stats(
+                    control, f"{app_url}/metrics"
+                )
+                deadline = time.perf_counter() + args.duration
+
+                async def worker() -> None:
+                    while time.perf_counter() < deadline:
+                        start = time.perf_counter()
+                        try:
+                            status = await call(client)
+                        except httpx.HTTPError:
+                            status = 0  # Connection error or timeout
+                        latencies.append((time.perf_counter() - start) * 1000)
+                        statuses[status] += 1
+
+                async def sample_lag() -> None:
+                    nonlocal lag_max
+                    while time.perf_counter() < deadline:
+                        latest, _, _ = await loop_lag_stats(control, f"{app_url}/metrics")
+                        lag_max = max(lag_max, latest)
+                        await asyncio.sleep(0.5)
+
+                start_time = time.perf_counter()
+                await asyncio.gather(sample_lag(), *(worker() for _ in range(concurrency)))
+                elapsed = time.perf_counter() - start_time
+
+                _, lag_sum, lag_count = await loop_lag_stats(control, f"{app_url}/metrics")
+                upstream = (await control.get(f"{upstream_url}/_fake/config")).json()
+            rss = peak_rss_mb(process.pid)
+        finally:
+            stop_server(process)
+
+    latencies.sort()
+    lag_samples = lag_count - lag_count_start
+    ok = statuses[200]
+    return {
+        "endpoint": scenario["endpoint"],
+        "concurrency": concurrency,
+        "upstreams": upstream["config"],
+        "requests": sum(statuses.values()),
+        "statusCounts": {str(status): count for status, count in sorted(statuses.items())},
+        "throughputRps": round(ok / elapsed, 2),
+        "latencyMs": {
+            "p50": round(percentile(latencies, 0.50), 1),
+            "p95": round(percentile(latencies, 0.95), 1),
+            "p99": round(percentile(latencies, 0.99), 1),
+            "mean": round(statistics.fmean(latencies), 1) if latencies else 0.0,
+        },
+        "loopLagMs": {
+            "mean": round((lag_sum - lag_sum_start) / lag_samples * 1000, 2) if lag_samples else 0.0,
+            "max": round(lag_max * 1000, 2),
+        },
+        "peakRssMb": round(rss, 1) if rss is not None else None,
+        "upstreamCalls": upstream["calls"],
+    }
+
+
+def git_commit() -> str:
+    """Describe the checked-out commit.
+
+    Returns:
+        Short commit hash (``-dirty`` with uncommitted changes), or "unknown"
+    """
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_table(results: dict[str, Any], baseline: dict[str, Any] | None) -> None:
+    """Print the scenario results, with changes against a baseline.
+
+    Args:
+        results: Results of this run
+        baseline: Results of an earlier run, or None
+    """
+    baseline_scenarios = baseline["scenarios"] if baseline else {}
+    baseline_label = f"  vs {baseline['commit']}" if baseline else ""
+    print(
+        f"{'scenario':<24} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+        f"{'lag max ms':>11} {'rss MB':>8} {'non-200':>8}"
+    )
+    for name, result in results["scenarios"].items():
+        latency = result["latencyMs"]
+        failed = result["requests"] - result["statusCounts"].get("200", 0)
+        print(
+            f"{name:<24} {result['throughputRps']:>8.1f} {latency['p50']:>9.1f} "
+            f"{latency['p95']:>9.1f} {latency['p99']:>9.1f} {result['loopLagMs']['max']:>11.1f} "
+            f"{result['peakRssMb'] or 0:>8.1f} {failed:>8}"
+        )
+        before = baseline_scenarios.get(name)
+        if before:
+            print(
+                f"{baseline_label:<24} "
+                f"{_change(before['throughputRps'], result['throughputRps']):>8} "
+                f"{_change(before['latencyMs']['p50'], latency['p50']):>9} "
+                f"{_change(before['latencyMs']['p95'], latency['p95']):>9} "
+                f"{_change(before['latencyMs']['p99'], latency['p99']):>9} "
+                f"{_change(before['loopLagMs']['max'], result['loopLagMs']['max']):>11} "
+                f"{_change(before['peakRssMb'], result['peakRssMb']):>8}"
+            )
+
+
+def _change(before: float | None, after: float | None) -> str:
+    """Format the relative change between two values.
+
+    Args:
+        before: Baseline value
+        after: Current value
+
+    Returns:
+        Signed percentage, or "-" if it cannot be computed
+    """
+    if not before or after is None:
+        return "-"
+    return f"{(after - before) / before * 100:+.0f}%"
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Run the selected scenarios and report the results.
+
+    Args:
+        args: Parsed arguments
+    """
+    upstream_port = free_port()
+    upstream_url = f"http://127.0.0.1:{upstream_port}"
+    upstreams = start_server("tests.fakes.upstreams:app", upstream_port)
+    try:
+        async with httpx.AsyncClient() as control:
+            await wait_until(control, f"{upstream_url}/health")
+            token = (await control.post(f"{upstream_url}/_fake/user-token")).json()["access_token"]
+        issuer = jwt.get_unverified_claims(token)["iss"]
+
+        scenarios = {}
+        for name in args.scenarios:
+            print(f"Running {name} ({args.duration:.0f}s)...", file=sys.stderr)
+            scenarios[name] = await run_scenario(
+                name, SCENARIOS[name], upstream_url, token, issuer, args
+            )
+    finally:
+        stop_server(upstreams)
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(UTC).isoformat(),
+        "machine": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        },
+        "settings": {
+            "durationSeconds": args.duration,
+            "imageWidth": args.image_width,
+            "appEnv": args.app_env,
+        },
+        "scenarios": scenarios,
+    }
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print_table(results, baseline)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=list(SCENARIOS),
+        default=list(SCENARIOS),
+        help="Scenarios to run (default: all)",
+    )
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per scenario")
+    parser.add_argument("--warmup", type=int, default=8, help="Requests before measuring")
+    parser.add_argument(
+        "--image-width", type=int, default=1275, help="Uploaded image width in pixels (JPEG, A4)"
+    )
+    parser.add_argument(
+        "--app-env",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="Extra app setting (repeatable), e.g. LOAD_SHEDDING_ENABLED=false",
+    )
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    parser.add_argument("--compare", type=Path, help="Results JSON of an earlier run")
+    asyncio.run(main(parser.parse_args()))
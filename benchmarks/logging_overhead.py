@@ -0,0 +1,104 @@
+"""Benchmark event-loop time spent in logging calls.
+
+Measures how long ``logger.info`` blocks the event loop thread when stdout
+is slow (each write sleeps), comparing:
+
+- sync:    stdlib StreamHandler writing directly (previous pipeline)
+- queue:   queue-backed background writer (current pipeline)
+- sampled: queue pipeline for a request sampled out by per-route sampling
+
+Usage:
+    python benchmarks/logging_overhead.py [--events 2000] [--write-delay-ms 0.2]
+"""
+import argparse
+import asyncio
+import io
+import logging
+import sys
+import time
+
+from app.core import logging as app_logging
+from app.core.logging import get_logger, reset_request_sampling, sample_request_logs
+
+
+class SlowStream(io.StringIO):
+    """Stream whose writes block, simulating a slow stdout pipe."""
+
+    def __init__(self, delay_s: float) -> None:
+        super().__init__()
+        self.delay_s = delay_s
+
+    def write(self, s: str) -> int:
+        time.sleep(self.delay_s)
+        return len(s)
+
+
+async def loop_time_per_event(events: int, path: str = "/api/v1/referral/scan") -> float:
+    """Return the mean loop-thread time per INFO event in microseconds.
+
+    Args:
+        events: Number of events to log
+        path: Request path used for the sampling decision
+
+    Returns:
+        Mean microseconds spent in each logging call
+    """
+    logger = get_logger("bench")
+    token = sample_request_logs(path)
+    try:
+        start = time.perf_counter()
+        for i in range(events):
+            logger.info("Referral scan complete", processing_time_ms=i, tests_matched=3)
+        return (time.perf_counter() - start) / events * 1_000_000
+    finally:
+        reset_request_sampling(token)
+
+
+def configure(stream: SlowStream, mode: str) -> None:
+    """Configure logging for a benchmark mode.
+
+    Args:
+        stream: Slow stream standing in for stdout
+        mode: "sync" or "queue"
+    """
+    real_stdout = sys.stdout
+    sys.stdout = stream  # setup_logging binds its writer to sys.stdout
+    try:
+        app_logging.setup_logging(
+            "bench", "development", "INFO", log_json=True, sample_rates={"/health": 0.0}
+        )
+    finally:
+        sys.stdout = real_stdout
+
+    if mode == "sync":
+        # Previous pipeline: root handler writes on the calling thread
+        app_logging.shutdown_logging()
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logging.getLogger().handlers = [handler]
+
+
+def main(events: int, write_delay_ms: float) -> None:
+    """Run all modes and print a summary.
+
+    Args:
+        events: Number of events per mode
+        write_delay_ms: Simulated stdout write latency
+    """
+    results = {}
+    for mode, path in (("sync", "/scan"), ("queue", "/scan"), ("sampled", "/health")):
+        configure(SlowStream(write_delay_ms / 1000), "sync" if mode == "sync" else "queue")
+        results[mode] = asyncio.run(loop_time_per_event(events, path))
+        app_logging.shutdown_logging()
+
+    print(f"stdout write delay: {write_delay_ms} ms, {events} events per mode")
+    for mode, micros in results.items():
+        print(f"{mode:<8} {micros:>9.1f} µs loop time per INFO event")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=2000, help="Events logged per mode")
+    parser.add_argument("--write-delay-ms", type=float, default=0.2, help="Simulated write latency")
+    args = parser.parse_args()
+    main(args.events, args.write_delay_ms)
@@ -0,0 +1,81 @@
+"""Shared fixtures of the microbenchmark suite.
+
+Run with ``make bench-micro`` (or ``pytest benchmarks/micro --no-cov``);
+coverage tracing would distort every measurement.
+"""
+import asyncio
+import json
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+from app.core.logging import setup_logging
+
+# Claude extraction of a typical printed referral (synthetic patient)
+EXTRACTION: dict[str, Any] = {
+    "patient": {
+        "firstName": "JANE",
+        "lastName": "CITIZEN",
+        "dateOfBirth": "1970-01-01",
+        "sex": "F",
+        "medicareNumber": "2123456701",
+        "address": "1 Example Street, Sydney NSW 2000",
+    },
+    "doctor": {
+        "name": "Dr. Example",
+        "providerNumber": "0000000A",
+        "practice": "Example Medical Centre",
+        "phone": "02 9000 0000",
+        "address": "2 Example Street, Sydney NSW 2000",
+    },
+    "tests": ["FBC", "E/LFT", "Vit B12/Folate", "HbA1c", "TFT", "Iron studies", "CRP", "ESR"],
+    "clinicalNotes": "Fatigue, weight loss. Query anaemia. Contact jane@example.com",
+    "urgent": False,
+    "collectionDate": None,
+    "confidence": {"patient": 0.92, "doctor": 0.85, "tests": 0.9},
+}
+
+EXTRACTION_TEXT = json.dumps(EXTRACTION, indent=2)
+
+# The same extraction as a compact reply (ANTHROPIC_OUTPUT_FORMAT=compact)
+COMPACT_EXTRACTION_TEXT = json.dumps(
+    {
+        "p": {
+            "fn": "JANE",
+            "ln": "CITIZEN",
+            "dob": "1970-01-01",
+            "sex": "F",
+            "mc": "2123456701",
+            "addr": "1 Example Street, Sydney NSW 2000",
+        },
+        "d": {
+            "n": "Dr. Example",
+            "pn": "0000000A",
+            "pr": "Example Medical Centre",
+            "ph": "02 9000 0000",
+            "addr": "2 Example Street, Sydney NSW 2000",
+        },
+        "t": EXTRACTION["tests"],
+        "cn": EXTRACTION["clinicalNotes"],
+        "c": [0.92, 0.85, 0.9],
+    },
+    separators=(",", ":"),
+)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def quiet_logging() -> None:
+    """Keep INFO lines out of the measurements and the terminal."""
+    setup_logging("bench", "development", "WARNING", log_json=True)
+
+
+@pytest.fixture(scope="session")
+def runner() -> Iterator[asyncio.Runner]:
+    """Event loop shared by the async benchmarks.
+
+    Yields:
+        Asyncio runner
+    """
+    with asyncio.Runner() as runner:
+        yield runner
@@ -0,0 +1,20 @@
+"""Parsing Claude's extraction response."""
+import pytest
+from conftest import COMPACT_EXTRACTION_TEXT, EXTRACTION, EXTRACTION_TEXT
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from app.services.claude_vision import OutputFormat, parse_extraction_response
+
+RESPONSES: dict[str, tuple[str, OutputFormat]] = {
+    "plain": (EXTRACTION_TEXT, "verbose"),
+    "fenced": (f"Here is the extracted data:\n\n```json\n{EXTRACTION_TEXT}\n```\n", "verbose"),
+    "compact": (COMPACT_EXTRACTION_TEXT, "compact"),
+}
+
+
+@pytest.mark.parametrize("variant", list(RESPONSES))
+def test_parse_extraction_response(benchmark: BenchmarkFixture, variant: str) -> None:
+    """Parse a typical response: bare, in a markdown code block or compact (expanded)."""
+    result = benchmark(parse_extraction_response, *RESPONSES[variant])
+
+    assert result == EXTRACTION
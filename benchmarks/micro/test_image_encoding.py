@@ -0,0 +1,16 @@
+"""Base64 encoding of uploaded images for the Messages API."""
+import base64
+import os
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+
+@pytest.mark.parametrize("size_mb", [1, 5, 10])
+def test_base64_encode(benchmark: BenchmarkFixture, size_mb: int) -> None:
+    """Encode an image the way ``ClaudeVisionService`` does."""
+    image = os.urandom(size_mb * 1024 * 1024)
+
+    encoded = benchmark(lambda: base64.standard_b64encode(image).decode("utf-8"))
+
+    assert len(encoded) == 4 * ((len(image) + 2) // 3)
@@ -0,0 +1,30 @@
+"""Per-request overhead of the application's middleware stack."""
+import asyncio
+from collections.abc import Iterator
+
+import httpx
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from app.main import app
+
+
+@pytest.fixture(scope="module")
+def client(runner: asyncio.Runner) -> Iterator[httpx.AsyncClient]:
+    """In-process client for the full application (middleware included).
+
+    Yields:
+        HTTP client
+    """
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+    yield client
+    runner.run(client.aclose())
+
+
+def test_health(
+    benchmark: BenchmarkFixture, runner: asyncio.Runner, client: httpx.AsyncClient
+) -> None:
+    """``GET /health`` through every middleware."""
+    response = benchmark(lambda: runner.run(client.get("/health")))
+
+    assert response.status_code == 200
@@ -0,0 +1,34 @@
+"""PII masking of log events and logged data."""
+from conftest import EXTRACTION
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from app.core.pii import MASK, sanitize_for_logging, scrub_event
+
+# Fields of a typical request log line (no PII)
+LOG_EVENT = {
+    "event": "Request completed",
+    "method": "POST",
+    "path": "/api/v1/referral/scan",
+    "status_code": 200,
+    "duration_ms": 8412.3,
+    "phase_ms": {"upload_read": 1.2, "claude_call": 8301.5, "catalog_match": 85.1},
+    "organization_id": "org-123",
+    "request_id": "7f80a553-84bb-4f4d-ad7e-a941bef5182f",
+    "level": "info",
+    "timestamp": "2026-01-12T10:30:00.123456Z",
+}
+
+
+def test_scrub_log_event(benchmark: BenchmarkFixture) -> None:
+    """Scrub a request log line (the per-log-call processor)."""
+    result = benchmark(lambda: scrub_event(dict(LOG_EVENT)))
+
+    assert result == LOG_EVENT
+
+
+def test_sanitize_extraction(benchmark: BenchmarkFixture) -> None:
+    """Sanitize a full extraction (nested PII keys and free-text PII)."""
+    result = benchmark(sanitize_for_logging, EXTRACTION)
+
+    assert result["patient"]["medicareNumber"] != EXTRACTION["patient"]["medicareNumber"]
+    assert MASK not in result["tests"]
@@ -0,0 +1,24 @@
+"""Test name preprocessing before catalog matching."""
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from app.services.test_preprocessor import TestPreprocessor
+
+# Test names as written on referrals: abbreviations, compounds, panels, free text
+CORPUS = [
+    "FBC", "FBE", "E/LFT", "U&E", "UEC", "LFT", "TFT", "TSH", "HbA1c", "CRP", "ESR",
+    "Vit B12/Folate", "Vit D", "Iron studies", "Fe studies", "EIFT", "Lipids", "Fasting lipids",
+    "Glucose (fasting)", "GTT", "Coags", "INR", "PSA", "Ferritin", "B12", "Folate", "Mg",
+    "Ca/Mg/PO4", "CMP", "MSU M/C/S", "Urine ACR", "eGFR", "Hep B serology", "HIV", "Syphilis",
+    "Chlamydia PCR", "Pap smear", "beta hCG", "Troponin", "D-dimer", "BNP", "CK", "LDH",
+    "Amylase/Lipase", "Uric acid", "Vitamin D 25-OH", "Testosterone", "FSH/LH", "Oestradiol",
+    "Prolactin", "Cortisol 9am", "ANA", "ENA", "RF", "Anti-CCP", "Coeliac serology", "FOBT",
+]
+
+
+def test_preprocess_corpus(benchmark: BenchmarkFixture) -> None:
+    """Preprocess every test name of the corpus."""
+    preprocessor = TestPreprocessor()
+
+    result = benchmark(lambda: [preprocessor.preprocess(name) for name in CORPUS])
+
+    assert len(result) == len(CORPUS)
@@ -0,0 +1,45 @@
+"""Building and serializing the scan response."""
+from datetime import datetime
+
+from conftest import EXTRACTION
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from app.core.serialization import FastJSONResponse
+from app.schemas.referral import MatchedTest, ReferralData, ScanResponse
+from app.services.referral_scanner import build_referral_data
+
+MATCHED = [
+    MatchedTest(original=name, matched=name, test_id=name.upper(), confidence=0.9)
+    for name in EXTRACTION["tests"]
+]
+
+
+def test_build_referral_data(benchmark: BenchmarkFixture) -> None:
+    """Validate Claude's extraction into ``ReferralData``."""
+    result = benchmark(build_referral_data, EXTRACTION, MATCHED)
+
+    assert len(result.matched_tests) == len(MATCHED)
+
+
+def test_scan_response_render(benchmark: BenchmarkFixture) -> None:
+    """Build the ``ScanResponse`` and render it as the endpoint does."""
+    referral = build_referral_data(EXTRACTION, MATCHED)
+
+    def render() -> bytes:
+        response = ScanResponse(
+            data=referral, processing_time_ms=8412, timestamp=datetime(2026, 1, 12, 10, 30)
+        )
+        return FastJSONResponse(response.model_dump(mode="json", by_alias=True)).body
+
+    body = benchmark(render)
+
+    assert b'"matchedTests"' in body
+
+
+def test_referral_data_round_trip(benchmark: BenchmarkFixture) -> None:
+    """Validate a serialized referral (e.g. a replayed or queued result)."""
+    payload = build_referral_data(EXTRACTION, MATCHED).model_dump(mode="json", by_alias=True)
+
+    result = benchmark(ReferralData.model_validate, payload)
+
+    assert result.patient.last_name == "CITIZEN"
@@ -0,0 +1,172 @@
+"""Benchmark per-request middleware overhead using an in-process ASGI client.
+
+Compares the pure-ASGI middleware stack against equivalent
+``BaseHTTPMiddleware`` implementations (the previous stack) on ``/health``
+and ``/api/v1/referral/tests/match``. The catalog call is stubbed so only
+framework and middleware cost is measured.
+
+Usage:
+    python benchmarks/middleware_overhead.py [--requests 2000]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from typing import Any
+
+import httpx
+import structlog
+from fastapi import FastAPI, Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+
+from app.core.logging import get_logger, setup_logging
+from app.middleware.auth import JWTAuthMiddleware
+from app.middleware.logging import LoggingMiddleware
+from app.middleware.request_id import RequestIDMiddleware
+from app.routers import health, referral
+from app.schemas.referral import MatchedTest
+from app.services.test_matcher import TestMatcherService
+
+logger = get_logger(__name__)
+
+
+class StubValidator:
+    """JWT validator returning fixed claims without signature checks."""
+
+    async def validate_token(self, token: str) -> dict[str, Any]:
+        return {"sub": "bench-user", "organization_id": "bench-org", "roles": []}
+
+
+async def stub_match_tests(self: TestMatcherService, test_names: list[str]) -> list[MatchedTest]:
+    return [MatchedTest(original=n, matched=n, test_id=n, confidence=1.0) for n in test_names]
+
+
+# Previous BaseHTTPMiddleware implementations, kept here for comparison only
+
+
+class LegacyRequestID(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
+        structlog.contextvars.bind_contextvars(request_id=request_id)
+        request.state.request_id = request_id
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id
+        structlog.contextvars.clear_contextvars()
+        return response
+
+
+class LegacyLogging(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        start_time = time.time()
+        logger.info("Request started", method=request.method, path=request.url.path)
+        response = await call_next(request)
+        logger.info(
+            "Request completed",
+            method=request.method,
+            path=request.url.path,
+            status_code=response.status_code,
+            duration_ms=round((time.time() - start_time) * 1000, 2),
+        )
+        return response
+
+
+class LegacyAuth(BaseHTTPMiddleware):
+    def __init__(self, app: Any, jwt_validator: Any) -> None:
+        super().__init__(app)
+        self.jwt_validator = jwt_validator
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        if request.url.path in JWTAuthMiddleware.EXCLUDED_PATHS:
+            return await call_next(request)
+        claims = await self.jwt_validator.validate_token(request.headers.get("Authorization"))
+        request.state.user_id = claims.get("sub")
+        request.state.organization_id = claims.get("organization_id")
+        request.state.roles = claims.get("roles", [])
+        return await call_next(request)
+
+
+def build_app(stack: str) -> FastAPI:
+    """Build an application with the requested middleware stack.
+
+    Args:
+        stack: One of "none", "legacy" or "asgi"
+
+    Returns:
+        FastAPI application
+    """
+    app = FastAPI()
+    if stack == "legacy":
+        app.add_middleware(LegacyAuth, jwt_validator=StubValidator())
+        app.add_middleware(LegacyLogging)
+        app.add_middleware(LegacyRequestID)
+    elif stack == "asgi":
+        app.add_middleware(JWTAuthMiddleware, jwt_validator=StubValidator())  # type: ignore[arg-type]
+        app.add_middleware(LoggingMiddleware)
+        app.add_middleware(RequestIDMiddleware)
+    app.include_router(health.router)
+    app.include_router(referral.router)
+    return app
+
+
+async def measure(app: FastAPI, method: str, path: str, requests: int, **kwargs: Any) -> float:
+    """Return the median request latency in microseconds.
+
+    Args:
+        app: Application under test
+        method: HTTP method
+        path: Request path
+        requests: Number of timed requests
+        **kwargs: Extra arguments for the httpx request
+
+    Returns:
+        Median latency in microseconds
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(min(200, requests)):
+            await client.request(method, path, **kwargs)
+
+        samples = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.request(method, path, **kwargs)
+            samples.append((time.perf_counter() - start) * 1_000_000)
+            assert response.status_code == 200, response.text
+
+    return statistics.median(samples)
+
+
+async def main(requests: int) -> None:
+    """Run the benchmark and print a summary table.
+
+    Args:
+        requests: Number of timed requests per scenario
+    """
+    # Keep INFO lines out of the measurement and the terminal
+    setup_logging("bench", "development", "WARNING", log_json=True)
+    TestMatcherService.match_tests = stub_match_tests  # type: ignore[method-assign]
+
+    scenarios = [
+        ("GET /health", "GET", "/health", {}),
+        (
+            "POST /tests/match",
+            "POST",
+            "/api/v1/referral/tests/match",
+            {"json": {"tests": ["FBC", "UEC", "LFT"]}, "headers": {"Authorization": "Bearer x"}},
+        ),
+    ]
+
+    print(f"{'scenario':<20} {'bare µs':>9} {'legacy µs':>10} {'asgi µs':>9} {'saved µs':>9}")
+    for name, method, path, kwargs in scenarios:
+        bare = await measure(build_app("none"), method, path, requests, **kwargs)
+        legacy = await measure(build_app("legacy"), method, path, requests, **kwargs)
+        asgi = await measure(build_app("asgi"), method, path, requests, **kwargs)
+        print(f"{name:<20} {bare:>9.1f} {legacy:>10.1f} {asgi:>9.1f} {legacy - asgi:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000, help="Timed requests per scenario")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
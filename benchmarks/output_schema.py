@@ -0,0 +1,212 @@
+"""Benchmark Claude output size and latency of the verbose and compact reply schemas.
+
+Offline (default): renders a fixture set of extractions the way Claude
+answers in each mode (verbose: indented JSON with every field, in a markdown
+code block; compact: minified short-key JSON without nulls), checks that
+both parse into the same dictionary and reports reply characters and
+estimated output tokens (4 characters per token).
+
+Live (``--images DIR``, needs ``ANTHROPIC_API_KEY``): extracts every image
+in DIR with both prompts on ``ANTHROPIC_MODEL`` and reports the output
+tokens and latency from the API, plus the fields on which the two
+extractions disagree.
+
+Usage:
+    python benchmarks/output_schema.py
+    python benchmarks/output_schema.py --images referrals/ [--model claude-haiku-4-5-20251001]
+"""
+import argparse
+import base64
+import json
+import mimetypes
+import statistics
+import time
+from typing import Any
+
+from app.config import settings
+from app.services.claude_vision import (
+    COMPACT_DOCTOR_KEYS,
+    COMPACT_PATIENT_KEYS,
+    MAX_TOKENS,
+    OutputFormat,
+    build_message_params,
+    parse_extraction_response,
+)
+from app.services.scan_files import collect_images
+
+CHARS_PER_TOKEN = 4
+
+PATIENT = {
+    "firstName": "JANE",
+    "lastName": "CITIZEN",
+    "dateOfBirth": "1970-01-01",
+    "sex": "F",
+    "medicareNumber": "2123456701",
+    "address": "1 Example Street, Sydney NSW 2000",
+}
+DOCTOR = {
+    "name": "Dr. Example",
+    "providerNumber": "0000000A",
+    "practice": "Example Medical Centre",
+    "phone": "02 9000 0000",
+    "address": "2 Example Street, Sydney NSW 2000",
+}
+NO_PATIENT = dict.fromkeys(PATIENT)
+NO_DOCTOR = dict.fromkeys(DOCTOR)
+
+# Synthetic extractions covering the common referral shapes
+FIXTURES: dict[str, dict[str, Any]] = {
+    "printed, complete": {
+        "patient": PATIENT,
+        "doctor": DOCTOR,
+        "tests": ["FBC", "E/LFT", "Vit B12/Folate", "HbA1c", "TFT", "Iron studies", "CRP", "ESR"],
+        "clinicalNotes": "Fatigue, weight loss. Query anaemia.",
+        "urgent": False,
+        "collectionDate": None,
+        "confidence": {"patient": 0.95, "doctor": 0.9, "tests": 0.95},
+    },
+    "printed, typical": {
+        "patient": {**NO_PATIENT, "firstName": "JOHN", "lastName": "SMITH", "sex": "M"},
+        "doctor": {**NO_DOCTOR, "name": "Dr. Example", "providerNumber": "0000000A"},
+        "tests": ["FBC", "UEC", "LFT"],
+        "clinicalNotes": None,
+        "urgent": False,
+        "collectionDate": None,
+        "confidence": {"patient": 0.9, "doctor": 0.85, "tests": 0.95},
+    },
+    "handwritten, sparse": {
+        "patient": {**NO_PATIENT, "lastName": "NGUYEN", "dateOfBirth": "1988-07-14"},
+        "doctor": {**NO_DOCTOR, "name": "Dr. Example"},
+        "tests": ["FBC", "CRP"],
+        "clinicalNotes": "?infection",
+        "urgent": True,
+        "collectionDate": "2026-01-12",
+        "confidence": {"patient": 0.6, "doctor": 0.55, "tests": 0.65},
+    },
+    "not a referral": {"error": "Not a pathology referral"},
+}
+
+
+def verbose_reply(data: dict[str, Any]) -> str:
+    """Render an extraction the way Claude answers the verbose prompt."""
+    return f"```json\n{json.dumps(data, indent=2)}\n```"
+
+
+def compact_reply(data: dict[str, Any]) -> str:
+    """Render an extraction the way Claude answers the compact prompt."""
+    if "error" in data:
+        return json.dumps({"e": data["error"]}, separators=(",", ":"))
+    patient = {key: data["patient"][name] for key, name in COMPACT_PATIENT_KEYS.items()}
+    doctor = {key: data["doctor"][name] for key, name in COMPACT_DOCTOR_KEYS.items()}
+    compact = {
+        "p": {key: value for key, value in patient.items() if value is not None},
+        "d": {key: value for key, value in doctor.items() if value is not None},
+        "t": data["tests"],
+        "cn": data["clinicalNotes"],
+        "u": 1 if data["urgent"] else None,
+        "cd": data["collectionDate"],
+        "c": list(data["confidence"].values()),
+    }
+    return json.dumps(
+        {key: value for key, value in compact.items() if value not in (None, {}, [])},
+        separators=(",", ":"),
+    )
+
+
+def differing_fields(first: dict[str, Any], second: dict[str, Any]) -> list[str]:
+    """List the fields on which two extractions differ (confidence scores left out)."""
+    fields = []
+    for section in sorted((first.keys() | second.keys()) - {"confidence"}):
+        a, b = first.get(section), second.get(section)
+        if isinstance(a, dict) and isinstance(b, dict):
+            fields += [
+                f"{section}.{name}"
+                for name in sorted(a.keys() | b.keys())
+                if a.get(name) != b.get(name)
+            ]
+        elif a != b:
+            fields.append(section)
+    return fields
+
+
+def offline() -> None:
+    """Compare reply sizes on the fixture set."""
+    print(
+        f"{'fixture':<22} {'verbose chars':>14} {'compact chars':>14} {'~tokens':>13} {'saved':>6}"
+    )
+    totals = [0, 0]
+    for name, data in FIXTURES.items():
+        verbose, compact = verbose_reply(data), compact_reply(data)
+        expanded = parse_extraction_response(compact, "compact")
+        assert expanded == parse_extraction_response(verbose), name
+        totals[0] += len(verbose)
+        totals[1] += len(compact)
+        tokens = f"{len(verbose) // CHARS_PER_TOKEN} -> {len(compact) // CHARS_PER_TOKEN}"
+        saved = 1 - len(compact) / len(verbose)
+        print(f"{name:<22} {len(verbose):>14} {len(compact):>14} {tokens:>13} {saved:>6.0%}")
+    print(
+        f"{'total':<22} {totals[0]:>14} {totals[1]:>14} {'':>13} {1 - totals[1] / totals[0]:>6.0%}"
+    )
+    print("\nBoth schemas parse into identical extractions for every fixture.")
+
+
+def live(images_dir: str, model: str, compact_max_tokens: int) -> None:
+    """Extract real referral images with both prompts and compare."""
+    import anthropic
+
+    client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
+    results: dict[str, list[tuple[int, float]]] = {"verbose": [], "compact": []}
+    formats: list[tuple[OutputFormat, int]] = [
+        ("verbose", MAX_TOKENS),
+        ("compact", compact_max_tokens),
+    ]
+    disagreements = 0
+    print(
+        f"{'image':<30} {'verbose tok':>12} {'ms':>7} {'compact tok':>12} {'ms':>7}  differing fields"
+    )
+    for key, path in collect_images(images_dir):
+        image_b64 = base64.standard_b64encode(path.read_bytes()).decode("ascii")
+        image_type = mimetypes.guess_type(path.name)[0] or "image/jpeg"
+        extractions: dict[str, dict[str, Any]] = {}
+        for output_format, max_tokens in formats:
+            params = build_message_params(model, image_b64, image_type, output_format, max_tokens)
+            start = time.perf_counter()
+            message = client.messages.create(**params)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            results[output_format].append((message.usage.output_tokens, elapsed_ms))
+            text = message.content[0].text  # type: ignore[union-attr]
+            extractions[output_format] = parse_extraction_response(text, output_format)
+
+        differing = differing_fields(extractions["verbose"], extractions["compact"])
+        disagreements += bool(differing)
+        (v_tokens, v_ms), (c_tokens, c_ms) = results["verbose"][-1], results["compact"][-1]
+        print(
+            f"{key[:30]:<30} {v_tokens:>12} {v_ms:>7.0f} {c_tokens:>12} {c_ms:>7.0f}  "
+            f"{', '.join(differing) or '-'}"
+        )
+
+    for label, samples in results.items():
+        if samples:
+            tokens, latencies = zip(*samples, strict=True)
+            print(
+                f"{label:<8} mean output tokens {statistics.mean(tokens):7.1f}  "
+                f"median latency {statistics.median(latencies):7.0f} ms"
+            )
+    print(f"Images whose extractions differ: {disagreements}/{len(results['verbose'])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", help="Directory of referral images (live run)")
+    parser.add_argument("--model", default=settings.anthropic_model, help="Claude model")
+    parser.add_argument(
+        "--compact-max-tokens",
+        type=int,
+        default=settings.anthropic_compact_max_tokens,
+        help="Compact max_tokens",
+    )
+    args = parser.parse_args()
+    if args.images:
+        live(args.images, args.model, args.compact_max_tokens)
+    else:
+        offline()
@@ -0,0 +1,121 @@
+"""Benchmark PII masking coverage and per-event cost.
+
+Compares the previous one-level ``mask_pii`` processor (copied below) with
+the shared recursive scrubber on a corpus of representative log events.
+Coverage counts planted PII values that no longer appear in the output.
+Cost is reported separately for clean events (the common case) and for
+events carrying PII (which the scrubber actually rewrites).
+
+Usage:
+    python benchmarks/pii_scrubber.py [--rounds 2000]
+"""
+import argparse
+import copy
+import json
+import time
+from collections.abc import Callable
+from typing import Any
+
+from app.core.pii import scrub_event
+
+PLANTED = ["2123 45678 1", "1985-05-15", "jane.doe@example.com", "0412 345 678", "s3cr3t-token"]
+
+
+def legacy_mask_pii(event_dict: dict[str, Any]) -> dict[str, Any]:
+    """Previous processor: fixed key list, one level of nested dicts."""
+    pii_fields = [
+        "medicare_number",
+        "date_of_birth",
+        "email",
+        "phone",
+        "mobile",
+        "password",
+        "token",
+        "api_key",
+    ]
+    for key in pii_fields:
+        if key in event_dict:
+            event_dict[key] = "[MASKED]"
+    for _key, value in event_dict.items():
+        if isinstance(value, dict):
+            for pii_field in pii_fields:
+                if pii_field in value:
+                    value[pii_field] = "[MASKED]"
+    return event_dict
+
+
+def base_event(event: str, **fields: Any) -> dict[str, Any]:
+    return {
+        "event": event,
+        "level": "info",
+        "logger": "app.routers.referral",
+        "timestamp": "2026-01-12T10:30:00.123456Z",
+        "request_id": "7f80a553-84bb-4f4d-ad7e-a941bef5182f",
+        "service": "ai-referral-service",
+        "environment": "production",
+        **fields,
+    }
+
+
+CLEAN = [
+    base_event("Request started", method="POST", path="/api/v1/referral/scan", query=None),
+    base_event("Request completed", method="POST", path="/health", status_code=200, duration_ms=1.2),
+    base_event("Referral scan complete", processing_time_ms=2500, tests_matched=3),
+    base_event("Batch test matching complete", total_tests=5, matched_count=4),
+    base_event("Recognized panel", test_name="EIFT", panel_tests=["UEC", "IRON", "FERR", "TFT"]),
+    base_event("Extraction complete", patient_fields_extracted=5, overall_confidence=0.9),
+    base_event("Request authenticated", user_id="user-456", organization_id="org-123"),
+    base_event("Application exception", error="Invalid token", status_code=401),
+]
+
+WITH_PII = [
+    base_event("User registered", email="jane.doe@example.com", token="s3cr3t-token"),
+    base_event(
+        "Extraction debug",
+        data={"patient": {"medicareNumber": "2123 45678 1", "dateOfBirth": "1985-05-15"}},
+    ),
+    base_event("Error scanning referral", error="Bad value '2123 45678 1' for patient 0412 345 678"),
+    base_event("Patients", patients=[{"email": "jane.doe@example.com", "phone": "0412 345 678"}]),
+]
+
+
+def leaked(events: list[dict[str, Any]]) -> int:
+    rendered = json.dumps(events)
+    return sum(rendered.count(value) for value in PLANTED)
+
+
+def measure(
+    processor: Callable[[dict[str, Any]], dict[str, Any]], events: list[dict[str, Any]], rounds: int
+) -> float:
+    """Return the best-of-5 mean cost per event in microseconds.
+
+    Fresh copies are prepared outside the timed loop, so processors always
+    see unmasked input and copying is not measured.
+    """
+    best = float("inf")
+    for _ in range(5):
+        batch = [copy.deepcopy(event) for _ in range(rounds) for event in events]
+        start = time.perf_counter()
+        for event in batch:
+            processor(event)
+        best = min(best, time.perf_counter() - start)
+    return best / len(batch) * 1_000_000
+
+
+def main(rounds: int) -> None:
+    corpus = CLEAN + WITH_PII
+    planted = leaked(corpus)
+    print(f"{'':<9} {'coverage':>10} {'clean µs/event':>15} {'PII µs/event':>13}")
+    for name, processor in (("legacy", legacy_mask_pii), ("scrubber", scrub_event)):
+        masked = [processor(event) for event in copy.deepcopy(corpus)]
+        caught = planted - leaked(masked)
+        clean = measure(processor, CLEAN, rounds)
+        pii = measure(processor, WITH_PII, rounds)
+        print(f"{name:<9} {caught:>6}/{planted:<3} {clean:>15.2f} {pii:>13.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=2000, help="Passes over the corpus")
+    args = parser.parse_args()
+    main(args.rounds)
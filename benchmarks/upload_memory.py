@@ -0,0 +1,133 @@
+"""Benchmark peak memory per /scan request, by upload size.
+
+Sends multipart uploads to ``POST /api/v1/referral/scan`` in process (scan
+pipeline stubbed, so only the upload path is measured) and reports the peak
+Python heap allocated while each request is handled (``tracemalloc``):
+
+- before: no body limit middleware, ``UploadFile.read()`` of the whole spool
+- after: ``BodySizeLimitMiddleware`` and a single read sized from the upload
+
+Oversized uploads are sent twice: with a ``Content-Length`` header and
+chunked (no declared size).
+
+Usage:
+    python benchmarks/upload_memory.py [--sizes-mb 1 5 9] [--oversized-mb 100]
+"""
+import argparse
+import asyncio
+import os
+import tracemalloc
+from collections.abc import AsyncIterator, Callable
+
+import httpx
+from fastapi import FastAPI, UploadFile
+
+from app.config import settings
+from app.core.logging import setup_logging
+from app.middleware.body_limit import BodySizeLimitMiddleware
+from app.routers import referral
+from app.schemas.referral import ConfidenceScores, DoctorInfo, PatientInfo, ReferralData
+from app.services.referral_scanner import ReferralScanService, max_image_size_bytes
+
+SCAN_PATH = "/api/v1/referral/scan"
+BOUNDARY = "benchmark-boundary"
+CHUNK = os.urandom(64 * 1024)
+PART_HEADER = (
+    f"--{BOUNDARY}\r\n"
+    'Content-Disposition: form-data; name="image"; filename="referral.jpg"\r\n'
+    "Content-Type: image/jpeg\r\n\r\n"
+).encode()
+TRAILER = f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+async def stub_scan(self: ReferralScanService, image_data: bytes, image_type: str) -> ReferralData:
+    return ReferralData(
+        patient=PatientInfo(),
+        doctor=DoctorInfo(),
+        tests=["FBC"],
+        confidence=ConfidenceScores(patient=0.9, doctor=0.9, tests=0.9, overall=0.9),
+    )
+
+
+async def legacy_read_upload(upload: UploadFile) -> bytes:
+    """Previous upload path: read the whole spool."""
+    return await upload.read()
+
+
+def build_app(limited: bool) -> FastAPI:
+    """Build the scan route with or without the body limit."""
+    app = FastAPI()
+    app.include_router(referral.router)
+    app.dependency_overrides[referral.get_current_user] = lambda: referral.AuthContext(
+        user_id="bench-user", organization_id="bench-org", roles=[]
+    )
+    if limited:
+        app.add_middleware(
+            BodySizeLimitMiddleware,
+            paths=[SCAN_PATH],
+            max_body_bytes=max_image_size_bytes() + settings.upload_overhead_kb * 1024,
+        )
+    return app
+
+
+async def multipart(size: int) -> AsyncIterator[bytes]:
+    """Stream a multipart body with one ``size``-byte JPEG part."""
+    yield PART_HEADER
+    for offset in range(0, size, len(CHUNK)):
+        yield CHUNK[: min(len(CHUNK), size - offset)]
+    yield TRAILER
+
+
+async def peak_mb(app: FastAPI, size: int, declared: bool) -> tuple[int, float]:
+    """Send one upload and return its status code and peak heap in MB."""
+    headers = {"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"}
+    if declared:
+        headers["Content-Length"] = str(len(PART_HEADER) + size + len(TRAILER))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        tracemalloc.start()
+        try:
+            response = await client.post(SCAN_PATH, content=multipart(size), headers=headers)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return response.status_code, peak / 1024 / 1024
+
+
+async def main(sizes_mb: list[float], oversized_mb: float) -> None:
+    """Run the benchmark and print a summary table.
+
+    Args:
+        sizes_mb: Upload sizes within the limit
+        oversized_mb: Upload size over the limit
+    """
+    setup_logging("bench", "development", "ERROR", log_json=False)
+    settings.anthropic_api_key = settings.anthropic_api_key or "benchmark"
+    ReferralScanService.scan = stub_scan  # type: ignore[method-assign]
+    read_upload: Callable[[UploadFile], object] = referral._read_upload
+
+    cases = [(f"{size:g} MB", int(size * 1024 * 1024), True) for size in sizes_mb]
+    oversized = int(oversized_mb * 1024 * 1024)
+    cases += [
+        (f"{oversized_mb:g} MB declared", oversized, True),
+        (f"{oversized_mb:g} MB chunked", oversized, False),
+    ]
+
+    print(f"Image limit: {settings.max_image_size_mb:g} MB\n")
+    print(f"{'upload':<20} {'before MB':>10} {'status':>7} {'after MB':>9} {'status':>7}")
+    for label, size, declared in cases:
+        referral._read_upload = legacy_read_upload  # type: ignore[assignment]
+        before_status, before = await peak_mb(build_app(limited=False), size, declared)
+        referral._read_upload = read_upload  # type: ignore[assignment]
+        after_status, after = await peak_mb(build_app(limited=True), size, declared)
+        print(f"{label:<20} {before:>10.1f} {before_status:>7} {after:>9.1f} {after_status:>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes-mb", type=float, nargs="+", default=[1, 5, 9], help="Upload sizes within the limit"
+    )
+    parser.add_argument("--oversized-mb", type=float, default=100, help="Oversized upload size")
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes_mb, args.oversized_mb))
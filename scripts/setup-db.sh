@@ -55,6 +55,32 @@ echo ""
 echo "✓ Table created: $TABLE_NAME"
 echo ""
 
+# Create Idempotency-Key table (records expire via TTL on expires_at)
+TABLE_NAME="${TABLE_PREFIX}idempotency-keys"
+echo "Creating table: $TABLE_NAME"
+
+aws dynamodb create-table \
+  --endpoint-url "$AWS_ENDPOINT" \
+  --region "$AWS_REGION" \
+  --table-name "$TABLE_NAME" \
+  --attribute-definitions \
+    AttributeName=PK,AttributeType=S \
+  --key-schema \
+    AttributeName=PK,KeyType=HASH \
+  --billing-mode PAY_PER_REQUEST \
+  --no-cli-pager
+
+aws dynamodb update-time-to-live \
+  --endpoint-url "$AWS_ENDPOINT" \
+  --region "$AWS_REGION" \
+  --table-name "$TABLE_NAME" \
+  --time-to-live-specification "Enabled=true,AttributeName=expires_at" \
+  --no-cli-pager
+
+echo ""
+echo "✓ Table created: $TABLE_NAME"
+echo ""
+
 # Verify tables
 echo "Listing tables..."
 aws dynamodb list-tables \
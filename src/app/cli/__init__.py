@@ -0,0 +1 @@
+"""Command-line entry points (run as ``python -m app.cli.<name>``)."""
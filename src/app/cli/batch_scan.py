@@ -0,0 +1,105 @@
+"""Bulk-scan referral images through the Anthropic Message Batches API.
+
+Submits a directory (searched recursively), glob or manifest of referral images
+as Message Batches, waits for them to end, matches the extracted tests to
+the catalog and appends one JSON line per image to the output. Re-running
+the same command after an interruption resumes it: submitted batches are
+picked up from ``<output>.state.json`` and images with a final result are
+skipped.
+
+Usage:
+    python -m app.cli.batch_scan referrals/ --output results.jsonl
+    python -m app.cli.batch_scan manifest.txt --output results.jsonl --organization-id org-123
+
+Set ``ANTHROPIC_BASE_URL`` (or ``--base-url``) to run against a fake batches server.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from app.config import settings
+from app.core.logging import setup_logging, shutdown_logging
+from app.services.batch_scanner import BatchScanJob
+from app.services.scan_files import collect_images
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command-line arguments.
+
+    Args:
+        argv: Arguments (default: ``sys.argv[1:]``)
+
+    Returns:
+        Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("source", help="Image directory, glob (quote it) or manifest file")
+    parser.add_argument("--output", type=Path, required=True, help="JSONL output file")
+    parser.add_argument(
+        "--organization-id",
+        default="dev-org",
+        help="Organization whose catalog tests are matched against",
+    )
+    parser.add_argument("--poll-interval", type=float, default=60.0, help="Seconds between polls")
+    parser.add_argument("--max-batch-requests", type=int, default=10000)
+    parser.add_argument("--max-batch-mb", type=float, default=200.0, help="Encoded MB per batch")
+    parser.add_argument("--base-url", help="Anthropic API base URL (e.g. a fake batches server)")
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> dict[str, int]:
+    """Run the bulk scan.
+
+    Args:
+        args: Parsed arguments
+
+    Returns:
+        Summary counts
+    """
+    import anthropic
+
+    images = collect_images(args.source)
+    async with anthropic.AsyncAnthropic(
+        api_key=settings.anthropic_api_key, base_url=args.base_url
+    ) as client:
+        job = BatchScanJob(
+            client=client,
+            output_path=args.output,
+            organization_id=args.organization_id,
+            poll_interval_seconds=args.poll_interval,
+            max_batch_requests=args.max_batch_requests,
+            max_batch_bytes=int(args.max_batch_mb * 1024 * 1024),
+        )
+        summary = await job.run(images)
+    return summary.as_dict()
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the CLI.
+
+    Args:
+        argv: Arguments (default: ``sys.argv[1:]``)
+
+    Returns:
+        Exit code (1 if any image failed and should be retried)
+    """
+    args = parse_args(argv)
+    setup_logging(
+        service_name=f"{settings.service_name}-batch",
+        environment=settings.environment,
+        log_level=settings.log_level,
+        log_json=settings.log_json,
+    )
+    try:
+        summary = asyncio.run(run(args))
+    finally:
+        shutdown_logging()
+
+    print(json.dumps(summary))
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Run the SQS scan worker.
+
+A second entry point besides uvicorn: consumes scan requests from
+``SCAN_WORKER_INPUT_QUEUE_URL`` and publishes results to
+``SCAN_WORKER_OUTPUT_QUEUE_URL`` and/or ``SCAN_WORKER_OUTPUT_TOPIC_ARN``.
+SIGTERM/SIGINT stop receiving and drain in-flight scans before exiting.
+
+Usage:
+    python -m app.cli.scan_worker
+"""
+import asyncio
+import signal
+import sys
+
+from prometheus_client import start_http_server
+
+from app.config import settings
+from app.core.logging import get_logger, setup_logging, shutdown_logging
+from app.core.loop_monitor import loop_monitor
+from app.core.tracing import setup_tracing, shutdown_tracing
+from app.services.scan_worker import build_scan_worker
+
+logger = get_logger(__name__)
+
+
+async def run() -> None:
+    """Run the worker until SIGTERM or SIGINT."""
+    worker = build_scan_worker()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, worker.stop)
+
+    loop_monitor.start()
+    try:
+        await worker.run()
+    finally:
+        await loop_monitor.stop()
+
+
+def main() -> int:
+    """Run the CLI.
+
+    Returns:
+        Exit code
+    """
+    setup_logging(
+        service_name=f"{settings.service_name}-worker",
+        environment=settings.environment,
+        log_level=settings.log_level,
+        log_json=settings.log_json,
+    )
+    if not settings.scan_worker_input_queue_url:
+        logger.error("SCAN_WORKER_INPUT_QUEUE_URL not configured")
+        shutdown_logging()
+        return 2
+
+    if settings.tracing_enabled:
+        setup_tracing(
+            service_name=f"{settings.service_name}-worker",
+            environment=settings.environment,
+            sample_rate=settings.tracing_sample_rate,
+            exporter=settings.tracing_exporter,
+            otlp_endpoint=settings.tracing_otlp_endpoint,
+        )
+    if settings.scan_worker_metrics_port:
+        start_http_server(settings.scan_worker_metrics_port)
+
+    try:
+        asyncio.run(run())
+    finally:
+        shutdown_tracing()
+        shutdown_logging()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
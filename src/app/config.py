@@ -41,6 +41,72 @@ class Settings(BaseSettings):
     anthropic_model: str = "claude-sonnet-4-5-20250929"
     max_image_size_mb: float = 10.0  # Allow decimal precision for size limits
     scan_timeout_seconds: int = 120
+    upload_limit_paths: list[str] = ["/api/v1/referral/scan"]  # Bodies capped while streaming
+    upload_overhead_kb: int = 64  # Multipart framing allowed on top of MAX_IMAGE_SIZE_MB
+    image_memory_budget_mb: float = 256.0  # Estimated image bytes of scans in flight (0 disables)
+    image_memory_wait_seconds: float = 10.0  # Wait for room before answering 503
+
+    # Reply schema: compact asks for short keys without nulls (expanded to the verbose structure)
+    anthropic_output_format: Literal["verbose", "compact"] = "verbose"
+    anthropic_compact_max_tokens: int = 512  # Truncated compact replies are retried with 2048
+
+    # Model cascade: the fast model first, escalating to ANTHROPIC_MODEL on a doubtful extraction
+    anthropic_fast_model: str = "claude-haiku-4-5-20251001"
+    anthropic_model_routing: Literal["direct", "cascade"] = "direct"  # direct: ANTHROPIC_MODEL only
+    anthropic_model_routing_routes: dict[str, Literal["direct", "cascade"]] = {}  # By route path
+    # By organization ID (wins over the route overrides)
+    anthropic_model_routing_organizations: dict[str, Literal["direct", "cascade"]] = {}
+    anthropic_cascade_min_confidence: dict[str, float] = {  # Per confidence section
+        "patient": 0.8,
+        "doctor": 0.7,
+        "tests": 0.8,
+    }
+    anthropic_cascade_required_fields: list[str] = [
+        "patient.firstName",
+        "patient.lastName",
+        "patient.dateOfBirth",
+        "tests",
+    ]  # Extraction fields (dotted paths) that must not be null or empty
+
+    # Pre-flight image quality gate (pixel checks need the [imaging] extra; format is always checked)
+    image_quality_enabled: bool = True
+    image_quality_min_dimension_px: int = 500  # Shorter side
+    image_quality_min_content_ratio: float = 0.001  # Fraction of non-background pixels (blank page)
+    image_quality_min_edge_strength: int = 20  # 99.9th percentile of the edge map, 0-255 (blur)
+    image_quality_executor: Literal["thread", "process"] = "thread"  # Pool decoding images
+
+    # Offload executors (0: one worker per CPU)
+    executor_blocking_workers: int = 64  # Threads for blocking calls (one per in-flight Claude call)
+    executor_cpu_workers: int = 0  # Threads for GIL-releasing CPU work (image decoding, hashing)
+    executor_process_workers: int = 0  # Processes for CPU work holding the GIL
+
+    # Scan-by-reference (object storage)
+    scan_s3_bucket: str = ""  # Bucket holding uploaded referral images (empty: endpoint disabled)
+    scan_s3_key_prefix: str = "{organization_id}/"  # Keys must start with this (empty: any key)
+
+    # SQS scan worker (python -m app.cli.scan_worker)
+    scan_worker_input_queue_url: str = ""
+    scan_worker_output_queue_url: str = ""  # Results are sent here and/or ...
+    scan_worker_output_topic_arn: str = ""  # ... published to this SNS topic
+    scan_worker_concurrency: int = 8
+    scan_worker_visibility_timeout_seconds: int = 60  # Extended while a scan runs
+    scan_worker_wait_time_seconds: int = 20  # SQS long polling (0-20)
+    scan_worker_max_attempts: int = 5  # Receives before a failing request gets a "failed" result
+    scan_worker_drain_timeout_seconds: float = 120.0  # In-flight scans allowed to finish on SIGTERM
+    scan_worker_metrics_port: int = 9090  # Prometheus metrics (0 disables)
+
+    # Idempotency-Key handling for scans
+    idempotency_enabled: bool = True
+    idempotency_store: Literal["memory", "dynamodb"] = "memory"  # dynamodb: shared by instances
+    idempotency_retention_seconds: int = 86400  # How long successful responses are replayed
+    idempotency_encryption_key: str = ""  # Fernet key(s), comma-separated: bodies stored encrypted (empty: kept 5 min)
+    idempotency_max_records: int = 10000  # In-memory store only
+
+    # Record/replay of Claude and catalog responses (debugging and offline benchmarks only)
+    upstream_recording_mode: Literal["off", "record", "replay"] = "off"
+    upstream_recording_dir: str = "recordings"  # <dir>/<claude|catalog>/<request hash>.json
+    upstream_recording_key: str = ""  # Fernet key: Claude responses stored encrypted (empty: synthetic PII)
+    upstream_replay_time_scale: float = 1.0  # Replayed delay = recorded duration x this (0: none)
 
     # External Services
     test_catalog_service_url: str = "http://localhost:8003"
@@ -52,9 +118,51 @@ class Settings(BaseSettings):
     oauth_client_secret: str = "ai-referral-secret"
     oauth_scopes: str = "system:catalog:read system/Test.read"
 
+    # Load shedding (503 + Retry-After on expensive routes; 0 disables a trigger)
+    load_shedding_enabled: bool = True
+    load_shedding_paths: list[str] = ["/api/v1/referral/scan", "/api/v1/referral/scan/object"]
+    load_shedding_max_loop_lag_seconds: float = 0.5
+    load_shedding_max_in_flight: int = 64  # All in-flight HTTP requests
+    load_shedding_max_in_flight_mb: float = 256.0  # Declared upload bytes of in-flight requests
+    load_shedding_retry_after_seconds: int = 5
+
+    # Startup warm-up (readiness waits for it; [] disables it)
+    warmup_steps: list[Literal["anthropic", "jwks", "oauth"]] = ["anthropic", "jwks", "oauth"]
+    warmup_timeout_seconds: float = 30.0
+
+    # Readiness (background dependency health monitor; empty list: always ready)
+    health_checks: list[Literal["anthropic", "catalog", "jwks", "oauth"]] = [
+        "anthropic",
+        "catalog",
+        "jwks",
+        "oauth",
+    ]  # jwks/oauth are skipped when JWT/OAuth are disabled
+    health_check_interval_seconds: float = 15.0
+    health_check_timeout_seconds: float = 3.0
+    health_check_stale_seconds: float = 60.0  # Older results count as failed
+
+    # Event loop lag monitor (always on) and optional blocked-loop watchdog
+    loop_lag_interval_seconds: float = 0.5
+    loop_watchdog_enabled: bool = False  # Log the loop thread's stack when it blocks
+    loop_watchdog_threshold_seconds: float = 0.5
+
+    # Observability
+    server_timing_enabled: bool = True  # Per-phase Server-Timing header, log field and histograms
+    metrics_enabled: bool = True  # Prometheus /metrics endpoint and request metrics
+    metrics_organization_allowlist: list[str] = []  # Orgs exported as metric labels (others: "other")
+
+    # Tracing (OpenTelemetry)
+    tracing_enabled: bool = False
+    tracing_sample_rate: float = 0.1  # Fraction of new traces sampled; incoming sampled parents are kept
+    tracing_exporter: Literal["otlp", "console"] = "otlp"  # otlp requires the [otlp] extra
+    tracing_otlp_endpoint: str = "http://localhost:4318/v1/traces"
+
     # Logging
     log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR"] = "INFO"
     log_json: bool = True  # Default: JSON logs (production-ready)
+    log_queue_size: int = 10000  # Records buffered for the background writer before dropping
+    # Fraction of requests whose INFO/DEBUG lines are kept, per path (others: all kept)
+    log_sample_rates: dict[str, float] = {"/health": 0.01, "/ready": 0.01, "/metrics": 0.01}
 
 
 # Global settings instance
@@ -0,0 +1,62 @@
+"""Standard error responses.
+
+Built here for the application's exception handlers and for pure ASGI
+middleware that answers requests itself (exceptions raised there bypass
+the handlers), so every error body has the ``ErrorResponse`` format.
+"""
+from app.core.exceptions import AppException, ServiceUnavailableError
+from app.core.serialization import FastJSONResponse
+from app.schemas.common import ErrorDetail, ErrorResponse
+
+
+def error_response(
+    status_code: int,
+    error: str,
+    message: str,
+    request_id: str | None,
+    details: list[ErrorDetail] | None = None,
+    headers: dict[str, str] | None = None,
+) -> FastJSONResponse:
+    """Build an error response.
+
+    Args:
+        status_code: HTTP status code
+        error: Error type or title
+        message: Human-readable error message
+        request_id: Request ID (from the request state)
+        details: Additional error details
+        headers: Extra response headers
+
+    Returns:
+        JSON error response
+    """
+    return FastJSONResponse(
+        status_code=status_code,
+        content=ErrorResponse(
+            error=error, message=message, details=details, request_id=request_id
+        ).model_dump(mode="json"),
+        headers=headers,
+    )
+
+
+def exception_response(
+    exc: AppException, request_id: str | None, headers: dict[str, str] | None = None
+) -> FastJSONResponse:
+    """Build the error response for an application exception.
+
+    ``ServiceUnavailableError`` with a retry delay adds ``Retry-After``.
+
+    Args:
+        exc: Application exception
+        request_id: Request ID (from the request state)
+        headers: Extra response headers
+
+    Returns:
+        JSON error response
+    """
+    headers = dict(headers or {})
+    if isinstance(exc, ServiceUnavailableError) and exc.retry_after:
+        headers["Retry-After"] = str(exc.retry_after)
+    return error_response(
+        exc.status_code, exc.__class__.__name__, exc.detail, request_id, headers=headers or None
+    )
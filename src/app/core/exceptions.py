@@ -88,3 +88,30 @@ class ForbiddenError(AppException):
             detail: Authorization error message
         """
         super().__init__(detail=detail, status_code=403)
+
+
+class PayloadTooLargeError(AppException):
+    """Raised when a request body exceeds the size limit."""
+
+    def __init__(self, detail: str, max_bytes: int) -> None:
+        """Initialize the exception.
+
+        Args:
+            detail: Error message
+            max_bytes: Maximum accepted body size in bytes
+        """
+        super().__init__(detail=detail, status_code=413, max_bytes=max_bytes)
+
+
+class ServiceUnavailableError(AppException):
+    """Raised when the service is temporarily unable to handle a request."""
+
+    def __init__(self, detail: str = "Service unavailable", retry_after: int | None = None) -> None:
+        """Initialize the exception.
+
+        Args:
+            detail: Error message
+            retry_after: Seconds after which the client may retry
+        """
+        super().__init__(detail=detail, status_code=503)
+        self.retry_after = retry_after
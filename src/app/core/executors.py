@@ -0,0 +1,157 @@
+"""Managed executors for work that must not run on the event loop.
+
+Three pools, each created on first use:
+
+- ``blocking``: threads for blocking I/O, such as the synchronous Anthropic
+  client and boto3. Sized by ``EXECUTOR_BLOCKING_WORKERS``, because each
+  in-flight Claude call holds a thread while it waits. The loop's default
+  executor has only ``min(32, CPUs + 4)`` threads.
+- ``cpu``: threads for CPU-bound work that releases the GIL, such as Pillow
+  decoding and filtering or hashing large buffers. One thread per CPU by
+  default.
+- ``process``: processes for CPU-bound work that holds the GIL. One process
+  per CPU by default. Arguments and results are pickled (copied) to and from
+  the worker processes.
+
+``run`` copies the caller's context into thread pools, so log lines keep
+their request ID and phase timings are recorded. It tracks active tasks,
+queue depth and task duration per pool. If the awaiting request is
+cancelled (client disconnect, timeout), its task is dropped from the queue
+when it has not started; a task that already started runs to completion.
+"""
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import os
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Literal, TypeVar
+
+from app.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import EXECUTOR_ACTIVE_TASKS, EXECUTOR_QUEUE_DEPTH, EXECUTOR_TASK_SECONDS
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+ExecutorKind = Literal["thread", "process"]
+
+
+class ManagedExecutor:
+    """Lazily created executor with queue depth metrics and cancellation."""
+
+    def __init__(self, name: str, kind: ExecutorKind, max_workers: int) -> None:
+        """Initialize executor.
+
+        Args:
+            name: Pool name (metric label and thread name prefix)
+            kind: ``thread`` or ``process``
+            max_workers: Workers running tasks concurrently (may be raised before first use)
+        """
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers
+        self.in_flight = 0
+        self._executor: Executor | None = None
+        # Tasks finish on worker threads; guards in_flight
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> Executor:
+        """Get the underlying executor, creating it on first use.
+
+        Returns:
+            Thread or process pool
+        """
+        if self._executor is None:
+            if self.kind == "process":
+                # Not forked: the parent has running threads (executors, logging, SDK clients)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=self.name
+                )
+            logger.debug("Executor started", pool=self.name, max_workers=self.max_workers)
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a function on the pool and wait for its result.
+
+        Args:
+            func: Function to run (module-level and picklable for process pools)
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+
+        Returns:
+            The function's return value
+        """
+        if self.kind == "thread":
+            # Like asyncio.to_thread: log context and phase timings follow the call
+            call: Callable[[], T] = functools.partial(
+                contextvars.copy_context().run, func, *args, **kwargs
+            )
+        else:
+            call = functools.partial(func, *args, **kwargs)
+        future = self.executor.submit(call)
+        self._started()
+        future.add_done_callback(functools.partial(self._finished, time.perf_counter()))
+        # Cancelling the awaiting task cancels the future if it is still queued
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        """Stop the pool, dropping queued tasks."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _started(self) -> None:
+        """Count a submitted task."""
+        with self._lock:
+            self.in_flight += 1
+            self._observe()
+
+    def _finished(self, submitted_at: float, future: Future[Any]) -> None:
+        """Count a finished (or cancelled) task; runs in the worker or loop thread.
+
+        Args:
+            submitted_at: ``time.perf_counter()`` at submission
+            future: Finished future
+        """
+        with self._lock:
+            self.in_flight -= 1
+            self._observe()
+        EXECUTOR_TASK_SECONDS.labels(pool=self.name).observe(time.perf_counter() - submitted_at)
+
+    def _observe(self) -> None:
+        """Update the pool's gauges (tasks beyond the worker count are queued)."""
+        EXECUTOR_ACTIVE_TASKS.labels(pool=self.name).set(min(self.in_flight, self.max_workers))
+        EXECUTOR_QUEUE_DEPTH.labels(pool=self.name).set(max(0, self.in_flight - self.max_workers))
+
+
+def _cpu_count() -> int:
+    """Get the CPUs available to this process.
+
+    Returns:
+        CPU count (at least 1)
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+# Shared pools
+blocking = ManagedExecutor("blocking", "thread", settings.executor_blocking_workers)
+cpu = ManagedExecutor("cpu", "thread", settings.executor_cpu_workers or _cpu_count())
+process = ManagedExecutor("process", "process", settings.executor_process_workers or _cpu_count())
+
+
+def shutdown_executors() -> None:
+    """Stop all pools (on application shutdown)."""
+    for executor in (blocking, cpu, process):
+        executor.shutdown()
@@ -1,14 +1,80 @@
-"""Structured logging configuration using structlog."""
+"""Structured logging configuration using structlog.
+
+Log lines are rendered on the calling thread but written to stdout by a
+background ``QueueListener`` thread, so a slow stdout never stalls the event
+loop. INFO/DEBUG lines of high-volume routes can be sampled per request;
+warnings and errors are always kept.
+"""
+import atexit
 import logging
+import queue
+import random
 import sys
+from contextvars import ContextVar, Token
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any
 
 import structlog
 from structlog.typing import EventDict, WrappedLogger
 
+from app.core.metrics import LOG_RECORDS_DROPPED
+from app.core.pii import scrub_event
+from app.core.serialization import render_log_json
+from app.core.tracing import add_trace_context
 
-def mask_pii(logger: WrappedLogger, method_name: str, event_dict: EventDict) -> EventDict:
-    """Mask PII fields in log events.
+_listener: QueueListener | None = None
+
+# Per-route sample rates for INFO/DEBUG lines (path -> fraction of requests kept)
+_sample_rates: dict[str, float] = {}
+
+# Whether INFO/DEBUG lines of the current request are kept
+_request_logs_sampled: ContextVar[bool] = ContextVar("request_logs_sampled", default=True)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full."""
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Enqueue a record without blocking.
+
+        Args:
+            record: Prepared log record
+        """
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+def sample_request_logs(path: str) -> Token[bool]:
+    """Decide whether INFO/DEBUG logs of the current request are kept.
+
+    Args:
+        path: Request path
+
+    Returns:
+        Context variable token to pass to ``reset_request_sampling``
+    """
+    rate = _sample_rates.get(path, 1.0)
+    return _request_logs_sampled.set(rate >= 1.0 or random.random() < rate)
+
+
+def keep_request_logs() -> None:
+    """Keep the remaining logs of the current request (e.g. after an error)."""
+    _request_logs_sampled.set(True)
+
+
+def reset_request_sampling(token: Token[bool]) -> None:
+    """Restore the sampling decision in effect before the request.
+
+    Args:
+        token: Token returned by ``sample_request_logs``
+    """
+    _request_logs_sampled.reset(token)
+
+
+def drop_unsampled(logger: WrappedLogger, method_name: str, event_dict: EventDict) -> EventDict:
+    """Drop INFO/DEBUG events of requests that were not sampled.
 
     Args:
         logger: The wrapped logger instance
@@ -16,34 +82,42 @@ def mask_pii(logger: WrappedLogger, method_name: str, event_dict: EventDict) ->
         event_dict: The event dictionary
 
     Returns:
-        Event dictionary with PII fields masked
+        Event dictionary (unchanged)
+
+    Raises:
+        structlog.DropEvent: If the event is sampled out
     """
-    pii_fields = [
-        "medicare_number",
-        "date_of_birth",
-        "email",
-        "phone",
-        "mobile",
-        "password",
-        "token",
-        "api_key",
-    ]
+    if method_name in ("debug", "info") and not _request_logs_sampled.get():
+        raise structlog.DropEvent
+    return event_dict
 
-    for key in pii_fields:
-        if key in event_dict:
-            event_dict[key] = "[MASKED]"
 
-    # Also check nested dicts
-    for _key, value in event_dict.items():
-        if isinstance(value, dict):
-            for pii_field in pii_fields:
-                if pii_field in value:
-                    value[pii_field] = "[MASKED]"
+def mask_pii(logger: WrappedLogger, method_name: str, event_dict: EventDict) -> EventDict:
+    """Mask PII fields in log events.
 
-    return event_dict
+    Delegates to the shared scrubber in ``app.core.pii``: PII keys are masked
+    at any depth (dicts and lists), and Medicare numbers, emails and phone
+    numbers inside free-text values are masked too.
 
+    Args:
+        logger: The wrapped logger instance
+        method_name: Name of the method being called
+        event_dict: The event dictionary
+
+    Returns:
+        Event dictionary with PII fields masked
+    """
+    return scrub_event(event_dict)
 
-def setup_logging(service_name: str, environment: str, log_level: str, log_json: bool) -> None:
+
+def setup_logging(
+    service_name: str,
+    environment: str,
+    log_level: str,
+    log_json: bool,
+    sample_rates: dict[str, float] | None = None,
+    queue_size: int = 10000,
+) -> None:
     """Configure structlog for the application.
 
     Args:
@@ -51,21 +125,37 @@ def setup_logging(service_name: str, environment: str, log_level: str, log_json:
         environment: Environment (development, staging, production)
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR)
         log_json: Whether to output JSON logs
+        sample_rates: Per-route sample rates for INFO/DEBUG lines (default: keep all)
+        queue_size: Maximum records buffered for the writer thread before dropping
     """
-    # Configure standard library logging
-    logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
-        level=getattr(logging, log_level.upper()),
-    )
+    global _listener
+
+    # Configure standard library logging: enqueue on the caller, write on a thread
+    shutdown_logging()
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(maxsize=queue_size)
+
+    root_logger = logging.getLogger()
+    root_logger.handlers = [DroppingQueueHandler(log_queue)]
+    root_logger.setLevel(getattr(logging, log_level.upper()))
+
+    _listener = QueueListener(log_queue, stream_handler)
+    _listener.start()
+
+    _sample_rates.clear()
+    _sample_rates.update(sample_rates or {})
 
     # Shared processors for all configurations
     shared_processors: list[Any] = [
+        drop_unsampled,  # First, so sampled-out events skip all other work
         structlog.contextvars.merge_contextvars,
         structlog.stdlib.add_log_level,
         structlog.stdlib.add_logger_name,
         structlog.processors.TimeStamper(fmt="iso"),
         structlog.processors.StackInfoRenderer(),
+        add_trace_context,  # trace_id/span_id for log-trace correlation
         mask_pii,  # Custom PII masking
     ]
 
@@ -73,7 +163,7 @@ def setup_logging(service_name: str, environment: str, log_level: str, log_json:
         # Production: JSON output
         processors = shared_processors + [
             structlog.processors.format_exc_info,
-            structlog.processors.JSONRenderer(),
+            structlog.processors.JSONRenderer(serializer=render_log_json),
         ]
     else:
         # Development: Console output with colors
@@ -97,6 +187,15 @@ def setup_logging(service_name: str, environment: str, log_level: str, log_json:
     )
 
 
+def shutdown_logging() -> None:
+    """Flush queued log records and stop the writer thread."""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
 def get_logger(name: str | None = None) -> structlog.stdlib.BoundLogger:
     """Get a structured logger instance.
 
@@ -107,3 +206,7 @@ def get_logger(name: str | None = None) -> structlog.stdlib.BoundLogger:
         Configured structlog logger
     """
     return structlog.get_logger(name)  # type: ignore[no-any-return]
+
+
+# Flush queued records when the process exits (CLIs, workers, tests)
+atexit.register(shutdown_logging)
@@ -0,0 +1,114 @@
+"""Event loop lag monitor and blocked-loop watchdog.
+
+A background task sleeps for a fixed interval and records how late it
+wakes up; anything that blocks the loop (a sync SDK call, large base64 or
+JSON work) shows up as lag. The optional watchdog thread notices when
+that task stops waking up and logs the loop thread's current stack, which
+points at the blocking code.
+"""
+import asyncio
+import sys
+import threading
+import time
+import traceback
+
+from app.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import EVENT_LOOP_BLOCKED, EVENT_LOOP_LAG_SAMPLES, EVENT_LOOP_LAG_SECONDS
+
+logger = get_logger(__name__)
+
+
+class LoopLagMonitor:
+    """Sample event loop lag and optionally watch for a blocked loop."""
+
+    def __init__(self, interval_seconds: float, watchdog_threshold_seconds: float | None) -> None:
+        """Initialize monitor.
+
+        Args:
+            interval_seconds: Delay between lag samples
+            watchdog_threshold_seconds: Block duration after which the loop
+                thread's stack is logged, or None to disable the watchdog
+        """
+        self.interval_seconds = interval_seconds
+        self.watchdog_threshold_seconds = watchdog_threshold_seconds
+        self.lag_seconds = 0.0
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        """Start sampling on the running loop (and the watchdog, if enabled)."""
+        if self._task is not None:
+            return
+
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = asyncio.create_task(self._run(), name="loop-lag-monitor")
+
+        if self.watchdog_threshold_seconds is not None:
+            self._stopped.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Stop sampling and the watchdog."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._watchdog is not None:
+            self._stopped.set()
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+
+    async def _run(self) -> None:
+        """Record how late each sleep wakes up."""
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            lag = max(0.0, loop.time() - expected)
+
+            self._heartbeat = time.monotonic()
+            self.lag_seconds = lag
+            EVENT_LOOP_LAG_SECONDS.set(lag)
+            EVENT_LOOP_LAG_SAMPLES.observe(lag)
+
+    def _watch(self) -> None:
+        """Watchdog thread: log the loop thread's stack once per blocked episode."""
+        assert self.watchdog_threshold_seconds is not None
+        threshold = self.watchdog_threshold_seconds
+        reported_heartbeat = None
+
+        while not self._stopped.wait(threshold / 2):
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat - self.interval_seconds
+            if blocked < threshold or heartbeat == reported_heartbeat:
+                continue
+
+            reported_heartbeat = heartbeat
+            EVENT_LOOP_BLOCKED.inc()
+
+            frame = sys._current_frames().get(self._loop_thread_id or 0)
+            logger.warning(
+                "Event loop blocked",
+                blocked_ms=round(blocked * 1000),
+                threshold_ms=round(threshold * 1000),
+                stack="".join(traceback.format_stack(frame)) if frame else None,
+            )
+
+
+# Shared instance, started and stopped by the application lifespan
+loop_monitor = LoopLagMonitor(
+    interval_seconds=settings.loop_lag_interval_seconds,
+    watchdog_threshold_seconds=(
+        settings.loop_watchdog_threshold_seconds if settings.loop_watchdog_enabled else None
+    ),
+)
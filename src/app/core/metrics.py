@@ -0,0 +1,245 @@
+"""Prometheus metric definitions.
+
+All label values are bounded: routes use the matched route template,
+organizations are only used verbatim when allow-listed in settings.
+"""
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.config import settings
+
+# Buckets spanning sub-millisecond CPU phases up to slow Claude calls
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+CONFIDENCE_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 1.0)
+
+# HTTP
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status_code"],
+    buckets=LATENCY_BUCKETS,
+)
+
+REQUEST_PHASE_SECONDS = Histogram(
+    "referral_request_phase_seconds",
+    "Time spent in each request phase (upload read, Claude call, matching, ...)",
+    ["phase"],
+    buckets=LATENCY_BUCKETS,
+)
+
+SCANS_IN_FLIGHT = Gauge(
+    "referral_scans_in_flight",
+    "Referral scans currently being processed",
+    ["organization"],
+)
+
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being processed",
+)
+
+REQUEST_BYTES_IN_FLIGHT = Gauge(
+    "http_request_bytes_in_flight",
+    "Declared request body bytes (Content-Length) of requests being processed",
+)
+
+LOAD_SHED_REJECTIONS = Counter(
+    "load_shed_rejections_total",
+    "Requests rejected with 503 by load shedding",
+    ["route", "reason"],
+)
+
+IMAGE_MEMORY_RESERVED = Gauge(
+    "image_memory_reserved_bytes",
+    "Estimated memory held by the images of scans in flight (image memory budget)",
+)
+
+IMAGE_MEMORY_WAITS = Counter(
+    "image_memory_waits_total",
+    "Scans that queued for the image memory budget (admitted, rejected)",
+    ["outcome"],
+)
+
+EXECUTOR_ACTIVE_TASKS = Gauge(
+    "executor_active_tasks",
+    "Tasks running on an offload executor (blocking, cpu, process)",
+    ["pool"],
+)
+
+EXECUTOR_QUEUE_DEPTH = Gauge(
+    "executor_queue_depth",
+    "Tasks waiting for a free worker of an offload executor",
+    ["pool"],
+)
+
+EXECUTOR_TASK_SECONDS = Histogram(
+    "executor_task_duration_seconds",
+    "Offload executor task time, from submission (including queueing) to completion",
+    ["pool"],
+    buckets=LATENCY_BUCKETS,
+)
+
+UPLOAD_REJECTIONS = Counter(
+    "upload_rejections_total",
+    "Request bodies rejected with 413 before being buffered (content_length, stream)",
+    ["route", "reason"],
+)
+
+IDEMPOTENT_REQUESTS = Counter(
+    "idempotent_requests_total",
+    "Requests with an Idempotency-Key (executed, attached, replayed, conflict, mismatch)",
+    ["outcome"],
+)
+
+IMAGE_QUALITY_REJECTIONS = Counter(
+    "image_quality_rejections_total",
+    "Images rejected by the pre-flight quality check (format, undecodable, resolution, blank, blur)",
+    ["reason"],
+)
+
+# Scan worker
+
+SCAN_WORKER_MESSAGES = Counter(
+    "scan_worker_messages_total",
+    "Scan requests handled by the queue worker (succeeded, rejected, failed, retried, deferred)",
+    ["outcome"],
+)
+
+SCAN_WORKER_IN_FLIGHT = Gauge(
+    "scan_worker_in_flight",
+    "Scan requests currently being processed by the queue worker",
+)
+
+# Claude
+
+CLAUDE_REQUEST_SECONDS = Histogram(
+    "claude_request_duration_seconds",
+    "Claude Messages API call latency",
+    ["model", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+
+CLAUDE_TOKENS = Counter(
+    "claude_tokens_total",
+    "Claude tokens consumed, from the response usage block",
+    ["model", "type"],
+)
+
+CLAUDE_TRUNCATED_REPLIES = Counter(
+    "claude_truncated_replies_total",
+    "Claude replies cut off at max_tokens (compact replies are retried with the full budget)",
+    ["model"],
+)
+
+CLAUDE_EXTRACTION_SECONDS = Histogram(
+    "claude_extraction_duration_seconds",
+    "Referral extraction latency, including the fast model call of escalated cascades",
+    ["tier"],
+    buckets=LATENCY_BUCKETS,
+)
+
+CLAUDE_CASCADE_RESULTS = Counter(
+    "claude_cascade_results_total",
+    "Cascaded extractions by fast model outcome (accepted or the escalation reason)",
+    ["outcome"],
+)
+
+# Test catalog
+
+CATALOG_REQUEST_SECONDS = Histogram(
+    "catalog_request_duration_seconds",
+    "test-catalog-service call latency",
+    ["operation", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+
+TEST_MATCH_CONFIDENCE = Histogram(
+    "test_match_confidence",
+    "Confidence of test name matches",
+    buckets=CONFIDENCE_BUCKETS,
+)
+
+# Auth
+
+OAUTH_TOKEN_REFRESHES = Counter(
+    "oauth_token_refresh_total",
+    "OAuth client credentials token requests",
+    ["outcome"],
+)
+
+JWKS_REFRESHES = Counter(
+    "jwks_refresh_total",
+    "JWKS signing key refreshes",
+    ["outcome"],
+)
+
+# Event loop
+
+EVENT_LOOP_LAG_SECONDS = Gauge(
+    "event_loop_lag_seconds",
+    "Most recent event loop lag sample (timer delay beyond the scheduled time)",
+)
+
+EVENT_LOOP_LAG_SAMPLES = Histogram(
+    "event_loop_lag_samples_seconds",
+    "Distribution of event loop lag samples",
+    buckets=LATENCY_BUCKETS,
+)
+
+EVENT_LOOP_BLOCKED = Counter(
+    "event_loop_blocked_total",
+    "Times the watchdog saw the event loop blocked longer than its threshold",
+)
+
+# Dependency health (background monitor)
+
+DEPENDENCY_UP = Gauge(
+    "dependency_up",
+    "Whether the last background health check of a dependency succeeded",
+    ["dependency"],
+)
+
+DEPENDENCY_CHECK_SECONDS = Histogram(
+    "dependency_check_duration_seconds",
+    "Background dependency health check latency",
+    ["dependency"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Logging
+
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped_total",
+    "Log records dropped because the log writer queue was full",
+)
+
+
+def organization_label(organization_id: str) -> str:
+    """Map an organization ID to a bounded metric label value.
+
+    Args:
+        organization_id: Organization ID from the auth context
+
+    Returns:
+        The organization ID if allow-listed, otherwise "other"
+    """
+    if organization_id in settings.metrics_organization_allowlist:
+        return organization_id
+    return "other"
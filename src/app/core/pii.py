@@ -1,5 +1,6 @@
 """PII (Personally Identifiable Information) masking utilities."""
 import re
+from collections.abc import Callable, MutableMapping
 from typing import Any
 
 
@@ -59,30 +60,190 @@ def mask_phone(phone: str) -> str:
     return f"***{digits[-4:]}"
 
 
-def sanitize_for_logging(data: dict[str, Any]) -> dict[str, Any]:
-    """Sanitize a dictionary for safe logging by masking PII fields.
+# Keys whose values are always masked (snake_case as logged, camelCase as extracted)
+PII_KEYS = frozenset(
+    {
+        "medicare_number",
+        "medicareNumber",
+        "date_of_birth",
+        "dateOfBirth",
+        "email",
+        "phone",
+        "mobile",
+        "password",
+        "token",
+        "access_token",
+        "api_key",
+        "client_secret",
+        "authorization",
+    }
+)
+
+# Partial maskers used by sanitize_for_logging (other PII keys are fully masked)
+_PARTIAL_MASKERS: dict[str, Callable[[str], str]] = {
+    "medicare_number": mask_medicare_number,
+    "medicareNumber": mask_medicare_number,
+    "email": mask_email,
+    "phone": mask_phone,
+    "mobile": mask_phone,
+}
+
+# Log fields set by the service itself, never from input, so value patterns are
+# not applied. The event message, paths and client-supplied request IDs can carry
+# interpolated PHI and are scrubbed like any other field.
+_STRUCTURAL_KEYS = frozenset(
+    {
+        "timestamp",
+        "level",
+        "logger",
+        "service",
+        "environment",
+        "trace_id",
+        "span_id",
+        "method",
+    }
+)
+
+_EMAIL_PATTERN = r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}"
+_MEDICARE_PATTERN = r"\b\d{4}[ -]?\d{5}[ -]?\d(?:[ ]?/[ ]?\d)?\b"
+_PHONE_PATTERN = r"(?:\+61[ -]?|\b0)[2-478](?:[ -]?\d){8}\b"
+
+_PII_VALUE_RE = re.compile(
+    f"(?P<email>{_EMAIL_PATTERN})|(?P<medicare>{_MEDICARE_PATTERN})|(?P<phone>{_PHONE_PATTERN})"
+)
+
+# Cheap pre-check: every value pattern needs an "@" or a run of 9+ digits/separators
+_DIGIT_RUN_RE = re.compile(r"\d[\d /+-]{8}")
+
+_PARTIAL_VALUE_MASKERS: dict[str, Callable[[str], str]] = {
+    "email": mask_email,
+    "medicare": mask_medicare_number,
+    "phone": mask_phone,
+}
+
+MASK = "[MASKED]"
+
+# Nesting depth after which containers are masked wholesale
+_MAX_DEPTH = 10
+
+
+def _may_contain_pii(text: str) -> bool:
+    """Check whether text could match a PII value pattern.
 
     Args:
-        data: Dictionary that may contain PII
+        text: Text to check
 
     Returns:
-        Dictionary with PII fields masked
+        False if the text certainly contains no PII values
     """
-    pii_fields = {
-        "medicare_number": mask_medicare_number,
-        "email": mask_email,
-        "phone": mask_phone,
-        "mobile": mask_phone,
-        "date_of_birth": lambda x: "[MASKED]",
-        "password": lambda x: "[MASKED]",
-        "token": lambda x: "[MASKED]",
-        "api_key": lambda x: "[MASKED]",
-    }
+    return "@" in text or (len(text) >= 10 and _DIGIT_RUN_RE.search(text) is not None)
+
+
+def scrub_text(text: str, partial: bool = False) -> str:
+    """Mask Medicare numbers, emails and phone numbers inside free text.
+
+    Args:
+        text: Text that may contain PII
+        partial: Use partial masks (e.g. "j***@example.com") instead of "[MASKED]"
+
+    Returns:
+        Text with PII values masked
+    """
+    if partial:
+        return _PII_VALUE_RE.sub(
+            lambda m: _PARTIAL_VALUE_MASKERS[m.lastgroup or "email"](m.group()), text
+        )
+    return _PII_VALUE_RE.sub(MASK, text)
 
-    sanitized = data.copy()
 
-    for field, mask_fn in pii_fields.items():
-        if field in sanitized and sanitized[field]:
-            sanitized[field] = mask_fn(str(sanitized[field]))
+def scrub(value: Any, partial: bool = False, _depth: int = 0) -> Any:
+    """Recursively mask PII in a value.
+
+    Dicts are masked by key (``PII_KEYS``), strings by value pattern, and
+    lists/tuples element-wise. Containers are copied, never mutated.
+
+    Args:
+        value: Value to scrub
+        partial: Use partial masks instead of "[MASKED]"
 
-    return sanitized
+    Returns:
+        Scrubbed copy of the value
+    """
+    if isinstance(value, str):
+        return scrub_text(value, partial) if _may_contain_pii(value) else value
+    if isinstance(value, dict):
+        if _depth >= _MAX_DEPTH:
+            return MASK
+        return {
+            key: _mask_key(key, item, partial)
+            if key in PII_KEYS
+            else scrub(item, partial, _depth + 1)
+            for key, item in value.items()
+        }
+    if isinstance(value, list | tuple):
+        if _depth >= _MAX_DEPTH:
+            return MASK
+        return [scrub(item, partial, _depth + 1) for item in value]
+    return value
+
+
+def scrub_event(event_dict: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
+    """Mask PII in a log event in place.
+
+    Fast path: structural fields (timestamp, level, logger, ...) and
+    non-string scalars are skipped with a set lookup or type check, and
+    strings only reach the value patterns when they contain an "@" or a
+    long digit run. Events without PII keys or containers therefore cost a
+    few O(1) checks per field.
+
+    Args:
+        event_dict: Log event dictionary
+
+    Returns:
+        The same dictionary with PII masked
+    """
+    for key, value in event_dict.items():
+        if key in _STRUCTURAL_KEYS:
+            continue
+        if key in PII_KEYS:
+            event_dict[key] = MASK
+        elif type(value) is str:
+            # Inlined _may_contain_pii: this loop runs for every log event
+            if "@" in value or (len(value) >= 10 and _DIGIT_RUN_RE.search(value)):
+                event_dict[key] = scrub_text(value)
+        elif isinstance(value, dict | list | tuple):
+            event_dict[key] = scrub(value)
+    return event_dict
+
+
+def _mask_key(key: str, value: Any, partial: bool) -> Any:
+    """Mask the value of a PII key.
+
+    Args:
+        key: PII key
+        value: Value to mask
+        partial: Use the key's partial masker if it has one
+
+    Returns:
+        Masked value (empty values are left as-is)
+    """
+    if not value:
+        return value
+    if partial and key in _PARTIAL_MASKERS:
+        return _PARTIAL_MASKERS[key](str(value))
+    return MASK
+
+
+def sanitize_for_logging(data: dict[str, Any]) -> dict[str, Any]:
+    """Sanitize a dictionary for safe logging by masking PII fields.
+
+    Nested dicts and lists are scrubbed too, and PII found inside string
+    values (Medicare numbers, emails, phone numbers) is masked.
+
+    Args:
+        data: Dictionary that may contain PII
+
+    Returns:
+        Copy of the dictionary with PII masked
+    """
+    return scrub(data, partial=True)  # type: ignore[no-any-return]
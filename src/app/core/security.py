@@ -8,6 +8,8 @@ from jose.backends import RSAKey
 
 from app.core.exceptions import UnauthorizedError
 from app.core.logging import get_logger
+from app.core.metrics import JWKS_REFRESHES
+from app.core.tracing import inject_trace_headers
 
 logger = get_logger(__name__)
 
@@ -49,19 +51,31 @@ class JWKSClient:
 
         return self._keys[kid]
 
+    async def prefetch(self) -> None:
+        """Fetch the signing keys ahead of the first request.
+
+        Raises:
+            UnauthorizedError: If the JWKS cannot be fetched
+        """
+        await self._refresh_keys()
+
     async def _refresh_keys(self) -> None:
         """Fetch and cache JWKS from the URL."""
         try:
             async with httpx.AsyncClient() as client:
-                response = await client.get(self.jwks_url, timeout=10.0)
+                response = await client.get(
+                    self.jwks_url, headers=inject_trace_headers({}), timeout=10.0
+                )
                 response.raise_for_status()
                 jwks = response.json()
 
             self._keys = {key["kid"]: RSAKey(key, "RS256") for key in jwks.get("keys", [])}  # type: ignore[misc]
             self._cache_time = time.time()
+            JWKS_REFRESHES.labels(outcome="success").inc()
             logger.info("JWKS refreshed", num_keys=len(self._keys))
 
         except Exception as e:
+            JWKS_REFRESHES.labels(outcome="error").inc()
             logger.error("Failed to fetch JWKS", error=str(e))
             raise UnauthorizedError("Failed to fetch signing keys") from e
 
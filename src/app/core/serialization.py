@@ -0,0 +1,100 @@
+"""JSON serialization for API responses and JSON logs.
+
+Uses orjson when it is installed (``pip install ".[fast]"``) and falls back
+to the standard library otherwise. Both backends produce the same bytes:
+compact separators, UTF-8 output (no ASCII escaping), floats formatted like
+``repr`` (output that may hold a float orjson writes differently is
+re-encoded with the standard library), and anything orjson would serialize
+natively but the standard library cannot (datetimes, dataclasses) is routed
+through ``default`` on both.
+"""
+import json
+import re
+from collections.abc import Callable
+from typing import Any
+
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when the extra is missing
+    orjson = None  # type: ignore[assignment]
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+if orjson is not None:
+    _ORJSON_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+# A float orjson formats differently from repr(): exponents (1e-7, not
+# 1e-07) or fixed notation below 1e-4 (0.00001, not 1e-05). Only matched
+# after a separator, so text values rarely trigger the fallback.
+_ORJSON_FLOAT_MISMATCH = re.compile(rb"[:,\[]-?(?:[0-9]+(?:\.[0-9]+)?e|0\.0000)")
+
+
+def dumps(obj: Any, default: Callable[[Any], Any] | None = None) -> bytes:
+    """Serialize an object to compact UTF-8 JSON.
+
+    Args:
+        obj: JSON-compatible object
+        default: Called for objects that are not JSON-serializable
+
+    Returns:
+        Encoded JSON
+
+    Raises:
+        TypeError: If the object cannot be serialized
+    """
+    if orjson is not None:
+        encoded = orjson.dumps(obj, default=default, option=_ORJSON_OPTIONS)
+        if not _ORJSON_FLOAT_MISMATCH.search(encoded):
+            return encoded
+    return json.dumps(
+        obj, default=default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def render_log_json(obj: Any, default: Callable[[Any], Any] | None = None, **kwargs: Any) -> str:
+    """Serializer for ``structlog.processors.JSONRenderer``.
+
+    Values orjson rejects (e.g. integers wider than 64 bits) fall back to the
+    standard library, so a log call never fails on serialization.
+
+    Args:
+        obj: Log event dictionary
+        default: Fallback for non-serializable values (supplied by structlog)
+        **kwargs: Ignored ``json.dumps`` options
+
+    Returns:
+        JSON log line
+    """
+    try:
+        return dumps(obj, default).decode("utf-8")
+    except TypeError:
+        return json.dumps(obj, default=default, ensure_ascii=False, separators=(",", ":"))
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with the fast backend.
+
+    Pydantic models are dumped to JSON-compatible data using field aliases
+    (camelCase), as FastAPI does for a ``response_model``, and everything is
+    encoded with ``dumps``, so the body is byte-identical to FastAPI's
+    ``JSONResponse`` (pydantic's own JSON serializer formats floats
+    differently, e.g. ``1e-7`` rather than ``1e-07``).
+    """
+
+    def render(self, content: Any) -> bytes:
+        """Encode the response body.
+
+        Args:
+            content: Pydantic model or JSON-compatible content
+
+        Returns:
+            Encoded body
+        """
+        if isinstance(content, BaseModel):
+            content = content.model_dump(mode="json", by_alias=True)
+        return dumps(content)
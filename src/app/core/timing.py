@@ -0,0 +1,112 @@
+"""Lightweight per-request phase timers.
+
+Phases are accumulated into a request-scoped collector held in a context
+variable. When no collector is active (timing disabled), ``phase()`` returns
+a shared no-op context manager, so instrumented code pays only a context
+variable lookup.
+"""
+import time
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+from types import TracebackType
+
+_current_timings: ContextVar["PhaseTimings | None"] = ContextVar("phase_timings", default=None)
+
+_NOOP: AbstractContextManager[None] = nullcontext()
+
+
+class PhaseTimings:
+    """Accumulated phase durations for a single request."""
+
+    __slots__ = ("phases",)
+
+    def __init__(self) -> None:
+        """Initialize an empty collector."""
+        self.phases: dict[str, float] = {}
+
+    def add(self, name: str, duration_ms: float) -> None:
+        """Add a duration to a phase (repeated phases are summed).
+
+        Args:
+            name: Phase name
+            duration_ms: Duration in milliseconds
+        """
+        self.phases[name] = self.phases.get(name, 0.0) + duration_ms
+
+    def rounded(self) -> dict[str, float]:
+        """Get phase durations rounded for logging.
+
+        Returns:
+            Mapping of phase name to duration in milliseconds
+        """
+        return {name: round(duration, 2) for name, duration in self.phases.items()}
+
+    def server_timing_header(self) -> str:
+        """Render the phases as a ``Server-Timing`` header value.
+
+        Returns:
+            Header value (e.g. ``"upload_read;dur=1.2, claude_call;dur=2310.4"``)
+        """
+        return ", ".join(f"{name};dur={duration:.1f}" for name, duration in self.phases.items())
+
+
+class _PhaseTimer:
+    """Context manager recording one phase into a collector."""
+
+    __slots__ = ("_timings", "_name", "_start")
+
+    def __init__(self, timings: PhaseTimings, name: str) -> None:
+        self._timings = timings
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self._timings.add(self._name, (time.perf_counter() - self._start) * 1000)
+
+
+def phase(name: str) -> AbstractContextManager[None]:
+    """Time a phase of the current request.
+
+    Args:
+        name: Phase name (e.g. "claude_call")
+
+    Returns:
+        Context manager recording the phase, or a no-op if timing is inactive
+    """
+    timings = _current_timings.get()
+    if timings is None:
+        return _NOOP
+    return _PhaseTimer(timings, name)
+
+
+def current_timings() -> PhaseTimings | None:
+    """Get the phase collector for the current request.
+
+    Returns:
+        Active collector, or None if timing is inactive
+    """
+    return _current_timings.get()
+
+
+@contextmanager
+def collect_phases() -> Iterator[PhaseTimings]:
+    """Activate a phase collector for the enclosed code.
+
+    Yields:
+        The active collector
+    """
+    timings = PhaseTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
@@ -0,0 +1,117 @@
+"""OpenTelemetry tracing setup and helpers.
+
+Spans are created through the global tracer provider. Until
+``setup_tracing`` installs an SDK provider, the API's no-op provider is
+used, so instrumented code runs unchanged when tracing is disabled.
+"""
+from typing import Literal
+
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SimpleSpanProcessor,
+    SpanExporter,
+)
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from structlog.typing import EventDict, WrappedLogger
+
+TRACER_NAME = "app"
+
+_provider: TracerProvider | None = None
+
+
+def setup_tracing(
+    service_name: str,
+    environment: str,
+    sample_rate: float,
+    exporter: Literal["otlp", "console"] | SpanExporter = "otlp",
+    otlp_endpoint: str | None = None,
+) -> TracerProvider:
+    """Install an SDK tracer provider as the global provider.
+
+    Args:
+        service_name: Name of the service (resource attribute)
+        environment: Environment (resource attribute)
+        sample_rate: Fraction of new traces to sample (0.0 to 1.0); sampled
+            parents from incoming trace context are always honoured
+        exporter: "otlp", "console", or an exporter instance (e.g. an
+            ``InMemorySpanExporter`` in tests, exported synchronously)
+        otlp_endpoint: OTLP/HTTP traces endpoint (when exporter is "otlp")
+
+    Returns:
+        The installed tracer provider
+    """
+    global _provider
+
+    provider = TracerProvider(
+        resource=Resource.create(
+            {"service.name": service_name, "deployment.environment": environment}
+        ),
+        sampler=ParentBased(TraceIdRatioBased(sample_rate)),
+    )
+
+    if exporter == "otlp":
+        # Optional dependency: pip install ".[otlp]"
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (  # type: ignore[import-not-found]
+            OTLPSpanExporter,
+        )
+
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=otlp_endpoint)))
+    elif exporter == "console":
+        provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter()))
+    else:
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+
+    trace.set_tracer_provider(provider)
+    _provider = provider
+    return provider
+
+
+def shutdown_tracing() -> None:
+    """Flush pending spans and shut down the tracer provider."""
+    if _provider is not None:
+        _provider.shutdown()
+
+
+def get_tracer() -> trace.Tracer:
+    """Get the application tracer.
+
+    Returns:
+        Tracer from the global provider
+    """
+    return trace.get_tracer(TRACER_NAME)
+
+
+def inject_trace_headers(headers: dict[str, str]) -> dict[str, str]:
+    """Add W3C trace context headers for an outgoing request.
+
+    Args:
+        headers: Outgoing request headers (modified in place)
+
+    Returns:
+        The same headers dict, for chaining
+    """
+    propagate.inject(headers)
+    return headers
+
+
+def add_trace_context(logger: WrappedLogger, method_name: str, event_dict: EventDict) -> EventDict:
+    """Add the current trace and span IDs to log events.
+
+    Args:
+        logger: The wrapped logger instance
+        method_name: Name of the method being called
+        event_dict: The event dictionary
+
+    Returns:
+        Event dictionary with trace_id/span_id when a span is recording
+    """
+    span_context = trace.get_current_span().get_span_context()
+    if span_context.is_valid:
+        event_dict["trace_id"] = format(span_context.trace_id, "032x")
+        event_dict["span_id"] = format(span_context.span_id, "016x")
+    return event_dict
+
@@ -1,22 +1,33 @@
 """FastAPI application entry point."""
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
-from datetime import datetime
 
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
 from starlette.middleware.cors import CORSMiddleware
 
 from app.config import settings
+from app.core.errors import error_response, exception_response
 from app.core.exceptions import AppException
-from app.core.logging import get_logger, setup_logging
+from app.core.executors import shutdown_executors
+from app.core.logging import get_logger, setup_logging, shutdown_logging
+from app.core.loop_monitor import loop_monitor
 from app.core.security import JWKSClient, JWTValidator
+from app.core.serialization import JSON_BACKEND, FastJSONResponse
+from app.core.tracing import setup_tracing, shutdown_tracing
 from app.middleware.auth import JWTAuthMiddleware
+from app.middleware.body_limit import BodySizeLimitMiddleware
+from app.middleware.load_shedding import LoadSheddingMiddleware
 from app.middleware.logging import LoggingMiddleware
+from app.middleware.metrics import MetricsMiddleware
 from app.middleware.request_id import RequestIDMiddleware
-from app.routers import health, referral
-from app.schemas.common import ErrorDetail, ErrorResponse
+from app.middleware.server_timing import ServerTimingMiddleware
+from app.middleware.tracing import TracingMiddleware, fastapi_telemetry_options
+from app.routers import health, metrics, referral
+from app.schemas.common import ErrorDetail
+from app.services.health_monitor import health_monitor
+from app.services.referral_scanner import max_image_size_bytes
+from app.services.warmup import warmup
 
 
 @asynccontextmanager
@@ -35,18 +46,38 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
         environment=settings.environment,
         log_level=settings.log_level,
         log_json=settings.log_json,
+        sample_rates=settings.log_sample_rates,
+        queue_size=settings.log_queue_size,
     )
+    if settings.tracing_enabled:
+        setup_tracing(
+            service_name=settings.service_name,
+            environment=settings.environment,
+            sample_rate=settings.tracing_sample_rate,
+            exporter=settings.tracing_exporter,
+            otlp_endpoint=settings.tracing_otlp_endpoint,
+        )
     logger = get_logger(__name__)
     logger.info(
         "Application starting",
         service=settings.service_name,
         environment=settings.environment,
+        json_backend=JSON_BACKEND,
     )
+    loop_monitor.start()
+    health_monitor.start()
+    warmup.start()
 
     yield
 
     # Shutdown
     logger.info("Application shutting down")
+    await warmup.stop()
+    await health_monitor.stop()
+    await loop_monitor.stop()
+    shutdown_executors()
+    shutdown_tracing()
+    shutdown_logging()
 
 
 # Create FastAPI application
@@ -58,6 +89,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    **fastapi_telemetry_options(),
 )
 
 # Get logger
@@ -68,7 +100,7 @@ logger = get_logger(__name__)
 
 
 @app.exception_handler(AppException)
-async def app_exception_handler(request: Request, exc: AppException) -> JSONResponse:
+async def app_exception_handler(request: Request, exc: AppException) -> FastJSONResponse:
     """Handle custom application exceptions.
 
     Args:
@@ -85,21 +117,13 @@ async def app_exception_handler(request: Request, exc: AppException) -> JSONResp
         path=request.url.path,
     )
 
-    return JSONResponse(
-        status_code=exc.status_code,
-        content=ErrorResponse(
-            error=exc.__class__.__name__,
-            message=exc.detail,
-            request_id=getattr(request.state, "request_id", None),
-            timestamp=datetime.now(),
-        ).model_dump(mode="json"),
-    )
+    return exception_response(exc, getattr(request.state, "request_id", None))
 
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(
     request: Request, exc: RequestValidationError
-) -> JSONResponse:
+) -> FastJSONResponse:
     """Handle Pydantic validation errors.
 
     Args:
@@ -120,20 +144,17 @@ async def validation_exception_handler(
         for error in exc.errors()
     ]
 
-    return JSONResponse(
-        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-        content=ErrorResponse(
-            error="ValidationError",
-            message="Request validation failed",
-            details=details,
-            request_id=getattr(request.state, "request_id", None),
-            timestamp=datetime.now(),
-        ).model_dump(mode="json"),
+    return error_response(
+        status.HTTP_422_UNPROCESSABLE_ENTITY,
+        "ValidationError",
+        "Request validation failed",
+        getattr(request.state, "request_id", None),
+        details=details,
     )
 
 
 @app.exception_handler(Exception)
-async def generic_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+async def generic_exception_handler(request: Request, exc: Exception) -> FastJSONResponse:
     """Handle unexpected exceptions.
 
     Args:
@@ -150,14 +171,11 @@ async def generic_exception_handler(request: Request, exc: Exception) -> JSONRes
         path=request.url.path,
     )
 
-    return JSONResponse(
-        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        content=ErrorResponse(
-            error="InternalServerError",
-            message="An unexpected error occurred",
-            request_id=getattr(request.state, "request_id", None),
-            timestamp=datetime.now(),
-        ).model_dump(mode="json"),
+    return error_response(
+        status.HTTP_500_INTERNAL_SERVER_ERROR,
+        "InternalServerError",
+        "An unexpected error occurred",
+        getattr(request.state, "request_id", None),
     )
 
 
@@ -182,10 +200,43 @@ if settings.jwt_enabled:
         audience=settings.jwt_audience,
     )
     app.add_middleware(JWTAuthMiddleware, jwt_validator=jwt_validator)
+    if "jwks" in settings.warmup_steps:
+        warmup.steps["jwks"] = jwks_client.prefetch
+
+# Load shedding (outside auth, so overloaded requests are rejected before any work)
+if settings.load_shedding_enabled:
+    app.add_middleware(
+        LoadSheddingMiddleware,
+        lag_monitor=loop_monitor,
+        paths=settings.load_shedding_paths,
+        max_loop_lag_seconds=settings.load_shedding_max_loop_lag_seconds,
+        max_in_flight=settings.load_shedding_max_in_flight,
+        max_in_flight_bytes=int(settings.load_shedding_max_in_flight_mb * 1024 * 1024),
+        retry_after_seconds=settings.load_shedding_retry_after_seconds,
+    )
+
+# Upload size limit (outside load shedding, so oversized bodies never count as in flight)
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    paths=settings.upload_limit_paths,
+    max_body_bytes=max_image_size_bytes() + settings.upload_overhead_kb * 1024,
+)
 
 # Logging
 app.add_middleware(LoggingMiddleware)
 
+# Per-phase timings (outside logging so the completion log line can include them)
+if settings.server_timing_enabled:
+    app.add_middleware(ServerTimingMiddleware)
+
+# Request latency metrics
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
+# Tracing (inside request ID so the server span can carry it)
+if settings.tracing_enabled:
+    app.add_middleware(TracingMiddleware)
+
 # Request ID (should be first, applied last)
 app.add_middleware(RequestIDMiddleware)
 
@@ -193,6 +244,8 @@ app.add_middleware(RequestIDMiddleware)
 # Routers
 app.include_router(health.router)
 app.include_router(referral.router)
+if settings.metrics_enabled:
+    app.include_router(metrics.router)
 
 
 @app.get("/", include_in_schema=False)
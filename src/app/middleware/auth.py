@@ -1,9 +1,8 @@
 """JWT authentication middleware."""
-from typing import Any
-
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 
+from app.core.errors import exception_response
 from app.core.exceptions import UnauthorizedError
 from app.core.logging import get_logger
 from app.core.security import JWTValidator, extract_bearer_token
@@ -11,74 +10,104 @@ from app.core.security import JWTValidator, extract_bearer_token
 logger = get_logger(__name__)
 
 
-class JWTAuthMiddleware(BaseHTTPMiddleware):
+class JWTAuthMiddleware:
     """Middleware for JWT authentication."""
 
     # Paths that don't require authentication
-    EXCLUDED_PATHS = {"/health", "/ready", "/docs", "/redoc", "/openapi.json"}
+    EXCLUDED_PATHS = {"/health", "/ready", "/metrics", "/docs", "/redoc", "/openapi.json"}
 
-    def __init__(self, app: Any, jwt_validator: JWTValidator) -> None:
+    def __init__(self, app: ASGIApp, jwt_validator: JWTValidator) -> None:
         """Initialize middleware.
 
         Args:
-            app: FastAPI application
+            app: Downstream ASGI application
             jwt_validator: JWT validator instance
         """
-        super().__init__(app)
+        self.app = app
         self.jwt_validator = jwt_validator
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process request and validate JWT.
 
-        Args:
-            request: FastAPI request
-            call_next: Next middleware/endpoint
-
-        Returns:
-            Response from endpoint
+        Authentication failures are answered directly with a 401 error
+        response, since exceptions raised here would bypass the
+        application's exception handlers.
 
-        Raises:
-            UnauthorizedError: If authentication fails
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Skip authentication for OPTIONS requests (CORS preflight)
-        if request.method == "OPTIONS":
-            return await call_next(request)
+        if scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
 
         # Skip authentication for excluded paths
-        if request.url.path in self.EXCLUDED_PATHS:
-            return await call_next(request)
+        if scope["path"] in self.EXCLUDED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
 
         try:
             # Extract and validate token
-            authorization = request.headers.get("Authorization")
+            authorization = Headers(scope=scope).get("Authorization")
             token = extract_bearer_token(authorization)
             claims = await self.jwt_validator.validate_token(token)
 
             # Extract standard claims
-            request.state.user_id = claims.get("sub")
-            request.state.organization_id = claims.get("organization_id") or claims.get("org_id")
-            request.state.roles = claims.get("roles", [])
-            request.state.email = claims.get("email")
+            state["user_id"] = claims.get("sub")
+            state["organization_id"] = claims.get("organization_id") or claims.get("org_id")
+            state["roles"] = claims.get("roles", [])
+            state["email"] = claims.get("email")
 
             # Validate required claims
-            if not request.state.user_id:
+            if not state["user_id"]:
                 raise UnauthorizedError("Token missing 'sub' claim")
 
-            if not request.state.organization_id:
+            if not state["organization_id"]:
                 raise UnauthorizedError("Token missing 'organization_id' claim")
 
-            logger.debug(
-                "Request authenticated",
-                user_id=request.state.user_id,
-                organization_id=request.state.organization_id,
+        except UnauthorizedError as e:
+            await self._unauthorized(e, scope, receive, send)
+            return
+        except Exception as e:
+            logger.error("Authentication failed", error=str(e))
+            await self._unauthorized(
+                UnauthorizedError("Authentication failed"), scope, receive, send
             )
+            return
 
-            return await call_next(request)
+        logger.debug(
+            "Request authenticated",
+            user_id=state["user_id"],
+            organization_id=state["organization_id"],
+        )
 
-        except UnauthorizedError:
-            raise
-        except Exception as e:
-            logger.error("Authentication failed", error=str(e))
-            raise UnauthorizedError("Authentication failed") from e
+        await self.app(scope, receive, send)
 
+    async def _unauthorized(
+        self, exc: UnauthorizedError, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        """Send a 401 error response in the standard error format.
 
+        Args:
+            exc: Authentication error
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
+        """
+        logger.warning(
+            "Application exception",
+            error=exc.detail,
+            status_code=exc.status_code,
+            path=scope["path"],
+        )
+
+        response = exception_response(exc, scope.get("state", {}).get("request_id"))
+        await response(scope, receive, send)
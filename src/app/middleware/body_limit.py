@@ -0,0 +1,122 @@
+"""Request body size limit middleware for upload routes."""
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.errors import exception_response
+from app.core.exceptions import PayloadTooLargeError
+from app.core.logging import get_logger
+from app.core.metrics import UPLOAD_REJECTIONS
+
+logger = get_logger(__name__)
+
+
+class _BodyTooLarge(Exception):
+    """Raised from ``receive`` to abort reading an oversized body."""
+
+
+class BodySizeLimitMiddleware:
+    """Middleware rejecting oversized request bodies before they are buffered.
+
+    Without it the multipart parser spools the whole upload (to memory, then
+    a temporary file) before the endpoint can compare its size with the
+    limit. Requests to the limited paths are answered with 413:
+
+    - before anything is read, when the declared ``Content-Length`` is over
+      the limit
+    - as soon as the bytes received cross the limit, for chunked uploads or
+      bodies longer than declared; the rest of the body is never read
+
+    Other routes are passed through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, paths: list[str], max_body_bytes: int) -> None:
+        """Initialize middleware.
+
+        Args:
+            app: Downstream ASGI application
+            paths: Paths whose request bodies are limited
+            max_body_bytes: Largest accepted request body (including multipart framing)
+        """
+        self.app = app
+        self.paths = set(paths)
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Check the declared size and cap the request stream.
+
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
+        """
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length is not None and content_length.isdigit():
+            if int(content_length) > self.max_body_bytes:
+                await self._reject("content_length", int(content_length), scope, receive, send)
+                return
+
+        received = 0
+        response_started = False
+        rejected = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, rejected
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes and not response_started:
+                    rejected = True
+                    await self._reject("stream", received, scope, receive, send)
+                    raise _BodyTooLarge
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            nonlocal response_started
+            # Once the 413 is out, whatever the app answers to the aborted read is dropped
+            if rejected:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            # Errors caused by aborting the read were already answered with the 413
+            if not rejected:
+                raise
+
+    async def _reject(
+        self, reason: str, size: int, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        """Send a 413 error response.
+
+        Args:
+            reason: ``content_length`` (declared) or ``stream`` (received bytes)
+            size: Declared or received body size in bytes
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
+        """
+        UPLOAD_REJECTIONS.labels(route=scope["path"], reason=reason).inc()
+        logger.warning(
+            "Request body too large",
+            reason=reason,
+            path=scope["path"],
+            size_bytes=size,
+            max_bytes=self.max_body_bytes,
+        )
+
+        exc = PayloadTooLargeError(
+            f"Request body too large. Maximum size: {self.max_body_bytes // 1024} KB",
+            max_bytes=self.max_body_bytes,
+        )
+        # The rest of the body is not read, so the connection cannot be reused
+        response = exception_response(
+            exc, scope.get("state", {}).get("request_id"), headers={"Connection": "close"}
+        )
+        await response(scope, receive, send)
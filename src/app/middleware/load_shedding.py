@@ -0,0 +1,145 @@
+"""Load shedding middleware for expensive routes."""
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.errors import exception_response
+from app.core.exceptions import ServiceUnavailableError
+from app.core.logging import get_logger
+from app.core.loop_monitor import LoopLagMonitor
+from app.core.metrics import LOAD_SHED_REJECTIONS, REQUEST_BYTES_IN_FLIGHT, REQUESTS_IN_FLIGHT
+
+logger = get_logger(__name__)
+
+
+class LoadSheddingMiddleware:
+    """Middleware rejecting expensive requests early when overloaded.
+
+    Every HTTP request counts towards the in-flight request count and (by
+    its declared ``Content-Length``) the in-flight byte total. Requests to
+    the shed paths are answered with 503 and ``Retry-After``, before auth
+    and before the body is read, when event loop lag, the in-flight count
+    or the in-flight bytes exceed their limits. Other routes (``/health``,
+    cheap lookups) are always served.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        lag_monitor: LoopLagMonitor,
+        paths: list[str],
+        max_loop_lag_seconds: float,
+        max_in_flight: int,
+        max_in_flight_bytes: int,
+        retry_after_seconds: int,
+    ) -> None:
+        """Initialize middleware.
+
+        Args:
+            app: Downstream ASGI application
+            lag_monitor: Event loop lag monitor providing the latest lag sample
+            paths: Paths of expensive routes that may be shed
+            max_loop_lag_seconds: Loop lag above which requests are shed (0 disables)
+            max_in_flight: In-flight requests at which requests are shed (0 disables)
+            max_in_flight_bytes: In-flight body bytes above which requests are shed (0 disables)
+            retry_after_seconds: ``Retry-After`` value for shed requests
+        """
+        self.app = app
+        self.lag_monitor = lag_monitor
+        self.paths = set(paths)
+        self.max_loop_lag_seconds = max_loop_lag_seconds
+        self.max_in_flight = max_in_flight
+        self.max_in_flight_bytes = max_in_flight_bytes
+        self.retry_after_seconds = retry_after_seconds
+        self.in_flight = 0
+        self.in_flight_bytes = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Admit or shed the request.
+
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = _content_length(scope)
+
+        if scope["path"] in self.paths:
+            reason = self._overload_reason(content_length)
+            if reason is not None:
+                await self._reject(reason, scope, receive, send)
+                return
+
+        self.in_flight += 1
+        self.in_flight_bytes += content_length
+        REQUESTS_IN_FLIGHT.inc()
+        REQUEST_BYTES_IN_FLIGHT.inc(content_length)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+            self.in_flight_bytes -= content_length
+            REQUESTS_IN_FLIGHT.dec()
+            REQUEST_BYTES_IN_FLIGHT.dec(content_length)
+
+    def _overload_reason(self, content_length: int) -> str | None:
+        """Check the shedding triggers for a new request.
+
+        Args:
+            content_length: Declared body size of the new request
+
+        Returns:
+            Reason label of the first exceeded limit, or None to admit
+        """
+        if self.max_loop_lag_seconds and self.lag_monitor.lag_seconds > self.max_loop_lag_seconds:
+            return "loop_lag"
+        if self.max_in_flight and self.in_flight >= self.max_in_flight:
+            return "in_flight"
+        if self.max_in_flight_bytes and (
+            self.in_flight_bytes + content_length > self.max_in_flight_bytes
+        ):
+            return "in_flight_bytes"
+        return None
+
+    async def _reject(self, reason: str, scope: Scope, receive: Receive, send: Send) -> None:
+        """Send a 503 error response with ``Retry-After``.
+
+        Args:
+            reason: Trigger that caused the rejection
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
+        """
+        LOAD_SHED_REJECTIONS.labels(route=scope["path"], reason=reason).inc()
+        logger.warning(
+            "Request shed",
+            reason=reason,
+            path=scope["path"],
+            in_flight=self.in_flight,
+            in_flight_bytes=self.in_flight_bytes,
+            loop_lag_ms=round(self.lag_monitor.lag_seconds * 1000, 2),
+        )
+
+        exc = ServiceUnavailableError(
+            "Service overloaded, please retry later", retry_after=self.retry_after_seconds
+        )
+        response = exception_response(exc, scope.get("state", {}).get("request_id"))
+        await response(scope, receive, send)
+
+
+def _content_length(scope: Scope) -> int:
+    """Get the declared request body size.
+
+    Args:
+        scope: ASGI connection scope
+
+    Returns:
+        Content-Length in bytes, or 0 if absent or invalid
+    """
+    value = Headers(scope=scope).get("content-length")
+    if value is None or not value.isdigit():
+        return 0
+    return int(value)
@@ -1,61 +1,105 @@
 """Request logging middleware."""
 import time
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from app.core.logging import get_logger
+from app.core.logging import (
+    get_logger,
+    keep_request_logs,
+    reset_request_sampling,
+    sample_request_logs,
+)
+from app.core.timing import current_timings
 
 logger = get_logger(__name__)
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
+class LoggingMiddleware:
     """Middleware to log HTTP requests and responses."""
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+    def __init__(self, app: ASGIApp) -> None:
+        """Initialize middleware.
+
+        Args:
+            app: Downstream ASGI application
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process and log request/response.
 
         Args:
-            request: FastAPI request
-            call_next: Next middleware/endpoint
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        Returns:
-            Response from endpoint
+        # Sample INFO/DEBUG lines of high-volume routes (whole request at once)
+        sampling_token = sample_request_logs(scope["path"])
+        try:
+            await self._process(scope, receive, send)
+        finally:
+            reset_request_sampling(sampling_token)
+
+    async def _process(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Run the request and log its start and outcome.
+
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
+        method = scope["method"]
+        path = scope["path"]
+        query_string = scope.get("query_string", b"")
+        status_code = 500
 
         # Log request
         logger.info(
             "Request started",
-            method=request.method,
-            path=request.url.path,
-            query=str(request.url.query) if request.url.query else None,
+            method=method,
+            path=path,
+            query=query_string.decode("latin-1") if query_string else None,
         )
 
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
         # Process request
         try:
-            response = await call_next(request)
-            duration = time.time() - start_time
-
-            # Log response
-            logger.info(
-                "Request completed",
-                method=request.method,
-                path=request.url.path,
-                status_code=response.status_code,
-                duration_ms=round(duration * 1000, 2),
-            )
-
-            return response
-
+            await self.app(scope, receive, send_with_status)
         except Exception as e:
-            duration = time.time() - start_time
+            duration = time.perf_counter() - start_time
 
             logger.error(
                 "Request failed",
-                method=request.method,
-                path=request.url.path,
+                method=method,
+                path=path,
                 error=str(e),
                 duration_ms=round(duration * 1000, 2),
             )
             raise
+
+        duration = time.perf_counter() - start_time
+        timings = current_timings()
+
+        # Unsuccessful requests are always logged
+        if status_code >= 400:
+            keep_request_logs()
+
+        # Log response (with the per-phase breakdown when timing is enabled)
+        logger.info(
+            "Request completed",
+            method=method,
+            path=path,
+            status_code=status_code,
+            duration_ms=round(duration * 1000, 2),
+            phase_ms=timings.rounded() if timings and timings.phases else None,
+        )
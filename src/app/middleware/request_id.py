@@ -2,39 +2,52 @@
 import uuid
 
 import structlog
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    """Middleware to generate and propagate request IDs."""
+class RequestIDMiddleware:
+    """Middleware to generate and propagate request IDs.
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        """Process request and add request ID.
+    Implemented as raw ASGI middleware so the request ID is bound to the
+    structlog context in the same task that runs the endpoint, and the
+    response body is streamed through untouched.
+    """
 
-        Args:
-            request: FastAPI request
-            call_next: Next middleware/endpoint
+    HEADER_NAME = "X-Request-ID"
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Initialize middleware.
 
-        Returns:
-            Response with X-Request-ID header
+        Args:
+            app: Downstream ASGI application
         """
-        # Get or generate request ID
-        request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
+        self.app = app
 
-        # Bind to structlog context
-        structlog.contextvars.bind_contextvars(request_id=request_id)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Process request and add request ID.
 
-        # Store in request state for handlers
-        request.state.request_id = request_id
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        # Process request
-        response = await call_next(request)
+        # Get or generate request ID
+        request_id = Headers(scope=scope).get(self.HEADER_NAME) or str(uuid.uuid4())
 
-        # Add to response headers
-        response.headers["X-Request-ID"] = request_id
+        # Store in request state for handlers
+        scope.setdefault("state", {})["request_id"] = request_id
 
-        # Clear context
-        structlog.contextvars.clear_contextvars()
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Add to response headers
+                MutableHeaders(scope=message)[self.HEADER_NAME] = request_id
+            await send(message)
 
-        return response
+        # Bind to structlog context for the lifetime of the request only
+        with structlog.contextvars.bound_contextvars(request_id=request_id):
+            await self.app(scope, receive, send_with_request_id)
@@ -0,0 +1,50 @@
+"""Server-Timing middleware exposing per-phase request latency."""
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import REQUEST_PHASE_SECONDS
+from app.core.timing import collect_phases
+
+
+class ServerTimingMiddleware:
+    """Middleware to collect phase timings and report them.
+
+    Phases recorded with ``app.core.timing.phase`` during the request are
+    added as a ``Server-Timing`` response header and observed in the
+    per-phase histogram once the response is complete.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Initialize middleware.
+
+        Args:
+            app: Downstream ASGI application
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Process request with an active phase collector.
+
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with collect_phases() as timings:
+
+            async def send_with_timing(message: Message) -> None:
+                if message["type"] == "http.response.start" and timings.phases:
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing", timings.server_timing_header()
+                    )
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                for name, duration_ms in timings.phases.items():
+                    REQUEST_PHASE_SECONDS.labels(phase=name).observe(duration_ms / 1000)
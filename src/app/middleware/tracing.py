@@ -0,0 +1,86 @@
+"""OpenTelemetry server span middleware."""
+import inspect
+from typing import Any
+
+from fastapi import FastAPI
+from opentelemetry import propagate, trace
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.tracing import get_tracer
+
+
+def fastapi_telemetry_options() -> dict[str, Any]:
+    """Get the ``FastAPI`` arguments disabling its built-in request spans.
+
+    FastAPI versions with native OpenTelemetry support open their own server
+    span once a tracer provider is installed, extracted from the request
+    headers rather than nested in the current span. ``TracingMiddleware``
+    already opens one (named after the route, with the request ID), and a
+    second would leave the spans of the request under a sibling of it.
+
+    Returns:
+        Keyword arguments for ``FastAPI()`` (empty for versions without telemetry)
+    """
+    if "telemetry" not in inspect.signature(FastAPI.__init__).parameters:
+        return {}
+    return {"telemetry": {"tracing": False}}
+
+
+class TracingMiddleware:
+    """Middleware to run each request in a server span.
+
+    Incoming W3C trace context (``traceparent``) is honoured, so spans join
+    the caller's trace. The span is renamed to the matched route template
+    once routing has happened.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Initialize middleware.
+
+        Args:
+            app: Downstream ASGI application
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Process request inside a server span.
+
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        parent_context = propagate.extract(Headers(scope=scope))
+
+        with get_tracer().start_as_current_span(
+            method,
+            context=parent_context,
+            kind=trace.SpanKind.SERVER,
+            attributes={
+                "http.request.method": method,
+                "url.path": scope["path"],
+                "request_id": scope.get("state", {}).get("request_id", ""),
+            },
+        ) as span:
+
+            async def send_with_status(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    span.set_attribute("http.response.status_code", status_code)
+                    if status_code >= 500:
+                        span.set_status(trace.StatusCode.ERROR)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    span.update_name(f"{method} {route.path}")
+                    span.set_attribute("http.route", route.path)
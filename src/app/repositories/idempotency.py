@@ -0,0 +1,329 @@
+"""Idempotency record stores.
+
+A record is claimed (``in_progress``) when a request with a new
+Idempotency-Key starts and holds the response once it completes. Records
+expire: in-progress claims after a lock timeout (so a crashed instance does
+not block the key forever) and completed ones after the retention window.
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Literal
+
+from app.core import executors
+
+IdempotencyStatus = Literal["in_progress", "completed"]
+
+
+class StoredResponse:
+    """Response kept for replaying to duplicate requests."""
+
+    __slots__ = ("status_code", "body", "media_type")
+
+    def __init__(self, status_code: int, body: bytes, media_type: str | None) -> None:
+        """Initialize stored response.
+
+        Args:
+            status_code: HTTP status code
+            body: Response body
+            media_type: Response content type
+        """
+        self.status_code = status_code
+        self.body = body
+        self.media_type = media_type
+
+
+class IdempotencyRecord:
+    """State of one Idempotency-Key within an organization."""
+
+    __slots__ = ("organization_id", "key", "fingerprint", "status", "expires_at", "response")
+
+    def __init__(
+        self,
+        organization_id: str,
+        key: str,
+        fingerprint: str,
+        status: IdempotencyStatus,
+        expires_at: float,
+        response: StoredResponse | None = None,
+    ) -> None:
+        """Initialize record.
+
+        Args:
+            organization_id: Organization ID for multi-tenancy
+            key: Idempotency-Key header value
+            fingerprint: Hash of the request the key was first used with
+            status: Whether the request is still running or has completed
+            expires_at: Unix time after which the record is ignored
+            response: Stored response (completed records only)
+        """
+        self.organization_id = organization_id
+        self.key = key
+        self.fingerprint = fingerprint
+        self.status = status
+        self.expires_at = expires_at
+        self.response = response
+
+    @property
+    def expired(self) -> bool:
+        """Whether the record has expired."""
+        return time.time() >= self.expires_at
+
+
+class IdempotencyStore(ABC):
+    """Abstract base class for idempotency record stores.
+
+    Records are scoped by organization_id, so keys never collide across tenants.
+    """
+
+    @abstractmethod
+    async def get(self, organization_id: str, key: str) -> IdempotencyRecord | None:
+        """Get the unexpired record for a key.
+
+        Args:
+            organization_id: Organization ID for multi-tenancy
+            key: Idempotency-Key header value
+
+        Returns:
+            Record if found and not expired, None otherwise
+        """
+        ...
+
+    @abstractmethod
+    async def claim(self, record: IdempotencyRecord) -> bool:
+        """Store an in-progress record unless an unexpired one exists.
+
+        Args:
+            record: In-progress record
+
+        Returns:
+            True if claimed, False if another request holds the key
+        """
+        ...
+
+    @abstractmethod
+    async def complete(self, record: IdempotencyRecord) -> None:
+        """Store the completed record (with its response).
+
+        Args:
+            record: Completed record
+        """
+        ...
+
+    @abstractmethod
+    async def release(self, organization_id: str, key: str) -> None:
+        """Delete an in-progress claim, so the request can be retried.
+
+        Args:
+            organization_id: Organization ID for multi-tenancy
+            key: Idempotency-Key header value
+        """
+        ...
+
+
+class InMemoryIdempotencyStore(IdempotencyStore):
+    """Per-process store (single instance deployments and tests)."""
+
+    def __init__(self, max_records: int = 10000) -> None:
+        """Initialize store.
+
+        Args:
+            max_records: Records kept before the oldest are evicted
+        """
+        self.max_records = max_records
+        self._records: dict[tuple[str, str], IdempotencyRecord] = {}
+
+    async def get(self, organization_id: str, key: str) -> IdempotencyRecord | None:
+        """Get the unexpired record for a key."""
+        record = self._records.get((organization_id, key))
+        if record is None or record.expired:
+            return None
+        return record
+
+    async def claim(self, record: IdempotencyRecord) -> bool:
+        """Store an in-progress record unless an unexpired one exists."""
+        slot = (record.organization_id, record.key)
+        existing = self._records.get(slot)
+        if existing is not None and not existing.expired:
+            return False
+        self._records.pop(slot, None)
+        self._prune()
+        self._records[slot] = record
+        return True
+
+    async def complete(self, record: IdempotencyRecord) -> None:
+        """Store the completed record (with its response)."""
+        self._records[(record.organization_id, record.key)] = record
+
+    async def release(self, organization_id: str, key: str) -> None:
+        """Delete an in-progress claim."""
+        record = self._records.get((organization_id, key))
+        if record is not None and record.status == "in_progress":
+            del self._records[(organization_id, key)]
+
+    def _prune(self) -> None:
+        """Drop expired records, then the oldest ones above ``max_records``."""
+        if len(self._records) < self.max_records:
+            return
+        for slot in [slot for slot, record in self._records.items() if record.expired]:
+            del self._records[slot]
+        # Dicts keep insertion order, so the first records are the oldest
+        while len(self._records) >= self.max_records:
+            del self._records[next(iter(self._records))]
+
+
+class DynamoDBIdempotencyStore(IdempotencyStore):
+    """Store shared by all instances, in a DynamoDB table.
+
+    The table has a string hash key ``PK`` (``<organization_id>#<key>``);
+    enable DynamoDB TTL on ``expires_at`` to have expired records removed.
+    Conditional writes make claims atomic across instances.
+    """
+
+    def __init__(self, table_name: str, region: str, endpoint_url: str | None = None) -> None:
+        """Initialize store.
+
+        Args:
+            table_name: DynamoDB table name
+            region: AWS region
+            endpoint_url: Custom endpoint (e.g. LocalStack), or None for AWS
+        """
+        self.table_name = table_name
+        self.region = region
+        self.endpoint_url = endpoint_url
+        self._client: Any = None
+        self._client_lock = threading.Lock()
+
+    async def get(self, organization_id: str, key: str) -> IdempotencyRecord | None:
+        """Get the unexpired record for a key."""
+        response = await executors.blocking.run(
+            self._get_client().get_item,
+            TableName=self.table_name,
+            Key={"PK": {"S": _partition_key(organization_id, key)}},
+            ConsistentRead=True,
+        )
+        item = response.get("Item")
+        if item is None:
+            return None
+        record = _from_item(organization_id, key, item)
+        return None if record.expired else record
+
+    async def claim(self, record: IdempotencyRecord) -> bool:
+        """Store an in-progress record unless an unexpired one exists."""
+        from botocore.exceptions import ClientError
+
+        try:
+            await executors.blocking.run(
+                self._get_client().put_item,
+                TableName=self.table_name,
+                Item=_to_item(record),
+                ConditionExpression="attribute_not_exists(PK) OR expires_at < :now",
+                ExpressionAttributeValues={":now": {"N": str(time.time())}},
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException":
+                return False
+            raise
+        return True
+
+    async def complete(self, record: IdempotencyRecord) -> None:
+        """Store the completed record (with its response)."""
+        await executors.blocking.run(
+            self._get_client().put_item, TableName=self.table_name, Item=_to_item(record)
+        )
+
+    async def release(self, organization_id: str, key: str) -> None:
+        """Delete an in-progress claim."""
+        from botocore.exceptions import ClientError
+
+        try:
+            await executors.blocking.run(
+                self._get_client().delete_item,
+                TableName=self.table_name,
+                Key={"PK": {"S": _partition_key(organization_id, key)}},
+                ConditionExpression="#status = :in_progress",
+                ExpressionAttributeNames={"#status": "status"},
+                ExpressionAttributeValues={":in_progress": {"S": "in_progress"}},
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+                raise
+
+    def _get_client(self) -> Any:
+        """Get the DynamoDB client, creating it on first use.
+
+        Returns:
+            boto3 DynamoDB client
+        """
+        with self._client_lock:
+            if self._client is None:
+                import boto3
+
+                self._client = boto3.session.Session().client(
+                    "dynamodb", region_name=self.region, endpoint_url=self.endpoint_url
+                )
+            return self._client
+
+
+def _partition_key(organization_id: str, key: str) -> str:
+    """Build the DynamoDB partition key for a record.
+
+    Args:
+        organization_id: Organization ID for multi-tenancy
+        key: Idempotency-Key header value
+
+    Returns:
+        Partition key
+    """
+    return f"{organization_id}#{key}"
+
+
+def _to_item(record: IdempotencyRecord) -> dict[str, Any]:
+    """Convert a record to a DynamoDB item.
+
+    Args:
+        record: Idempotency record
+
+    Returns:
+        DynamoDB item (low-level attribute value format)
+    """
+    item: dict[str, Any] = {
+        "PK": {"S": _partition_key(record.organization_id, record.key)},
+        "fingerprint": {"S": record.fingerprint},
+        "status": {"S": record.status},
+        "expires_at": {"N": str(int(record.expires_at))},
+    }
+    if record.response is not None:
+        item["status_code"] = {"N": str(record.response.status_code)}
+        item["body"] = {"B": record.response.body}
+        if record.response.media_type:
+            item["media_type"] = {"S": record.response.media_type}
+    return item
+
+
+def _from_item(organization_id: str, key: str, item: dict[str, Any]) -> IdempotencyRecord:
+    """Convert a DynamoDB item to a record.
+
+    Args:
+        organization_id: Organization ID for multi-tenancy
+        key: Idempotency-Key header value
+        item: DynamoDB item
+
+    Returns:
+        Idempotency record
+    """
+    response = None
+    if "status_code" in item:
+        response = StoredResponse(
+            status_code=int(item["status_code"]["N"]),
+            body=bytes(item["body"]["B"]),
+            media_type=item.get("media_type", {}).get("S"),
+        )
+    return IdempotencyRecord(
+        organization_id=organization_id,
+        key=key,
+        fingerprint=item["fingerprint"]["S"],
+        status=item["status"]["S"],
+        expires_at=float(item["expires_at"]["N"]),
+        response=response,
+    )
@@ -1,10 +1,13 @@
 """Health check endpoints."""
 from datetime import UTC, datetime
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Response, status
 
 from app.config import settings
+from app.core.loop_monitor import loop_monitor
 from app.schemas.common import HealthResponse, ReadinessResponse
+from app.services.health_monitor import health_monitor
+from app.services.warmup import warmup
 
 router = APIRouter(tags=["Health"])
 
@@ -36,29 +39,33 @@ async def health_check() -> HealthResponse:
     status_code=status.HTTP_200_OK,
     summary="Readiness check",
     description="Readiness check to verify service dependencies are available",
+    responses={status.HTTP_503_SERVICE_UNAVAILABLE: {"model": ReadinessResponse}},
 )
-async def readiness_check() -> ReadinessResponse:
+async def readiness_check(response: Response) -> ReadinessResponse:
     """Check if the service is ready to handle requests.
 
-    This should check all critical dependencies (database, cache, etc.)
+    Answers from the background health monitor's cached results (Anthropic,
+    test catalog, JWKS, OAuth), so probes never call dependencies directly.
+    The service is not ready until the startup warm-up has finished.
+
+    Args:
+        response: Response used to set 503 when not ready
 
     Returns:
         Readiness status response
     """
-    checks: dict[str, bool] = {}
-
-    # TODO: Add actual dependency checks
-    # Example:
-    # checks["database"] = await check_database()
-    # checks["cache"] = await check_cache()
-
-    # For now, assume all checks pass
-    checks["example"] = True
+    dependencies = health_monitor.statuses()
+    checks = {name: dependency.healthy for name, dependency in dependencies.items()}
+    checks["warmup"] = warmup.completed
 
     all_ready = all(checks.values())
+    if not all_ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
 
     return ReadinessResponse(
         ready=all_ready,
         checks=checks,
+        dependencies=dependencies,
+        event_loop_lag_ms=round(loop_monitor.lag_seconds * 1000, 2),
         timestamp=datetime.now(UTC),
     )
@@ -1,33 +1,103 @@
 """Referral scanning API endpoints."""
 import time
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack
 from datetime import datetime
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Header,
+    HTTPException,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
 
 from app.config import settings
-from app.core.exceptions import ValidationError
+from app.core import executors
+from app.core.exceptions import NotFoundError, ServiceUnavailableError, ValidationError
 from app.core.logging import get_logger
+from app.core.metrics import SCANS_IN_FLIGHT, organization_label
+from app.core.serialization import FastJSONResponse
+from app.core.timing import phase
 from app.dependencies import AuthContext, get_current_user
-from app.schemas.referral import (
-    ConfidenceScores,
-    ReferralData,
-    ScanResponse,
-)
+from app.schemas.referral import ScanObjectRequest, ScanResponse
 from app.schemas.test_match import TestMatchRequest, TestMatchResponse
-from app.services.claude_vision import ClaudeVisionService
+from app.services.idempotency import Operation, idempotency, request_fingerprint
+from app.services.memory_budget import image_memory, scan_footprint_bytes
+from app.services.object_storage import StoredObject, object_storage
+from app.services.referral_scanner import (
+    ReferralScanService,
+    max_image_size_bytes,
+    validate_image,
+)
 from app.services.test_matcher import TestMatcherService
 
 logger = get_logger(__name__)
 
 router = APIRouter(prefix="/api/v1/referral", tags=["referral"])
 
+IdempotencyKey = Annotated[
+    str | None,
+    Header(
+        alias="Idempotency-Key",
+        min_length=1,
+        max_length=255,
+        description="Retries with the same key get the first request's result",
+    ),
+]
+
+
+def scan_route(request: Request) -> str:
+    """Get the request's route path (selects per-route model routing).
+
+    Args:
+        request: Incoming request
+
+    Returns:
+        Route path
+    """
+    return request.url.path
+
+
+ScanRoute = Annotated[str, Depends(scan_route)]
+
+
+async def track_scan_in_flight(
+    auth: Annotated[AuthContext, Depends(get_current_user)],
+) -> AsyncIterator[None]:
+    """Count the scan in the in-flight gauge while it is being processed.
+
+    Args:
+        auth: Authenticated user context from JWT
+
+    Yields:
+        None
+    """
+    gauge = SCANS_IN_FLIGHT.labels(organization=organization_label(auth.organization_id))
+    gauge.inc()
+    try:
+        yield
+    finally:
+        gauge.dec()
+
 
-@router.post("/scan", response_model=ScanResponse, response_model_by_alias=True)
+@router.post(
+    "/scan",
+    response_model=ScanResponse,
+    response_model_by_alias=True,
+    dependencies=[Depends(track_scan_in_flight)],
+)
 async def scan_referral(
     image: Annotated[UploadFile, File(description="Referral image to scan")],
     auth: Annotated[AuthContext, Depends(get_current_user)],
-) -> ScanResponse:
+    route: ScanRoute,
+    idempotency_key: IdempotencyKey = None,
+) -> Response:
     """Scan a referral image and extract structured data.
 
     Extracts patient information, doctor details, requested tests, and clinical notes
@@ -36,22 +106,18 @@ async def scan_referral(
     Args:
         image: Uploaded referral image (JPEG, PNG, etc.)
         auth: Authenticated user context from JWT
+        route: Route path
+        idempotency_key: Optional key deduplicating retries
 
     Returns:
-        ScanResponse with extracted data and confidence scores
+        Serialized ScanResponse with extracted data and confidence scores
 
     Raises:
         HTTPException: If scan fails or image is invalid
+        ServiceUnavailableError: If the image memory budget stays exhausted (503)
     """
     start_time = time.time()
-
-    # Check if API key is configured
-    if not settings.anthropic_api_key:
-        logger.error("Anthropic API key not configured")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Claude API key not configured",
-        )
+    _require_api_key()
 
     # Validate file exists
     if not image or not image.filename:
@@ -60,117 +126,261 @@ async def scan_referral(
             detail="No image file provided",
         )
 
-    # Check file size (convert MB to bytes)
-    max_size_bytes = settings.max_image_size_mb * 1024 * 1024
-    image_bytes = await image.read()
+    # Wait for room in the image memory budget while the upload is still in its spool
+    # (an upload of unknown size is charged as the largest image accepted)
+    image_size = image.size if image.size is not None else max_image_size_bytes()
+    async with image_memory.reserve(scan_footprint_bytes(image_size)):
+        with phase("upload_read"):
+            image_bytes = await _read_upload(image)
+        image_type = image.content_type or "image/jpeg"
+
+        async def scan() -> Response:
+            return await _scan(
+                image_bytes,
+                image_type,
+                auth,
+                route,
+                start_time,
+                source={"filename": str(image.filename)},
+            )
+
+        if idempotency_key is None:
+            return await scan()
+        with phase("fingerprint"):
+            fingerprint = await executors.cpu.run(request_fingerprint, image_bytes, image_type)
+        return await _run_once(idempotency_key, fingerprint, auth, scan)
+
 
-    if len(image_bytes) > max_size_bytes:
+@router.post(
+    "/scan/object",
+    response_model=ScanResponse,
+    response_model_by_alias=True,
+    dependencies=[Depends(track_scan_in_flight)],
+)
+async def scan_referral_object(
+    request: ScanObjectRequest,
+    auth: Annotated[AuthContext, Depends(get_current_user)],
+    route: ScanRoute,
+    idempotency_key: IdempotencyKey = None,
+) -> Response:
+    """Scan a referral image already uploaded to object storage.
+
+    Reads the image straight from the scan bucket (``SCAN_S3_BUCKET``)
+    instead of having the client download and re-upload it. The same size
+    and type limits as ``/scan`` apply.
+
+    Args:
+        request: Object key of the referral image
+        auth: Authenticated user context from JWT
+        route: Route path
+        idempotency_key: Optional key deduplicating retries
+
+    Returns:
+        Serialized ScanResponse with extracted data and confidence scores
+
+    Raises:
+        HTTPException: If the object is unavailable, the scan fails or the image is invalid
+    """
+    start_time = time.time()
+    _require_api_key()
+
+    # Tenancy: only keys under the organization's prefix may be scanned
+    prefix = settings.scan_s3_key_prefix.format(organization_id=auth.organization_id)
+    if not request.object_key.startswith(prefix):
         logger.warning(
-            "Image too large",
-            file_size_mb=len(image_bytes) / 1024 / 1024,
-            max_size_mb=settings.max_image_size_mb,
+            "Object key outside organization prefix",
             organization_id=auth.organization_id,
         )
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Image too large. Maximum size: {settings.max_image_size_mb}MB (Claude Vision API limit: 5MB when base64 encoded)",
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Object key is not accessible to this organization",
         )
 
-    # Determine and validate image type
-    image_type = image.content_type or "image/jpeg"
+    if not settings.scan_s3_bucket:
+        logger.error("Scan bucket not configured")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Object storage not configured",
+        )
 
-    # Validate content type
-    valid_types = ["image/jpeg", "image/jpg", "image/png", "image/gif", "image/webp"]
-    if image_type not in valid_types:
-        logger.warning(
-            "Invalid image content type",
-            content_type=image_type,
+    async def scan() -> Response:
+        async with AsyncExitStack() as stack:
+            stored = await _open_object(stack, request.object_key, auth)
+            return await _scan(
+                stored.data,
+                stored.content_type,
+                auth,
+                route,
+                start_time,
+                source={"object_key": stored.key},
+            )
+
+    if idempotency_key is None:
+        return await scan()
+    fingerprint = request_fingerprint(request.object_key)
+    return await _run_once(idempotency_key, fingerprint, auth, scan)
+
+
+async def _read_upload(upload: UploadFile) -> bytes:
+    """Read an uploaded file into a single buffer allocated at its final size.
+
+    ``read()`` without a size reads a spooled file to the end in chunks and
+    joins them (a second full copy); reading exactly ``size`` bytes fills one
+    preallocated ``bytes``. The spool (in memory up to 1 MB, then a temporary
+    file) is closed right after, whether or not the size is known, so only
+    one copy of the image is held while it is scanned.
+
+    Args:
+        upload: Uploaded file (size known from the multipart parser)
+
+    Returns:
+        File contents
+    """
+    try:
+        if upload.size is None:
+            return await upload.read()
+        return await upload.read(upload.size)
+    finally:
+        await upload.close()
+
+
+async def _open_object(stack: AsyncExitStack, key: str, auth: AuthContext) -> StoredObject:
+    """Read a referral image from the scan bucket, holding its image memory until ``stack`` exits.
+
+    Only opening the object is covered by the error mapping below, not the
+    scan that runs while the stack holds it.
+
+    Args:
+        stack: Exit stack owning the object (and its memory reservation)
+        key: Object key
+        auth: Authenticated user context from JWT
+
+    Returns:
+        The object's bytes and content type
+
+    Raises:
+        HTTPException: 404 for missing objects, 400 if too large, 502 if S3 fails
+        ServiceUnavailableError: If the image memory budget stays exhausted (503)
+    """
+    try:
+        return await stack.enter_async_context(
+            object_storage.open(key, max_bytes=max_image_size_bytes())
+        )
+    except ServiceUnavailableError:
+        raise
+    except NotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.detail) from e
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.detail) from e
+    except Exception as e:
+        logger.error(
+            "Error reading referral object",
+            error=str(e),
+            error_type=type(e).__name__,
             organization_id=auth.organization_id,
         )
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid image type: {image_type}. Supported types: JPEG, PNG, GIF, WebP",
-        )
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Failed to read object from storage",
+        ) from e
 
-    logger.info(
-        "Starting referral scan",
-        filename=image.filename,
-        content_type=image_type,
-        file_size_kb=len(image_bytes) // 1024,
-        organization_id=auth.organization_id,
-        user_id=auth.user_id,
-    )
 
-    try:
-        # Extract data using Claude Vision
-        vision_service = ClaudeVisionService()
-        extracted_data = await vision_service.extract_referral_data(
-            image_bytes, image_type
+async def _run_once(
+    idempotency_key: str, fingerprint: str, auth: AuthContext, operation: Operation
+) -> Response:
+    """Run a scan at most once per organization and Idempotency-Key.
+
+    Args:
+        idempotency_key: Idempotency-Key header value
+        fingerprint: Request fingerprint
+        auth: Authenticated user context from JWT
+        operation: Coroutine function running the scan
+
+    Returns:
+        The scan response, or a replay of the first request's response
+    """
+    if not settings.idempotency_enabled:
+        return await operation()
+    return await idempotency.execute(auth.organization_id, idempotency_key, fingerprint, operation)
+
+
+def _require_api_key() -> None:
+    """Fail fast when Claude is not configured (replayed responses need no key).
+
+    Raises:
+        HTTPException: If the Anthropic API key is missing
+    """
+    if not settings.anthropic_api_key and settings.upstream_recording_mode != "replay":
+        logger.error("Anthropic API key not configured")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Claude API key not configured",
         )
 
-        # Check for error in extraction
-        if "error" in extracted_data:
-            logger.warning(
-                "Extraction error",
-                error=extracted_data["error"],
-                organization_id=auth.organization_id,
-            )
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=extracted_data["error"],
-            )
 
-        # Fuzzy match tests to catalog if tests were extracted
-        matched_tests = []
-        if "tests" in extracted_data and extracted_data["tests"]:
-            test_matcher = TestMatcherService(organization_id=auth.organization_id)
-            matched_tests = await test_matcher.match_tests(extracted_data["tests"])
-
-        # Calculate overall confidence
-        confidence_data = extracted_data.get("confidence", {})
-        patient_conf = confidence_data.get("patient", 0.0)
-        doctor_conf = confidence_data.get("doctor", 0.0)
-        tests_conf = confidence_data.get("tests", 0.0)
-        overall_conf = (patient_conf + doctor_conf + tests_conf) / 3.0
-
-        # Build response
-        referral_data = ReferralData(
-            patient=extracted_data.get("patient", {}),
-            doctor=extracted_data.get("doctor", {}),
-            tests=extracted_data.get("tests", []),
-            matched_tests=matched_tests,
-            clinical_notes=extracted_data.get("clinicalNotes"),
-            urgent=extracted_data.get("urgent", False),
-            collection_date=extracted_data.get("collectionDate"),
-            confidence=ConfidenceScores(
-                patient=patient_conf,
-                doctor=doctor_conf,
-                tests=tests_conf,
-                overall=overall_conf,
-            ),
+async def _scan(
+    image_bytes: bytes,
+    image_type: str,
+    auth: AuthContext,
+    route: str,
+    start_time: float,
+    source: dict[str, str],
+) -> Response:
+    """Validate and scan an image, and serialize the result.
+
+    Args:
+        image_bytes: Image bytes
+        image_type: MIME type of the image
+        auth: Authenticated user context from JWT
+        route: Route path (selects the model routing)
+        start_time: Request start time (``time.time()``)
+        source: Where the image came from (logged)
+
+    Returns:
+        Serialized ScanResponse
+
+    Raises:
+        HTTPException: 400 for invalid images, 500 if the scan fails
+        ServiceUnavailableError: If the image memory budget stays exhausted (503)
+    """
+    try:
+        image_type = validate_image(image_bytes, image_type, auth.organization_id)
+
+        logger.info(
+            "Starting referral scan",
+            **source,
+            content_type=image_type,
+            file_size_kb=len(image_bytes) // 1024,
+            organization_id=auth.organization_id,
+            user_id=auth.user_id,
         )
 
+        scanner = ReferralScanService(organization_id=auth.organization_id, route=route)
+        referral_data = await scanner.scan(image_bytes, image_type)
+
         processing_time_ms = int((time.time() - start_time) * 1000)
 
         logger.info(
             "Referral scan complete",
             processing_time_ms=processing_time_ms,
-            tests_matched=len(matched_tests),
-            overall_confidence=overall_conf,
+            tests_matched=len(referral_data.matched_tests),
+            overall_confidence=referral_data.confidence.overall,
             organization_id=auth.organization_id,
         )
 
-        return ScanResponse(
-            success=True,
-            data=referral_data,
-            processing_time_ms=processing_time_ms,
-            timestamp=datetime.utcnow(),
-        )
+        # Serialize here (rather than in FastAPI) so it shows up as its own phase
+        with phase("serialize"):
+            return FastJSONResponse(
+                ScanResponse(
+                    success=True,
+                    data=referral_data,
+                    processing_time_ms=processing_time_ms,
+                    timestamp=datetime.utcnow(),
+                )
+            )
 
-    except HTTPException:
-        raise
     except ValidationError as e:
-        # Client validation errors (e.g., image too large)
+        # Client validation errors (e.g., image too large, not a referral)
         logger.warning(
             "Validation error scanning referral",
             error=str(e),
@@ -180,6 +390,9 @@ async def scan_referral(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e),
         ) from e
+    except ServiceUnavailableError:
+        # Answered with 503 and Retry-After by the application exception handler
+        raise
     except Exception as e:
         logger.error(
             "Error scanning referral",
@@ -197,7 +410,7 @@ async def scan_referral(
 async def match_test_names(
     request: TestMatchRequest,
     auth: Annotated[AuthContext, Depends(get_current_user)],
-) -> TestMatchResponse:
+) -> Response:
     """Match test names to catalog without image scanning.
 
     Performs fuzzy matching of test names against the test catalog service
@@ -208,7 +421,7 @@ async def match_test_names(
         auth: Authenticated user context from JWT
 
     Returns:
-        TestMatchResponse with matched tests and confidence scores
+        Serialized TestMatchResponse with matched tests and confidence scores
 
     Raises:
         HTTPException: If matching fails
@@ -230,7 +443,8 @@ async def match_test_names(
             organization_id=auth.organization_id,
         )
 
-        return TestMatchResponse(success=True, data=matched_tests)
+        with phase("serialize"):
+            return FastJSONResponse(TestMatchResponse(success=True, data=matched_tests))
 
     except Exception as e:
         logger.error(
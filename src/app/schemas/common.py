@@ -61,11 +61,26 @@ class HealthResponse(BaseModel):
     version: str | None = Field(None, description="Service version")
 
 
+class DependencyStatus(BaseModel):
+    """Cached result of a background dependency health check."""
+
+    healthy: bool = Field(..., description="Whether the last check succeeded and is not stale")
+    latency_ms: float | None = Field(None, description="Duration of the last check")
+    checked_at: datetime | None = Field(None, description="When the last check completed")
+    age_seconds: float | None = Field(None, description="Seconds since the last check completed")
+    stale: bool = Field(False, description="Whether the last result is too old to trust")
+    error: str | None = Field(None, description="Error from the last check, if it failed")
+
+
 class ReadinessResponse(BaseModel):
     """Readiness check response."""
 
     ready: bool = Field(..., description="Whether the service is ready")
     checks: dict[str, bool] = Field(default_factory=dict, description="Individual dependency checks")
+    dependencies: dict[str, DependencyStatus] = Field(
+        default_factory=dict, description="Per-dependency latency and staleness"
+    )
+    event_loop_lag_ms: float | None = Field(None, description="Most recent event loop lag sample")
     timestamp: datetime = Field(..., description="Current server timestamp")
 
 
@@ -75,6 +75,41 @@ class ReferralData(BaseModel):
     confidence: ConfidenceScores
 
 
+class ScanObjectRequest(BaseModel):
+    """Request to scan a referral image already uploaded to object storage."""
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    object_key: str = Field(
+        ..., alias="objectKey", min_length=1, description="S3 object key of the referral image"
+    )
+
+
+class ScanJobRequest(BaseModel):
+    """Scan request consumed by the queue worker."""
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    object_key: str = Field(..., alias="objectKey", min_length=1)
+    organization_id: str = Field(..., alias="organizationId", min_length=1)
+    request_id: str | None = Field(None, alias="requestId", description="Echoed in the result")
+
+
+class ScanJobResult(BaseModel):
+    """Scan result published by the queue worker."""
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    request_id: str | None = Field(None, alias="requestId")
+    object_key: str | None = Field(None, alias="objectKey")
+    organization_id: str | None = Field(None, alias="organizationId")
+    status: Literal["succeeded", "rejected", "failed"]
+    data: ReferralData | None = None
+    error: str | None = None
+    processing_time_ms: int = Field(..., alias="processingTimeMs")
+    timestamp: datetime
+
+
 class ScanResponse(BaseModel):
     """Response from referral scan endpoint."""
 
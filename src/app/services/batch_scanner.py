@@ -0,0 +1,345 @@
+"""Offline bulk scanning through the Anthropic Message Batches API.
+
+Referral images are submitted as Message Batches requests (half the price of
+the real-time path, and off the live rate limits), polled until the batches
+end, matched to the catalog in bulk and written to a JSONL file.
+
+The run is resumable: submitted batch IDs are kept in a state file next to
+the output, and images with a final result in the output are skipped, so an
+interrupted run picks up where it stopped without paying for images twice.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import mimetypes
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from app.config import settings
+from app.core.exceptions import ValidationError
+from app.core.logging import get_logger
+from app.services.claude_vision import (
+    ExtractionParseError,
+    OutputFormat,
+    build_message_params,
+    parse_extraction_response,
+)
+from app.services.image_quality import inspect_image
+from app.services.referral_scanner import build_referral_data, validate_image
+from app.services.scan_files import FINAL_STATUSES, append_jsonl, read_jsonl
+from app.services.test_matcher import TestMatcherService
+
+if TYPE_CHECKING:
+    import anthropic
+
+logger = get_logger(__name__)
+
+
+class BatchScanSummary:
+    """Counts of one bulk scan run."""
+
+    __slots__ = ("skipped", "submitted", "succeeded", "rejected", "failed")
+
+    def __init__(self) -> None:
+        """Initialize summary with zero counts."""
+        self.skipped = 0
+        self.submitted = 0
+        self.succeeded = 0
+        self.rejected = 0
+        self.failed = 0
+
+    def as_dict(self) -> dict[str, int]:
+        """Get the counts.
+
+        Returns:
+            Counts by name
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def custom_id(key: str) -> str:
+    """Derive the batch request ``custom_id`` for an image.
+
+    Stable across runs (so results can be matched up after a restart) and
+    within the API's 64 character ``[a-zA-Z0-9_-]`` limit.
+
+    Args:
+        key: Image key
+
+    Returns:
+        Custom ID
+    """
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+class BatchScanJob:
+    """Resumable bulk scan of a set of images into a JSONL file."""
+
+    def __init__(
+        self,
+        client: "anthropic.AsyncAnthropic",
+        output_path: Path,
+        organization_id: str,
+        matcher: TestMatcherService | None = None,
+        poll_interval_seconds: float = 60.0,
+        max_batch_requests: int = 10000,
+        max_batch_bytes: int = 200 * 1024 * 1024,
+    ) -> None:
+        """Initialize job.
+
+        Args:
+            client: Async Anthropic client
+            output_path: JSONL output (appended to; also read when resuming)
+            organization_id: Organization whose catalog the tests are matched against
+            matcher: Test matcher (defaults to one for ``organization_id``)
+            poll_interval_seconds: Delay between batch status checks
+            max_batch_requests: Requests per batch (API limit: 100,000)
+            max_batch_bytes: Encoded image bytes per batch (API limit: 256 MB)
+        """
+        self.client = client
+        self.output_path = output_path
+        self.state_path = output_path.with_name(output_path.name + ".state.json")
+        self.organization_id = organization_id
+        self.matcher = matcher or TestMatcherService(organization_id=organization_id)
+        self.poll_interval_seconds = poll_interval_seconds
+        self.max_batch_requests = max_batch_requests
+        self.max_batch_bytes = max_batch_bytes
+        self.summary = BatchScanSummary()
+        self.output_format: OutputFormat = settings.anthropic_output_format
+        # Batch ID -> {custom_id: image key} for submitted batches without results yet
+        self._batches: dict[str, dict[str, str]] = {}
+        # Batch ID -> reply format its requests asked for (results are parsed with it)
+        self._formats: dict[str, OutputFormat] = {}
+        self._done: set[str] = set()
+
+    async def run(self, images: list[tuple[str, Path]]) -> BatchScanSummary:
+        """Submit the images without a final result and collect all results.
+
+        Args:
+            images: (key, path) pairs (see ``scan_files.collect_images``)
+
+        Returns:
+            Run summary
+        """
+        self._done = self._load_done()
+        self._batches, self._formats = self._load_state()
+        pending = {cid for requests in self._batches.values() for cid in requests}
+
+        todo = []
+        for key, path in images:
+            cid = custom_id(key)
+            if cid in self._done or cid in pending:
+                self.summary.skipped += 1
+            else:
+                todo.append((key, path))
+
+        logger.info(
+            "Bulk scan starting",
+            images=len(images),
+            to_submit=len(todo),
+            resumed_batches=len(self._batches),
+            skipped=self.summary.skipped,
+        )
+
+        await self._submit(todo)
+        await self._collect()
+
+        logger.info("Bulk scan complete", **self.summary.as_dict())
+        return self.summary
+
+    async def _submit(self, images: list[tuple[str, Path]]) -> None:
+        """Submit images in batches, recording each batch in the state file.
+
+        Args:
+            images: (key, path) pairs to submit
+        """
+        requests: list[dict[str, Any]] = []
+        keys: dict[str, str] = {}
+        size = 0
+        for key, path in images:
+            try:
+                request = self._build_request(key, path)
+            except (OSError, ValidationError) as e:
+                self._write(custom_id(key), key, "rejected", error=str(e))
+                self.summary.rejected += 1
+                continue
+
+            request_size = len(request["params"]["messages"][0]["content"][0]["source"]["data"])
+            if requests and (
+                len(requests) >= self.max_batch_requests
+                or size + request_size > self.max_batch_bytes
+            ):
+                await self._create_batch(requests, keys)
+                requests, keys, size = [], {}, 0
+
+            requests.append(request)
+            keys[request["custom_id"]] = key
+            size += request_size
+
+        if requests:
+            await self._create_batch(requests, keys)
+
+    def _build_request(self, key: str, path: Path) -> dict[str, Any]:
+        """Build the batch request for one image.
+
+        Args:
+            key: Image key
+            path: Image path
+
+        Returns:
+            Batch request (``custom_id`` and Messages API ``params``)
+
+        Raises:
+            OSError: If the image cannot be read
+            ValidationError: If the image is too large, of an unsupported type or
+                fails the quality checks
+        """
+        image_bytes = path.read_bytes()
+        image_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        image_type = validate_image(image_bytes, image_type, self.organization_id)
+        image_type = inspect_image(image_bytes, image_type, self.organization_id)
+
+        image_b64 = base64.standard_b64encode(image_bytes).decode("ascii")
+        return {
+            "custom_id": custom_id(key),
+            # Full max_tokens: a truncated batch result cannot be retried cheaply
+            "params": build_message_params(
+                settings.anthropic_model, image_b64, image_type, self.output_format
+            ),
+        }
+
+    async def _create_batch(self, requests: list[dict[str, Any]], keys: dict[str, str]) -> None:
+        """Create a batch and persist its ID before anything else can fail.
+
+        Args:
+            requests: Batch requests
+            keys: Image key by custom ID
+        """
+        batch = await self.client.messages.batches.create(requests=requests)  # type: ignore[arg-type]
+        self._batches[batch.id] = keys
+        self._formats[batch.id] = self.output_format
+        self._save_state()
+        self.summary.submitted += len(requests)
+        logger.info("Batch submitted", batch_id=batch.id, requests=len(requests))
+
+    async def _collect(self) -> None:
+        """Poll the submitted batches and write the results of each ended batch."""
+        while self._batches:
+            for batch_id in list(self._batches):
+                batch = await self.client.messages.batches.retrieve(batch_id)
+                if batch.processing_status == "ended":
+                    await self._write_results(batch_id)
+                    del self._batches[batch_id]
+                    self._formats.pop(batch_id, None)
+                    self._save_state()
+                else:
+                    logger.info(
+                        "Batch in progress",
+                        batch_id=batch_id,
+                        processing=batch.request_counts.processing,
+                        succeeded=batch.request_counts.succeeded,
+                    )
+            if self._batches:
+                await asyncio.sleep(self.poll_interval_seconds)
+
+    async def _write_results(self, batch_id: str) -> None:
+        """Parse an ended batch's results, match their tests in bulk and write them.
+
+        Args:
+            batch_id: Batch ID
+        """
+        keys = self._batches[batch_id]
+        extracted: list[tuple[str, dict[str, Any]]] = []
+
+        async for entry in await self.client.messages.batches.results(batch_id):
+            cid = entry.custom_id
+            key = keys.get(cid, "")
+            if cid in self._done:
+                continue  # Written before an interruption
+            result = entry.result
+            if result.type != "succeeded":
+                error = getattr(getattr(result, "error", None), "error", None)
+                self._write(cid, key, result.type, error=getattr(error, "message", None))
+                self.summary.failed += 1
+                continue
+
+            try:
+                data = parse_extraction_response(
+                    result.message.content[0].text,  # type: ignore[union-attr]
+                    self._formats.get(batch_id, "verbose"),
+                )
+            except (json.JSONDecodeError, ExtractionParseError, IndexError, AttributeError) as e:
+                self._write(cid, key, "errored", error=f"Unparseable response: {e}")
+                self.summary.failed += 1
+                continue
+
+            if "error" in data:
+                self._write(cid, key, "rejected", error=data["error"])
+                self.summary.rejected += 1
+                continue
+
+            extracted.append((cid, data))
+
+        # One round of catalog calls for the whole batch
+        matched = await self.matcher.match_test_lists(
+            [data.get("tests") or [] for _, data in extracted]
+        )
+        for (cid, data), matched_tests in zip(extracted, matched, strict=True):
+            referral = build_referral_data(data, matched_tests)
+            self._write(
+                cid,
+                keys.get(cid, ""),
+                "succeeded",
+                data=referral.model_dump(mode="json", by_alias=True),
+            )
+            self.summary.succeeded += 1
+
+        logger.info("Batch results written", batch_id=batch_id, results=len(keys))
+
+    def _write(self, cid: str, key: str, status: str, **fields: Any) -> None:
+        """Append a result line to the output.
+
+        Args:
+            cid: Custom ID
+            key: Image key
+            status: Result status (``succeeded``, ``rejected``, ``errored``, ...)
+            **fields: ``data`` or ``error``
+        """
+        append_jsonl(self.output_path, {"customId": cid, "path": key, "status": status, **fields})
+        if status in FINAL_STATUSES:
+            self._done.add(cid)
+
+    def _load_done(self) -> set[str]:
+        """Read the custom IDs with a final result from the output.
+
+        Returns:
+            Custom IDs
+        """
+        return {
+            record["customId"]
+            for record in read_jsonl(self.output_path)
+            if record.get("status") in FINAL_STATUSES
+        }
+
+    def _load_state(self) -> tuple[dict[str, dict[str, str]], dict[str, OutputFormat]]:
+        """Read the submitted batches from the state file.
+
+        Returns:
+            Image key by custom ID, by batch ID, and the reply format by batch ID
+            (state files written before compact replies only hold verbose batches)
+        """
+        if not self.state_path.exists():
+            return {}, {}
+        state = json.loads(self.state_path.read_text())
+        return state["batches"], state.get("outputFormats", {})
+
+    def _save_state(self) -> None:
+        """Write the submitted batches to the state file atomically."""
+        tmp_path = self.state_path.with_name(self.state_path.name + ".tmp")
+        tmp_path.write_text(
+            json.dumps({"batches": self._batches, "outputFormats": self._formats})
+        )
+        os.replace(tmp_path, self.state_path)
+
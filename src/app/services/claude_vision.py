@@ -1,15 +1,57 @@
-"""Claude Vision service for extracting structured data from referral images."""
+"""Claude Vision service for extracting structured data from referral images.
+
+The ``anthropic`` SDK is imported lazily (it dominates ``import app.main``);
+the startup warm-up imports it and creates the shared client off the event
+loop before the service reports ready.
+
+With cascade routing, a scan is first extracted by the fast model
+(``ANTHROPIC_FAST_MODEL``) and sent on to ``ANTHROPIC_MODEL`` only when the
+fast model's answer is doubtful: low confidence, key fields missing,
+unparseable JSON, a failed call or "not a referral" (see
+``escalation_reason``). Routing is chosen per organization, then per route
+(see ``model_routing``).
+
+With ``ANTHROPIC_OUTPUT_FORMAT=compact``, Claude is asked for short keys with
+null fields left out (``COMPACT_EXTRACTION_PROMPT``) under a tighter
+``max_tokens``; the reply is expanded back into the verbose structure, so
+everything downstream sees the same dictionary.
+"""
 import base64
 import json
-from typing import Any
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Literal
 
-import anthropic
+from opentelemetry import trace
+from opentelemetry.trace import SpanKind
 
 from app.config import settings
+from app.core import executors
 from app.core.exceptions import ValidationError
 from app.core.logging import get_logger
+from app.core.metrics import (
+    CLAUDE_CASCADE_RESULTS,
+    CLAUDE_EXTRACTION_SECONDS,
+    CLAUDE_REQUEST_SECONDS,
+    CLAUDE_TOKENS,
+    CLAUDE_TRUNCATED_REPLIES,
+)
+from app.core.timing import phase
+from app.core.tracing import get_tracer
+from app.services.recording import recorder
+
+if TYPE_CHECKING:
+    import anthropic
+    from anthropic.types import Message
 
 logger = get_logger(__name__)
+tracer = get_tracer()
+
+ModelRouting = Literal["direct", "cascade"]
+OutputFormat = Literal["verbose", "compact"]
+
+# Output token budget of verbose replies (and of compact retries after a truncated reply)
+MAX_TOKENS = 2048
 
 # Extraction prompt for Claude Vision
 EXTRACTION_PROMPT = """You are a medical data extraction assistant for Australian pathology referrals.
@@ -54,17 +96,309 @@ IMPORTANT:
 
 Extract data from this referral form:"""
 
+# Compact extraction prompt: short keys, no nulls, positional confidence
+COMPACT_EXTRACTION_PROMPT = """You are a medical data extraction assistant for Australian pathology referrals.
+
+Extract the uploaded pathology referral form as minified JSON, with no markdown or commentary. \
+Use these keys and leave out any key whose value is not visible or unclear:
+
+p: patient {fn: first/given name, ln: surname, dob: YYYY-MM-DD, sex: M/F/U, \
+mc: 10 digit Medicare number, addr: address}
+d: referring doctor {n: name, pn: provider number, pr: practice/clinic, ph: phone, \
+addr: practice address}
+t: requested pathology tests, exactly as written
+cn: clinical notes or indications
+u: 1 if marked urgent or STAT
+cd: preferred collection date, YYYY-MM-DD
+c: confidence 0-1 in [patient, doctor, tests] (0.5-0.7 handwritten, 0.8-1.0 printed)
+
+Common Australian test abbreviations: FBC, UEC, LFT, TFT, HbA1c, CRP, ESR
+If the image is not a pathology referral, return {"e":"Not a pathology referral"}
+
+Example: {"p":{"fn":"Jane","ln":"Citizen","dob":"1970-01-01","sex":"F"},\
+"d":{"n":"Dr A Example"},"t":["FBC","UEC"],"c":[0.9,0.85,0.95]}"""
+
+# Top-level keys of verbose replies (compact replies use none of them)
+VERBOSE_KEYS = {
+    "patient",
+    "doctor",
+    "tests",
+    "clinicalNotes",
+    "urgent",
+    "collectionDate",
+    "confidence",
+    "error",
+}
+
+# Compact key -> verbose key
+COMPACT_PATIENT_KEYS = {
+    "fn": "firstName",
+    "ln": "lastName",
+    "dob": "dateOfBirth",
+    "sex": "sex",
+    "mc": "medicareNumber",
+    "addr": "address",
+}
+COMPACT_DOCTOR_KEYS = {
+    "n": "name",
+    "pn": "providerNumber",
+    "pr": "practice",
+    "ph": "phone",
+    "addr": "address",
+}
+
+# Order of the compact confidence scores
+CONFIDENCE_SECTIONS = ("patient", "doctor", "tests")
+
+
+def build_message_params(
+    model: str,
+    image_b64: str,
+    image_type: str,
+    output_format: OutputFormat = "verbose",
+    max_tokens: int = MAX_TOKENS,
+) -> dict[str, Any]:
+    """Build the Messages API parameters for extracting one referral image.
+
+    Shared by the real-time path and Message Batches requests, so both send
+    the same prompt.
+
+    Args:
+        model: Claude model
+        image_b64: Base64-encoded image
+        image_type: MIME type of the image
+        output_format: ``verbose`` or ``compact`` reply
+        max_tokens: Output token limit
+
+    Returns:
+        Keyword arguments for ``messages.create`` (or a batch request's ``params``)
+    """
+    prompt = COMPACT_EXTRACTION_PROMPT if output_format == "compact" else EXTRACTION_PROMPT
+    return {
+        "model": model,
+        "max_tokens": max_tokens,
+        "messages": [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "image",
+                        "source": {
+                            "type": "base64",
+                            "media_type": image_type,
+                            "data": image_b64,
+                        },
+                    },
+                    {"type": "text", "text": prompt},
+                ],
+            }
+        ],
+    }
+
+
+class ExtractionParseError(ValueError):
+    """Claude's reply is valid JSON but not an extraction in the requested format."""
+
+
+def expand_compact_extraction(data: Any) -> dict[str, Any]:
+    """Validate a compact reply and expand it into the verbose extraction structure.
+
+    Args:
+        data: Parsed compact reply (see ``COMPACT_EXTRACTION_PROMPT``)
+
+    Returns:
+        Extraction with verbose keys and null fields filled in
+
+    Raises:
+        ExtractionParseError: If the reply does not have the compact shape
+    """
+    if not isinstance(data, dict) or not data.keys().isdisjoint(VERBOSE_KEYS):
+        raise ExtractionParseError("Reply is not a compact extraction")
+    if "e" in data:
+        return {"error": _compact_text(data, "e")}
+
+    tests = data.get("t") or []
+    if not isinstance(tests, list) or not all(isinstance(test, str) for test in tests):
+        raise ExtractionParseError("t must be a list of test names")
+    if data.get("u") not in (None, 0, 1):
+        raise ExtractionParseError("u must be 1 or left out")
+    confidence = data.get("c") or []
+    if (
+        not isinstance(confidence, list)
+        or len(confidence) not in (0, len(CONFIDENCE_SECTIONS))
+        or not all(type(score) in (int, float) for score in confidence)
+    ):
+        raise ExtractionParseError(f"c must be a list of {len(CONFIDENCE_SECTIONS)} numbers")
+
+    return {
+        "patient": _compact_section(data, "p", COMPACT_PATIENT_KEYS),
+        "doctor": _compact_section(data, "d", COMPACT_DOCTOR_KEYS),
+        "tests": tests,
+        "clinicalNotes": _compact_text(data, "cn"),
+        "urgent": bool(data.get("u")),
+        "collectionDate": _compact_text(data, "cd"),
+        "confidence": dict(zip(CONFIDENCE_SECTIONS, confidence, strict=False)),
+    }
+
+
+def _compact_section(data: dict[str, Any], key: str, names: dict[str, str]) -> dict[str, Any]:
+    """Expand a compact patient or doctor object.
+
+    Args:
+        data: Compact reply
+        key: Section key (``p`` or ``d``)
+        names: Compact key -> verbose key
+
+    Returns:
+        Section with verbose keys, null where left out
+
+    Raises:
+        ExtractionParseError: If the section is not an object of strings
+    """
+    section = data.get(key) or {}
+    if not isinstance(section, dict):
+        raise ExtractionParseError(f"{key} must be an object")
+    return {name: _compact_text(section, short) for short, name in names.items()}
+
+
+def _compact_text(data: dict[str, Any], key: str) -> str | None:
+    """Get an optional string field of a compact reply.
+
+    Args:
+        data: Compact reply or section
+        key: Field key
+
+    Returns:
+        Field value, or None if left out
+
+    Raises:
+        ExtractionParseError: If the value is not a string
+    """
+    value = data.get(key)
+    if value is not None and not isinstance(value, str):
+        raise ExtractionParseError(f"{key} must be a string")
+    return value
+
+
+def parse_extraction_response(
+    response_text: str, output_format: OutputFormat = "verbose"
+) -> dict[str, Any]:
+    """Parse JSON from Claude's response, handling markdown code blocks.
+
+    Compact replies are validated and expanded (see
+    ``expand_compact_extraction``), so callers get the verbose structure
+    whichever prompt was sent.
+
+    Args:
+        response_text: Raw text response from Claude
+        output_format: Format the reply was requested in
+
+    Returns:
+        Parsed JSON as dictionary
+
+    Raises:
+        json.JSONDecodeError: If response is not valid JSON
+        ExtractionParseError: If the JSON is not an extraction in ``output_format``
+    """
+    # Claude sometimes wraps JSON in markdown code blocks
+    if "```json" in response_text:
+        json_start = response_text.find("```json") + 7
+        json_end = response_text.find("```", json_start)
+        response_text = response_text[json_start:json_end].strip()
+    elif "```" in response_text:
+        json_start = response_text.find("```") + 3
+        json_end = response_text.find("```", json_start)
+        response_text = response_text[json_start:json_end].strip()
+
+    data = json.loads(response_text)
+    if output_format == "compact":
+        return expand_compact_extraction(data)
+    if not isinstance(data, dict) or data.keys().isdisjoint(VERBOSE_KEYS):
+        raise ExtractionParseError("Reply is not a verbose extraction")
+    return data
+
+
+def model_routing(route: str, organization_id: str) -> ModelRouting:
+    """Get the model routing for a scan.
+
+    Organization overrides win over route overrides, which win over
+    ``ANTHROPIC_MODEL_ROUTING``.
+
+    Args:
+        route: Route path (``scan-worker`` or ``scan-dir`` for the CLIs)
+        organization_id: Organization ID
+
+    Returns:
+        ``direct`` or ``cascade``
+    """
+    organizations = settings.anthropic_model_routing_organizations
+    if organization_id in organizations:
+        return organizations[organization_id]
+    return settings.anthropic_model_routing_routes.get(route, settings.anthropic_model_routing)
+
+
+def escalation_reason(extracted_data: dict[str, Any]) -> str | None:
+    """Check whether a fast model extraction needs the large model.
+
+    Args:
+        extracted_data: Parsed extraction response
+
+    Returns:
+        ``not_referral``, ``missing_fields`` (an ``ANTHROPIC_CASCADE_REQUIRED_FIELDS``
+        field is null or empty) or ``low_confidence`` (a confidence section below
+        ``ANTHROPIC_CASCADE_MIN_CONFIDENCE``), or None to keep the extraction
+    """
+    if "error" in extracted_data:
+        return "not_referral"
+
+    for path in settings.anthropic_cascade_required_fields:
+        value: Any = extracted_data
+        for key in path.split("."):
+            value = value.get(key) if isinstance(value, dict) else None
+        if value is None or value == "" or value == []:
+            return "missing_fields"
+
+    confidence = extracted_data.get("confidence") or {}
+    for section, threshold in settings.anthropic_cascade_min_confidence.items():
+        score = confidence.get(section)
+        if not isinstance(score, int | float) or score < threshold:
+            return "low_confidence"
+    return None
+
+
+@lru_cache(maxsize=1)
+def get_anthropic_client() -> "anthropic.Anthropic":
+    """Get the shared Anthropic client (created on first use).
+
+    Sharing one client keeps its HTTP connection pool warm across scans.
+
+    Returns:
+        Anthropic client
+    """
+    import anthropic
+
+    if not settings.anthropic_api_key:
+        logger.warning("Anthropic API key not configured")
+    return anthropic.Anthropic(api_key=settings.anthropic_api_key)
+
 
 class ClaudeVisionService:
     """Service for extracting structured data from referral images using Claude Vision."""
 
-    def __init__(self) -> None:
-        """Initialize Claude Vision service."""
-        if not settings.anthropic_api_key:
-            logger.warning("Anthropic API key not configured")
-        self.client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
+    def __init__(self, routing: ModelRouting | None = None) -> None:
+        """Initialize Claude Vision service.
+
+        Args:
+            routing: ``direct`` (``ANTHROPIC_MODEL`` only) or ``cascade``
+                (``ANTHROPIC_FAST_MODEL`` first); default ``ANTHROPIC_MODEL_ROUTING``
+        """
+        self.client = get_anthropic_client()
         self.model = settings.anthropic_model
+        self.fast_model = settings.anthropic_fast_model
+        self.routing = routing or settings.anthropic_model_routing
+        self.output_format = settings.anthropic_output_format
 
+    @tracer.start_as_current_span("claude.extract_referral_data")
     async def extract_referral_data(
         self, image_bytes: bytes, image_type: str = "image/jpeg"
     ) -> dict[str, Any]:
@@ -80,46 +414,16 @@ class ClaudeVisionService:
         Raises:
             Exception: If extraction fails or API error occurs
         """
-        # Encode image to base64
-        image_b64 = base64.standard_b64encode(image_bytes).decode("utf-8")
+        import anthropic
 
         try:
-            # Call Claude API with vision
-            logger.debug(
-                "Calling Claude Vision API",
-                model=self.model,
-                image_type=image_type,
-                image_size_bytes=len(image_bytes),
-            )
-
-            message = self.client.messages.create(
-                model=self.model,
-                max_tokens=2048,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "image",
-                                "source": {
-                                    "type": "base64",
-                                    "media_type": image_type,
-                                    "data": image_b64,
-                                },
-                            },
-                            {"type": "text", "text": EXTRACTION_PROMPT},
-                        ],
-                    }
-                ],
-            )
-
-            # Extract JSON from Claude's response
-            response_text = message.content[0].text
-
-            logger.debug("Claude API response received", response_length=len(response_text))
-
-            # Parse JSON from response (handle markdown code blocks)
-            extracted_data = self._parse_json_response(response_text)
+            start_time = time.perf_counter()
+            if self.routing == "cascade":
+                extracted_data, tier = await self._cascade(image_bytes, image_type)
+            else:
+                extracted_data = await self._extract(self.model, image_bytes, image_type)
+                tier = "direct"
+            CLAUDE_EXTRACTION_SECONDS.labels(tier=tier).observe(time.perf_counter() - start_time)
 
             # Log extraction metadata (NO PII)
             if "error" not in extracted_data:
@@ -133,6 +437,7 @@ class ClaudeVisionService:
 
                 logger.info(
                     "Extraction complete",
+                    tier=tier,
                     patient_fields_extracted=patient_fields,
                     doctor_fields_extracted=doctor_fields,
                     tests_extracted=test_count,
@@ -152,7 +457,7 @@ class ClaudeVisionService:
             # Server errors (500+) or other API errors
             logger.error("Claude API error", error=str(e), error_type=type(e).__name__)
             raise Exception(f"Claude API error: {str(e)}") from e
-        except json.JSONDecodeError as e:
+        except (json.JSONDecodeError, ExtractionParseError) as e:
             logger.error("Failed to parse Claude response as JSON", error=str(e))
             raise Exception(f"Failed to parse Claude response as JSON: {str(e)}") from e
         except Exception as e:
@@ -161,26 +466,150 @@ class ClaudeVisionService:
             )
             raise Exception(f"Extraction failed: {str(e)}") from e
 
-    def _parse_json_response(self, response_text: str) -> dict[str, Any]:
-        """Parse JSON from Claude's response, handling markdown code blocks.
+    async def _cascade(self, image_bytes: bytes, image_type: str) -> tuple[dict[str, Any], str]:
+        """Extract with the fast model, escalating to the large model when in doubt.
+
+        Args:
+            image_bytes: Image file bytes
+            image_type: MIME type of the image
+
+        Returns:
+            Extracted data and the tier that produced it (``fast`` or ``escalated``)
+        """
+        import anthropic
+
+        reason: str | None
+        try:
+            extracted_data = await self._extract(self.fast_model, image_bytes, image_type)
+        except anthropic.BadRequestError:
+            # The large model would reject the same request
+            raise
+        except anthropic.APIError as e:
+            logger.warning("Fast model call failed", error=str(e), error_type=type(e).__name__)
+            reason = "fast_model_error"
+        except (json.JSONDecodeError, ExtractionParseError):
+            reason = "parse_error"
+        else:
+            reason = escalation_reason(extracted_data)
+
+        CLAUDE_CASCADE_RESULTS.labels(outcome=reason or "accepted").inc()
+        if reason is None:
+            return extracted_data, "fast"
+
+        logger.info(
+            "Escalating extraction to the large model",
+            reason=reason,
+            fast_model=self.fast_model,
+            model=self.model,
+        )
+        return await self._extract(self.model, image_bytes, image_type), "escalated"
+
+    async def _extract(self, model: str, image_bytes: bytes, image_type: str) -> dict[str, Any]:
+        """Call one model and parse its extraction.
 
         Args:
-            response_text: Raw text response from Claude
+            model: Claude model
+            image_bytes: Image file bytes
+            image_type: MIME type of the image
 
         Returns:
-            Parsed JSON as dictionary
+            Extracted data as dictionary
 
         Raises:
-            json.JSONDecodeError: If response is not valid JSON
+            anthropic.APIError: If the API call fails
+            json.JSONDecodeError: If the response is not valid JSON
+            ExtractionParseError: If the JSON is not an extraction in the requested format
+        """
+        logger.debug(
+            "Calling Claude Vision API",
+            model=model,
+            image_type=image_type,
+            image_size_bytes=len(image_bytes),
+        )
+
+        max_tokens = (
+            settings.anthropic_compact_max_tokens if self.output_format == "compact" else MAX_TOKENS
+        )
+        # The SDK client is synchronous; keep the event loop free while it waits
+        message = await executors.blocking.run(
+            self._create_message, model, image_bytes, image_type, max_tokens
+        )
+        if message.stop_reason == "max_tokens":
+            CLAUDE_TRUNCATED_REPLIES.labels(model=model).inc()
+            if max_tokens < MAX_TOKENS:
+                # A long referral outgrew the compact budget: ask again with the full one
+                logger.info(
+                    "Claude reply truncated, retrying with the full token budget",
+                    model=model,
+                    max_tokens=max_tokens,
+                )
+                message = await executors.blocking.run(
+                    self._create_message, model, image_bytes, image_type, MAX_TOKENS
+                )
+
+        # Extract JSON from Claude's response
+        response_text = message.content[0].text
+
+        logger.debug(
+            "Claude API response received", model=model, response_length=len(response_text)
+        )
+
+        # Parse JSON from response (handle markdown code blocks)
+        with phase("json_parse"):
+            return parse_extraction_response(response_text, self.output_format)
+
+    @tracer.start_as_current_span("claude.messages.create", kind=SpanKind.CLIENT)
+    def _create_message(
+        self, model: str, image_bytes: bytes, image_type: str, max_tokens: int
+    ) -> "Message":
+        """Call the Claude Messages API and record latency and token usage.
+
+        The image is base64-encoded here, in the worker thread, so the encoded
+        copy (and the SDK's JSON request body built from it) only live for the
+        duration of the call and encoding never blocks the event loop.
+
+        Args:
+            model: Claude model
+            image_bytes: Image file bytes
+            image_type: MIME type of the image
+            max_tokens: Output token limit
+
+        Returns:
+            Claude API message
         """
-        # Claude sometimes wraps JSON in markdown code blocks
-        if "```json" in response_text:
-            json_start = response_text.find("```json") + 7
-            json_end = response_text.find("```", json_start)
-            response_text = response_text[json_start:json_end].strip()
-        elif "```" in response_text:
-            json_start = response_text.find("```") + 3
-            json_end = response_text.find("```", json_start)
-            response_text = response_text[json_start:json_end].strip()
-
-        return json.loads(response_text)  # type: ignore[no-any-return]
+        with phase("base64_encode"):
+            image_b64 = base64.standard_b64encode(image_bytes).decode("ascii")
+        params = build_message_params(model, image_b64, image_type, self.output_format, max_tokens)
+        del image_b64
+
+        start_time = time.perf_counter()
+        outcome = "error"
+        try:
+            with phase("claude_call"):
+                message = recorder.create_message(
+                    params, lambda: self.client.messages.create(**params)
+                )
+            outcome = "success"
+        finally:
+            # Release the encoded image now: on errors the traceback keeps this frame alive
+            params.clear()
+            CLAUDE_REQUEST_SECONDS.labels(model=model, outcome=outcome).observe(
+                time.perf_counter() - start_time
+            )
+
+        usage = message.usage
+        trace.get_current_span().set_attributes(
+            {
+                "gen_ai.request.model": model,
+                "gen_ai.usage.input_tokens": usage.input_tokens,
+                "gen_ai.usage.output_tokens": usage.output_tokens,
+            }
+        )
+        CLAUDE_TOKENS.labels(model=model, type="input").inc(usage.input_tokens)
+        CLAUDE_TOKENS.labels(model=model, type="output").inc(usage.output_tokens)
+        if usage.cache_read_input_tokens:
+            CLAUDE_TOKENS.labels(model=model, type="cache_read").inc(
+                usage.cache_read_input_tokens
+            )
+
+        return message
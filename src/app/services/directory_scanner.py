@@ -0,0 +1,190 @@
+"""Offline scanning of local referral images through the real-time pipeline.
+
+Runs the same extraction and test matching as ``/scan`` over a set of local
+images with a bounded number of scans in flight, appending each result to a
+JSONL file as soon as it completes. Unlike the Message Batches path, results
+arrive within seconds, which suits small backfills and evaluation runs.
+
+The run is resumable: images with a final result in the output are skipped.
+"""
+import asyncio
+import mimetypes
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+from app.core import executors
+from app.core.exceptions import ValidationError
+from app.core.logging import get_logger
+from app.schemas.referral import ReferralData
+from app.services.referral_scanner import ReferralScanService, validate_image
+from app.services.scan_files import FINAL_STATUSES, append_jsonl, read_jsonl
+
+logger = get_logger(__name__)
+
+ScanFunction = Callable[[bytes, str], Awaitable[ReferralData]]
+
+
+class DirectoryScanSummary:
+    """Counts and latencies of one directory scan run."""
+
+    __slots__ = ("skipped", "succeeded", "rejected", "failed", "latencies_ms", "elapsed_seconds")
+
+    def __init__(self) -> None:
+        """Initialize summary with zero counts."""
+        self.skipped = 0
+        self.succeeded = 0
+        self.rejected = 0
+        self.failed = 0
+        self.latencies_ms: list[float] = []
+        self.elapsed_seconds = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the counts, throughput and latency percentiles.
+
+        Returns:
+            Summary by name
+        """
+        scanned = len(self.latencies_ms)
+        summary: dict[str, Any] = {
+            "skipped": self.skipped,
+            "succeeded": self.succeeded,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "elapsedSeconds": round(self.elapsed_seconds, 2),
+            "imagesPerMinute": (
+                round(scanned * 60 / self.elapsed_seconds, 1) if self.elapsed_seconds else 0.0
+            ),
+        }
+        if scanned >= 2:
+            percentiles = statistics.quantiles(self.latencies_ms, n=100, method="inclusive")
+            summary["latencyMs"] = {
+                "p50": round(percentiles[49], 1),
+                "p90": round(percentiles[89], 1),
+                "p99": round(percentiles[98], 1),
+                "max": round(max(self.latencies_ms), 1),
+            }
+        elif scanned == 1:
+            latency = round(self.latencies_ms[0], 1)
+            summary["latencyMs"] = {"p50": latency, "p90": latency, "p99": latency, "max": latency}
+        return summary
+
+
+class DirectoryScanJob:
+    """Resumable concurrent scan of local images into a JSONL file."""
+
+    def __init__(
+        self,
+        output_path: Path,
+        organization_id: str,
+        concurrency: int = 4,
+        scan: ScanFunction | None = None,
+    ) -> None:
+        """Initialize job.
+
+        Args:
+            output_path: JSONL output (appended to; also read when resuming)
+            organization_id: Organization whose catalog the tests are matched against
+            concurrency: Maximum scans in flight
+            scan: Scan function (defaults to ``ReferralScanService.scan``)
+        """
+        self.output_path = output_path
+        self.organization_id = organization_id
+        self.concurrency = concurrency
+        self.scan = scan or ReferralScanService(organization_id, route="scan-dir").scan
+        self.summary = DirectoryScanSummary()
+
+    async def run(self, images: list[tuple[str, Path]]) -> DirectoryScanSummary:
+        """Scan the images without a final result in the output.
+
+        Args:
+            images: (key, path) pairs (see ``scan_files.collect_images``)
+
+        Returns:
+            Run summary
+        """
+        done = {
+            record["path"]
+            for record in read_jsonl(self.output_path)
+            if record.get("status") in FINAL_STATUSES
+        }
+        queue: asyncio.Queue[tuple[str, Path]] = asyncio.Queue()
+        for key, path in images:
+            if key in done:
+                self.summary.skipped += 1
+            else:
+                queue.put_nowait((key, path))
+
+        logger.info(
+            "Directory scan starting",
+            images=len(images),
+            to_scan=queue.qsize(),
+            skipped=self.summary.skipped,
+            concurrency=self.concurrency,
+        )
+
+        start_time = time.perf_counter()
+        workers = min(self.concurrency, queue.qsize())
+        await asyncio.gather(*(self._work(queue) for _ in range(workers)))
+        self.summary.elapsed_seconds = time.perf_counter() - start_time
+
+        logger.info("Directory scan complete", **self.summary.as_dict())
+        return self.summary
+
+    async def _work(self, queue: "asyncio.Queue[tuple[str, Path]]") -> None:
+        """Scan queued images one at a time until the queue is empty.
+
+        Args:
+            queue: Images left to scan
+        """
+        while not queue.empty():
+            key, path = queue.get_nowait()
+            await self._scan_one(key, path)
+
+    async def _scan_one(self, key: str, path: Path) -> None:
+        """Scan one image and append its result line.
+
+        Args:
+            key: Image key
+            path: Image path
+        """
+        start_time = time.perf_counter()
+        try:
+            image_bytes = await executors.blocking.run(path.read_bytes)
+            image_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+            image_type = validate_image(image_bytes, image_type, self.organization_id)
+            referral = await self.scan(image_bytes, image_type)
+        except ValidationError as e:
+            self._write(key, "rejected", start_time, error=str(e))
+            self.summary.rejected += 1
+        except Exception as e:
+            # Includes OSError: a read that failed (network share, disk) may succeed next run
+            logger.warning("Directory scan failed", path=key, error=str(e))
+            self._write(key, "failed", start_time, error=str(e))
+            self.summary.failed += 1
+        else:
+            self._write(
+                key,
+                "succeeded",
+                start_time,
+                data=referral.model_dump(mode="json", by_alias=True),
+            )
+            self.summary.succeeded += 1
+
+    def _write(self, key: str, status: str, start_time: float, **fields: Any) -> None:
+        """Append a result line to the output and record the scan's latency.
+
+        Args:
+            key: Image key
+            status: Result status (``succeeded``, ``rejected`` or ``failed``)
+            start_time: ``perf_counter`` value when the scan started
+            **fields: ``data`` or ``error``
+        """
+        latency_ms = (time.perf_counter() - start_time) * 1000
+        self.summary.latencies_ms.append(latency_ms)
+        append_jsonl(
+            self.output_path,
+            {"path": key, "status": status, "latencyMs": round(latency_ms, 1), **fields},
+        )
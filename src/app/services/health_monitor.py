@@ -0,0 +1,227 @@
+"""Background dependency health monitor.
+
+Dependencies are checked periodically on a background task and ``/ready``
+answers from the cached results, so readiness probes never fan out to
+Anthropic, the test catalog or the auth service.
+"""
+import asyncio
+import importlib
+import time
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+
+import httpx
+
+from app.config import settings
+from app.core import executors
+from app.core.logging import get_logger
+from app.core.metrics import DEPENDENCY_CHECK_SECONDS, DEPENDENCY_UP
+from app.schemas.common import DependencyStatus
+from app.services.oauth_client import oauth_client
+
+logger = get_logger(__name__)
+
+HealthCheck = Callable[[], Awaitable[None]]
+
+
+class _CheckResult:
+    """Outcome of one health check run."""
+
+    __slots__ = ("healthy", "latency_ms", "checked_at", "completed_at", "error")
+
+    def __init__(self, healthy: bool, latency_ms: float, error: str | None) -> None:
+        self.healthy = healthy
+        self.latency_ms = latency_ms
+        self.checked_at = datetime.now(UTC)
+        self.completed_at = time.monotonic()
+        self.error = error
+
+
+class HealthMonitor:
+    """Periodically run dependency checks and cache their results."""
+
+    def __init__(
+        self,
+        checks: dict[str, HealthCheck],
+        interval_seconds: float,
+        timeout_seconds: float,
+        stale_after_seconds: float,
+    ) -> None:
+        """Initialize monitor.
+
+        Args:
+            checks: Check coroutine functions by dependency name; a check
+                passes when it returns and fails when it raises
+            interval_seconds: Delay between check rounds
+            timeout_seconds: Timeout for each individual check
+            stale_after_seconds: Age after which a result counts as failed
+        """
+        self.checks = checks
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.stale_after_seconds = stale_after_seconds
+        self._results: dict[str, _CheckResult] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Start the background check loop (no-op without checks)."""
+        if self._task is None and self.checks:
+            self._task = asyncio.create_task(self._run(), name="health-monitor")
+
+    async def stop(self) -> None:
+        """Stop the background check loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def check_all(self) -> None:
+        """Run all checks concurrently and cache the results."""
+        await asyncio.gather(*(self._check(name, check) for name, check in self.checks.items()))
+
+    def statuses(self) -> dict[str, DependencyStatus]:
+        """Get the cached status of every dependency.
+
+        Dependencies not checked yet, or whose last result is older than
+        ``stale_after_seconds``, are reported unhealthy.
+
+        Returns:
+            Status by dependency name
+        """
+        now = time.monotonic()
+        statuses = {}
+        for name in self.checks:
+            result = self._results.get(name)
+            if result is None:
+                statuses[name] = DependencyStatus(healthy=False, error="not checked yet")
+                continue
+
+            age = now - result.completed_at
+            stale = age > self.stale_after_seconds
+            statuses[name] = DependencyStatus(
+                healthy=result.healthy and not stale,
+                latency_ms=round(result.latency_ms, 2),
+                checked_at=result.checked_at,
+                age_seconds=round(age, 2),
+                stale=stale,
+                error=result.error,
+            )
+        return statuses
+
+    async def _run(self) -> None:
+        """Check all dependencies every ``interval_seconds``."""
+        while True:
+            await self.check_all()
+            await asyncio.sleep(self.interval_seconds)
+
+    async def _check(self, name: str, check: HealthCheck) -> None:
+        """Run one check and record its outcome.
+
+        Args:
+            name: Dependency name
+            check: Check coroutine function
+        """
+        error = None
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(check(), timeout=self.timeout_seconds)
+        except TimeoutError:
+            error = f"timed out after {self.timeout_seconds}s"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        duration = time.perf_counter() - start
+
+        previous = self._results.get(name)
+        result = _CheckResult(healthy=error is None, latency_ms=duration * 1000, error=error)
+        self._results[name] = result
+
+        DEPENDENCY_CHECK_SECONDS.labels(dependency=name).observe(duration)
+        DEPENDENCY_UP.labels(dependency=name).set(1 if result.healthy else 0)
+
+        # Log transitions only, not every round
+        if not result.healthy and (previous is None or previous.healthy):
+            logger.warning("Dependency unhealthy", dependency=name, error=error)
+        elif result.healthy and previous is not None and not previous.healthy:
+            logger.info("Dependency recovered", dependency=name)
+
+
+async def check_anthropic() -> None:
+    """Check the Anthropic API with a cheap authenticated call (list one model).
+
+    Raises:
+        RuntimeError: If no API key is configured
+    """
+    # Heavy import, done lazily and off the event loop
+    anthropic = await executors.blocking.run(importlib.import_module, "anthropic")
+
+    if not settings.anthropic_api_key:
+        raise RuntimeError("Anthropic API key not configured")
+
+    async with anthropic.AsyncAnthropic(
+        api_key=settings.anthropic_api_key, max_retries=0
+    ) as client:
+        await client.models.list(limit=1)
+
+
+async def check_catalog() -> None:
+    """Check the test-catalog-service health endpoint."""
+    async with httpx.AsyncClient() as client:
+        response = await client.get(f"{settings.test_catalog_service_url}/health")
+        response.raise_for_status()
+
+
+async def check_jwks() -> None:
+    """Check that the JWKS URL serves a key set."""
+    async with httpx.AsyncClient() as client:
+        response = await client.get(settings.jwt_jwks_url)
+        response.raise_for_status()
+
+
+async def check_oauth() -> None:
+    """Check that an OAuth client credentials token can be obtained.
+
+    Goes through the shared token cache, so the token endpoint is only
+    called when the cached token is about to expire.
+
+    Raises:
+        RuntimeError: If no token could be obtained
+    """
+    if not await oauth_client.get_access_token():
+        raise RuntimeError("token request failed")
+
+
+def build_health_monitor() -> HealthMonitor:
+    """Create a health monitor for the dependencies enabled in settings.
+
+    Returns:
+        Health monitor (not started)
+    """
+    enabled = set(settings.health_checks)
+    if not settings.jwt_enabled:
+        enabled.discard("jwks")
+    if not settings.oauth_enabled:
+        enabled.discard("oauth")
+
+    checks: dict[str, HealthCheck] = {}
+    if "anthropic" in enabled:
+        checks["anthropic"] = check_anthropic
+    if "catalog" in enabled:
+        checks["catalog"] = check_catalog
+    if "jwks" in enabled:
+        checks["jwks"] = check_jwks
+    if "oauth" in enabled:
+        checks["oauth"] = check_oauth
+
+    return HealthMonitor(
+        checks=checks,
+        interval_seconds=settings.health_check_interval_seconds,
+        timeout_seconds=settings.health_check_timeout_seconds,
+        stale_after_seconds=settings.health_check_stale_seconds,
+    )
+
+
+# Shared instance, started and stopped by the application lifespan
+health_monitor = build_health_monitor()
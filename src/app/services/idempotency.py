@@ -0,0 +1,320 @@
+"""Idempotency-Key handling for expensive requests.
+
+A retried request with the same Idempotency-Key (within one organization)
+attaches to the execution still running in this process, waits for one
+running on another instance, or gets the stored response replayed, so it
+never costs a second Claude call. Only successful responses are stored;
+after a failure the key is released and a retry runs the request again.
+
+Stored scan responses describe a patient, so they never reach the store in
+plaintext for long: with ``idempotency_encryption_key`` set the body is
+encrypted (Fernet) before it is written and replayed for the full
+retention; without it the body is stored as is, but only for
+``UNENCRYPTED_RETENTION_SECONDS``, long enough to cover client retries.
+"""
+import asyncio
+import hashlib
+import time
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING
+
+from fastapi import Response
+
+from app.config import settings
+from app.core.exceptions import ConflictError, ValidationError
+from app.core.logging import get_logger
+from app.core.metrics import IDEMPOTENT_REQUESTS
+from app.repositories.idempotency import (
+    DynamoDBIdempotencyStore,
+    IdempotencyRecord,
+    IdempotencyStore,
+    InMemoryIdempotencyStore,
+    StoredResponse,
+)
+
+if TYPE_CHECKING:
+    from cryptography.fernet import MultiFernet
+
+logger = get_logger(__name__)
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# Retention cap for responses stored without encryption (a client's retry window)
+UNENCRYPTED_RETENTION_SECONDS = 300
+
+Operation = Callable[[], Awaitable[Response]]
+
+
+def request_fingerprint(*parts: bytes | str) -> str:
+    """Hash the parts of a request that must match when its key is reused.
+
+    Args:
+        *parts: Request parts (body bytes, content type, object key, ...)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part.encode() if isinstance(part, str) else part
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class IdempotencyService:
+    """Deduplicate requests by organization and Idempotency-Key."""
+
+    def __init__(
+        self,
+        store: IdempotencyStore,
+        retention_seconds: float,
+        lock_seconds: float,
+        poll_interval_seconds: float = 0.5,
+        encryption_key: str = "",
+    ) -> None:
+        """Initialize service.
+
+        Args:
+            store: Record store
+            retention_seconds: How long completed responses are replayed
+                (capped at ``UNENCRYPTED_RETENTION_SECONDS`` without a key)
+            lock_seconds: How long an in-progress claim blocks the key (and
+                how long a duplicate waits for another instance)
+            poll_interval_seconds: Store polling interval while waiting for
+                another instance
+            encryption_key: Comma-separated Fernet keys for stored bodies
+                (the first encrypts, all decrypt), or empty to store them
+                unencrypted for a short time only
+        """
+        self.store = store
+        self._fernet: MultiFernet | None = None
+        if encryption_key:
+            from cryptography import fernet
+
+            keys = [fernet.Fernet(key.strip()) for key in encryption_key.split(",")]
+            self._fernet = fernet.MultiFernet(keys)
+        else:
+            retention_seconds = min(retention_seconds, UNENCRYPTED_RETENTION_SECONDS)
+        self.retention_seconds = retention_seconds
+        self.lock_seconds = lock_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self._in_flight: dict[tuple[str, str], tuple[str, asyncio.Future[StoredResponse]]] = {}
+
+    async def execute(
+        self, organization_id: str, key: str, fingerprint: str, operation: Operation
+    ) -> Response:
+        """Run an operation once per key, replaying its response to duplicates.
+
+        Args:
+            organization_id: Organization ID for multi-tenancy
+            key: Idempotency-Key header value
+            fingerprint: Request fingerprint (see ``request_fingerprint``)
+            operation: Coroutine function producing the response
+
+        Returns:
+            The operation's response, or a replay of it for duplicates
+
+        Raises:
+            ValidationError: If the key was used for a different request
+            ConflictError: If another instance is still running the request
+                after ``lock_seconds``
+        """
+        slot = (organization_id, key)
+        deadline = time.monotonic() + self.lock_seconds
+        while True:
+            # Same process: attach to the running execution
+            in_flight = self._in_flight.get(slot)
+            if in_flight is not None:
+                _check_fingerprint(in_flight[0], fingerprint)
+                try:
+                    stored = await asyncio.shield(in_flight[1])
+                except asyncio.CancelledError:
+                    if in_flight[1].cancelled():
+                        continue  # The owner was cancelled; try again
+                    raise
+                IDEMPOTENT_REQUESTS.labels(outcome="attached").inc()
+                return _replay(stored)
+
+            record = await self.store.get(organization_id, key)
+            if record is None:
+                claim = IdempotencyRecord(
+                    organization_id=organization_id,
+                    key=key,
+                    fingerprint=fingerprint,
+                    status="in_progress",
+                    expires_at=time.time() + self.lock_seconds,
+                )
+                if slot not in self._in_flight and await self.store.claim(claim):
+                    return await self._run(claim, operation)
+                continue
+
+            _check_fingerprint(record.fingerprint, fingerprint)
+            if record.status == "completed" and record.response is not None:
+                IDEMPOTENT_REQUESTS.labels(outcome="replayed").inc()
+                logger.info("Idempotent response replayed", organization_id=organization_id)
+                return _replay(self._decrypt(record.response))
+
+            # Another instance is running it
+            if time.monotonic() >= deadline:
+                IDEMPOTENT_REQUESTS.labels(outcome="conflict").inc()
+                raise ConflictError("A request with this Idempotency-Key is still in progress")
+            await asyncio.sleep(self.poll_interval_seconds)
+
+    async def _run(self, claim: IdempotencyRecord, operation: Operation) -> Response:
+        """Run the operation for a claimed key and store its response.
+
+        Args:
+            claim: In-progress record claimed for the key
+            operation: Coroutine function producing the response
+
+        Returns:
+            The operation's response
+        """
+        slot = (claim.organization_id, claim.key)
+        future: asyncio.Future[StoredResponse] = asyncio.get_running_loop().create_future()
+        # Mark the outcome retrieved, so failures without waiters are not logged by asyncio
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._in_flight[slot] = (claim.fingerprint, future)
+        IDEMPOTENT_REQUESTS.labels(outcome="executed").inc()
+        try:
+            response = await operation()
+            if not 200 <= response.status_code < 300:
+                await self._release(claim)
+                future.cancel()  # Duplicates run the request themselves
+                return response
+
+            stored = StoredResponse(
+                status_code=response.status_code,
+                body=bytes(response.body),
+                media_type=response.media_type,
+            )
+            await self.store.complete(
+                IdempotencyRecord(
+                    organization_id=claim.organization_id,
+                    key=claim.key,
+                    fingerprint=claim.fingerprint,
+                    status="completed",
+                    expires_at=time.time() + self.retention_seconds,
+                    response=self._encrypt(stored),
+                )
+            )
+            future.set_result(stored)
+            return response
+        except Exception as e:
+            await self._release(claim)
+            future.set_exception(e)
+            raise
+        except BaseException:
+            await asyncio.shield(self._release(claim))
+            future.cancel()
+            raise
+        finally:
+            del self._in_flight[slot]
+
+    def _encrypt(self, stored: StoredResponse) -> StoredResponse:
+        """Encrypt a response body before it is written to the store.
+
+        Args:
+            stored: Response with a plaintext body
+
+        Returns:
+            Response with an encrypted body (unchanged without a key)
+        """
+        if self._fernet is None:
+            return stored
+        return StoredResponse(
+            stored.status_code, self._fernet.encrypt(stored.body), stored.media_type
+        )
+
+    def _decrypt(self, stored: StoredResponse) -> StoredResponse:
+        """Decrypt a response body read from the store.
+
+        Args:
+            stored: Response as stored
+
+        Returns:
+            Response with a plaintext body (unchanged without a key)
+        """
+        if self._fernet is None:
+            return stored
+        return StoredResponse(
+            stored.status_code, self._fernet.decrypt(stored.body), stored.media_type
+        )
+
+    async def _release(self, claim: IdempotencyRecord) -> None:
+        """Release a claim after a failed run (errors are logged, not raised).
+
+        Args:
+            claim: In-progress record claimed for the key
+        """
+        try:
+            await self.store.release(claim.organization_id, claim.key)
+        except Exception as e:
+            logger.warning(
+                "Failed to release idempotency key",
+                error=str(e),
+                organization_id=claim.organization_id,
+            )
+
+
+def _check_fingerprint(stored: str, fingerprint: str) -> None:
+    """Reject reuse of a key for a different request.
+
+    Args:
+        stored: Fingerprint the key was first used with
+        fingerprint: Fingerprint of the current request
+
+    Raises:
+        ValidationError: If the fingerprints differ
+    """
+    if stored != fingerprint:
+        IDEMPOTENT_REQUESTS.labels(outcome="mismatch").inc()
+        raise ValidationError(
+            "Idempotency-Key was already used for a different request", field="Idempotency-Key"
+        )
+
+
+def _replay(stored: StoredResponse) -> Response:
+    """Build the response replayed to a duplicate request.
+
+    Args:
+        stored: Stored response
+
+    Returns:
+        Response marked with the ``Idempotent-Replayed`` header
+    """
+    return Response(
+        content=stored.body,
+        status_code=stored.status_code,
+        media_type=stored.media_type,
+        headers={REPLAYED_HEADER: "true"},
+    )
+
+
+def build_idempotency_service() -> IdempotencyService:
+    """Create the idempotency service for the store selected in settings.
+
+    Returns:
+        Idempotency service
+    """
+    store: IdempotencyStore
+    if settings.idempotency_store == "dynamodb":
+        store = DynamoDBIdempotencyStore(
+            table_name=f"{settings.dynamodb_table_prefix}idempotency-keys",
+            region=settings.aws_region,
+            endpoint_url=settings.aws_endpoint_url,
+        )
+    else:
+        store = InMemoryIdempotencyStore(max_records=settings.idempotency_max_records)
+
+    return IdempotencyService(
+        store=store,
+        retention_seconds=settings.idempotency_retention_seconds,
+        lock_seconds=settings.scan_timeout_seconds + 30,
+        encryption_key=settings.idempotency_encryption_key,
+    )
+
+
+# Shared instance (the DynamoDB client is created on first use)
+idempotency = build_idempotency_service()
@@ -0,0 +1,231 @@
+"""Pre-flight image checks run before the Claude call.
+
+Blank pages, tiny thumbnails, badly blurred photos and files that are not
+images at all still cost a full Claude call before the extraction error
+comes back. These checks reject them locally, in milliseconds, with an
+error the user can act on:
+
+- format: the image type is taken from the file's magic bytes, not the
+  declared content type (a mismatch would otherwise fail at the API)
+- resolution: the shorter side must be at least ``IMAGE_QUALITY_MIN_DIMENSION_PX``
+- blank: almost no pixels differ from the page background
+- blur: the strongest edges (99.9th percentile of an edge map) are weak
+
+The pixel checks need Pillow (``pip install ".[imaging]"``); without it only
+the format is verified. Decoding runs on an offload executor (see
+``check_image``), on a grayscale copy of at most ``ANALYSIS_SIZE`` pixels
+per side.
+"""
+from io import BytesIO
+
+from app.config import settings
+from app.core import executors
+from app.core.exceptions import ValidationError
+from app.core.logging import get_logger
+from app.core.metrics import IMAGE_QUALITY_REJECTIONS
+
+try:
+    from PIL import Image, ImageFilter
+except ImportError:  # pragma: no cover - exercised when the extra is missing
+    Image = None  # type: ignore[assignment]
+
+logger = get_logger(__name__)
+
+# Analysis copy size (decoded with JPEG draft mode, so large photos stay cheap)
+ANALYSIS_SIZE = (1024, 1024)
+
+# Pixels further than this from the median gray level count as content ("ink")
+INK_DISTANCE = 48
+
+
+def detect_image_type(data: bytes) -> str | None:
+    """Detect the image type from the file's magic bytes.
+
+    Args:
+        data: File contents
+
+    Returns:
+        MIME type (JPEG, PNG, GIF or WebP), or None for anything else
+    """
+    if data.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if data.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def _reject(reason: str, detail: str, organization_id: str) -> ValidationError:
+    """Count a rejection and build its error.
+
+    Args:
+        reason: Metric label
+        detail: Error message for the client
+        organization_id: Organization ID (for logging)
+
+    Returns:
+        Validation error to raise
+    """
+    IMAGE_QUALITY_REJECTIONS.labels(reason=reason).inc()
+    logger.info("Image rejected by quality check", reason=reason, organization_id=organization_id)
+    return ValidationError(detail, field="image")
+
+
+def _percentile(histogram: list[int], fraction: float) -> int:
+    """Get a percentile of an 8-bit histogram.
+
+    Args:
+        histogram: Pixel counts per gray level
+        fraction: Percentile as a fraction (0.5 for the median)
+
+    Returns:
+        Gray level
+    """
+    target = sum(histogram) * fraction
+    total = 0
+    for level, count in enumerate(histogram):
+        total += count
+        if total >= target:
+            return level
+    return len(histogram) - 1
+
+
+def _pixel_problem(data: bytes) -> tuple[str, str] | None:
+    """Run the pixel checks (blocking; may run in a worker process).
+
+    Args:
+        data: Image bytes (a JPEG, PNG, GIF or WebP file)
+
+    Returns:
+        Rejection reason and error message, or None if the image passes
+    """
+    try:
+        with Image.open(BytesIO(data)) as image:
+            width, height = image.size
+            if min(width, height) < settings.image_quality_min_dimension_px:
+                return (
+                    "resolution",
+                    f"Image is too small ({width}x{height} pixels). Upload a photo or scan at "
+                    f"least {settings.image_quality_min_dimension_px} pixels on the shorter side.",
+                )
+            image.draft("L", ANALYSIS_SIZE)
+            gray = image.convert("L")
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+        return (
+            "undecodable",
+            "Image could not be decoded. It may be corrupt or truncated; upload it again.",
+        )
+
+    gray.thumbnail(ANALYSIS_SIZE)
+    histogram = gray.histogram()
+    background = _percentile(histogram, 0.5)
+    ink = sum(
+        count for level, count in enumerate(histogram) if abs(level - background) > INK_DISTANCE
+    )
+    if ink / gray.width / gray.height < settings.image_quality_min_content_ratio:
+        return (
+            "blank",
+            "Image appears to be blank. Check that the referral is in frame and well lit.",
+        )
+
+    # Border pixels of the edge map only see the padding; leave them out
+    edges = gray.filter(ImageFilter.FIND_EDGES).crop((1, 1, gray.width - 1, gray.height - 1))
+    edge_strength = _percentile(edges.histogram(), 0.999)
+    if edge_strength < settings.image_quality_min_edge_strength:
+        return (
+            "blur",
+            "Image is too blurry to read. Hold the camera steady and retake the photo in focus.",
+        )
+    return None
+
+
+def _detect_type(data: bytes, declared_type: str, organization_id: str) -> str:
+    """Check the file format.
+
+    Args:
+        data: Image bytes
+        declared_type: Content type declared by the client
+        organization_id: Organization ID (for logging)
+
+    Returns:
+        The image's actual MIME type (from its magic bytes)
+
+    Raises:
+        ValidationError: If the file is not a supported image
+    """
+    image_type = detect_image_type(data)
+    if image_type is None:
+        raise _reject(
+            "format",
+            "File is not a JPEG, PNG, GIF or WebP image. Upload a photo or scan of the referral.",
+            organization_id,
+        )
+    if image_type != declared_type.replace("image/jpg", "image/jpeg"):
+        logger.info(
+            "Image type differs from declared content type",
+            declared_type=declared_type,
+            detected_type=image_type,
+            organization_id=organization_id,
+        )
+    return image_type
+
+
+def _pixel_checks_enabled() -> bool:
+    """Check whether the pixel checks run.
+
+    Returns:
+        True if Pillow is installed and the checks are enabled
+    """
+    return Image is not None and settings.image_quality_enabled
+
+
+def inspect_image(data: bytes, declared_type: str, organization_id: str) -> str:
+    """Check that an image is worth sending to Claude (blocking).
+
+    Args:
+        data: Image bytes
+        declared_type: Content type declared by the client
+        organization_id: Organization ID (for logging)
+
+    Returns:
+        The image's actual MIME type (from its magic bytes)
+
+    Raises:
+        ValidationError: If the image fails a check
+    """
+    image_type = _detect_type(data, declared_type, organization_id)
+    if _pixel_checks_enabled():
+        problem = _pixel_problem(data)
+        if problem is not None:
+            raise _reject(*problem, organization_id)
+    return image_type
+
+
+async def check_image(data: bytes, declared_type: str, organization_id: str) -> str:
+    """Check an image, decoding it on an offload executor (see ``inspect_image``).
+
+    Decoding runs on the ``cpu`` thread pool (Pillow releases the GIL), or
+    on the ``process`` pool with ``IMAGE_QUALITY_EXECUTOR=process``, which
+    copies the image to a worker process.
+
+    Args:
+        data: Image bytes
+        declared_type: Content type declared by the client
+        organization_id: Organization ID (for logging)
+
+    Returns:
+        The image's actual MIME type
+
+    Raises:
+        ValidationError: If the image fails a check
+    """
+    image_type = _detect_type(data, declared_type, organization_id)
+    if _pixel_checks_enabled():
+        pool = executors.process if settings.image_quality_executor == "process" else executors.cpu
+        problem = await pool.run(_pixel_problem, data)
+        if problem is not None:
+            raise _reject(*problem, organization_id)
+    return image_type
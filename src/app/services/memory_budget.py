@@ -0,0 +1,183 @@
+"""In-flight image memory budget for the scan pipeline.
+
+While Claude is called, each image is held several times at once: the raw
+bytes, the base64 string (+33%) and the serialized JSON request body inside
+the SDK (+33% again). The budget charges every scan that estimated
+footprint and admits scans first come, first served while the total stays
+within ``IMAGE_MEMORY_BUDGET_MB``. A scan that does not fit waits for
+earlier ones to finish, up to ``IMAGE_MEMORY_WAIT_SECONDS``, and is then
+rejected with 503 and ``Retry-After``, instead of the process running out
+of memory under a burst of large uploads.
+
+Callers that know the image size before loading it (``/scan``, whose upload
+waits in its spool file) reserve before reading it; the reservation the
+scan pipeline makes itself is then a no-op for that request.
+"""
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+from app.config import settings
+from app.core.exceptions import ServiceUnavailableError
+from app.core.logging import get_logger
+from app.core.metrics import IMAGE_MEMORY_RESERVED, IMAGE_MEMORY_WAITS
+from app.core.timing import phase
+
+logger = get_logger(__name__)
+
+# Set while the current request or task holds a reservation
+_reserved: ContextVar[bool] = ContextVar("image_memory_reserved", default=False)
+
+
+def scan_footprint_bytes(image_size: int) -> int:
+    """Estimate the peak memory a scan holds for an image.
+
+    Args:
+        image_size: Image size in bytes
+
+    Returns:
+        Raw image + base64 string + JSON request body, in bytes
+    """
+    base64_size = 4 * ((image_size + 2) // 3)
+    return image_size + 2 * base64_size
+
+
+class ImageMemoryBudget:
+    """First come, first served byte budget shared by the scans of a process."""
+
+    def __init__(self, max_bytes: int, wait_seconds: float, retry_after_seconds: int) -> None:
+        """Initialize budget.
+
+        Args:
+            max_bytes: Bytes in flight at most (0 disables the budget)
+            wait_seconds: How long a scan may wait for room before it is rejected
+            retry_after_seconds: ``Retry-After`` for rejected scans
+        """
+        self.max_bytes = max_bytes
+        self.wait_seconds = wait_seconds
+        self.retry_after_seconds = retry_after_seconds
+        self.reserved = 0
+        self._waiters: deque[tuple[int, asyncio.Future[None]]] = deque()
+
+    @asynccontextmanager
+    async def reserve(self, nbytes: int) -> AsyncIterator[None]:
+        """Hold ``nbytes`` of the budget for the duration of the block.
+
+        A single reservation larger than the whole budget is admitted alone.
+        Nested reservations (the caller already holds one) reserve nothing.
+
+        Args:
+            nbytes: Estimated footprint (see ``scan_footprint_bytes``)
+
+        Yields:
+            None, once the bytes are reserved
+
+        Raises:
+            ServiceUnavailableError: If no room became available in time
+        """
+        if not self.max_bytes or _reserved.get():
+            yield
+            return
+
+        nbytes = min(nbytes, self.max_bytes)
+        if self._waiters or self.reserved + nbytes > self.max_bytes:
+            await self._wait(nbytes)
+        else:
+            self._acquire(nbytes)
+        token = _reserved.set(True)
+        try:
+            yield
+        finally:
+            _reserved.reset(token)
+            self.reserved -= nbytes
+            IMAGE_MEMORY_RESERVED.dec(nbytes)
+            self._wake()
+
+    async def _wait(self, nbytes: int) -> None:
+        """Queue for room in the budget.
+
+        Args:
+            nbytes: Bytes to reserve
+
+        Raises:
+            ServiceUnavailableError: If no room became available in time
+        """
+        start_time = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (nbytes, waiter)
+        self._waiters.append(entry)
+        try:
+            with phase("memory_wait"):
+                await asyncio.wait_for(asyncio.shield(waiter), self.wait_seconds)
+        except TimeoutError:
+            if waiter.done():
+                # Admitted just as the wait timed out: keep the reservation
+                IMAGE_MEMORY_WAITS.labels(outcome="admitted").inc()
+                return
+            self._waiters.remove(entry)
+            self._wake()
+            IMAGE_MEMORY_WAITS.labels(outcome="rejected").inc()
+            logger.warning(
+                "Scan rejected, image memory budget exhausted",
+                requested_bytes=nbytes,
+                reserved_bytes=self.reserved,
+                max_bytes=self.max_bytes,
+            )
+            raise ServiceUnavailableError(
+                "Too many large images in flight, please retry later",
+                retry_after=self.retry_after_seconds,
+            ) from None
+        except BaseException:
+            # Cancelled while queued: give back the reservation if it was just granted
+            if waiter.done():
+                self.reserved -= nbytes
+                IMAGE_MEMORY_RESERVED.dec(nbytes)
+            else:
+                self._waiters.remove(entry)
+            self._wake()
+            raise
+        IMAGE_MEMORY_WAITS.labels(outcome="admitted").inc()
+        logger.debug(
+            "Scan admitted after waiting for image memory",
+            wait_ms=round((time.perf_counter() - start_time) * 1000, 1),
+            requested_bytes=nbytes,
+        )
+
+    def _acquire(self, nbytes: int) -> None:
+        """Add a reservation.
+
+        Args:
+            nbytes: Bytes to reserve
+        """
+        self.reserved += nbytes
+        IMAGE_MEMORY_RESERVED.inc(nbytes)
+
+    def _wake(self) -> None:
+        """Admit queued scans, in order, while they fit."""
+        while self._waiters:
+            nbytes, waiter = self._waiters[0]
+            if self.reserved and self.reserved + nbytes > self.max_bytes:
+                return
+            self._waiters.popleft()
+            self._acquire(nbytes)
+            waiter.set_result(None)
+
+
+def build_image_memory_budget() -> ImageMemoryBudget:
+    """Create the image memory budget configured in settings.
+
+    Returns:
+        Image memory budget
+    """
+    return ImageMemoryBudget(
+        max_bytes=int(settings.image_memory_budget_mb * 1024 * 1024),
+        wait_seconds=settings.image_memory_wait_seconds,
+        retry_after_seconds=settings.load_shedding_retry_after_seconds,
+    )
+
+
+# Shared instance
+image_memory = build_image_memory_budget()
@@ -1,13 +1,16 @@
 """OAuth client credentials service for service-to-service authentication."""
 import time
-from typing import Optional
 
 import httpx
+from opentelemetry.trace import SpanKind
 
 from app.config import settings
 from app.core.logging import get_logger
+from app.core.metrics import OAUTH_TOKEN_REFRESHES
+from app.core.tracing import get_tracer, inject_trace_headers
 
 logger = get_logger(__name__)
+tracer = get_tracer()
 
 
 class OAuthTokenCache:
@@ -15,10 +18,10 @@ class OAuthTokenCache:
 
     def __init__(self) -> None:
         """Initialize token cache."""
-        self._token: Optional[str] = None
+        self._token: str | None = None
         self._expires_at: float = 0
 
-    def get_token(self) -> Optional[str]:
+    def get_token(self) -> str | None:
         """Get cached token if still valid.
 
         Returns:
@@ -51,7 +54,7 @@ class OAuthClient:
         self.enabled = settings.oauth_enabled
         self._cache = OAuthTokenCache()
 
-    async def get_access_token(self) -> Optional[str]:
+    async def get_access_token(self) -> str | None:
         """Get OAuth access token using client credentials flow.
 
         Returns cached token if valid, otherwise requests new token.
@@ -70,6 +73,15 @@ class OAuthClient:
             return cached_token
 
         # Request new token
+        return await self._request_token()
+
+    @tracer.start_as_current_span("oauth.fetch_token", kind=SpanKind.CLIENT)
+    async def _request_token(self) -> str | None:
+        """Request a new token from the OAuth token endpoint and cache it.
+
+        Returns:
+            Access token string, or None if the request fails
+        """
         try:
             logger.debug(
                 "Requesting OAuth token",
@@ -86,7 +98,9 @@ class OAuthClient:
                         "client_secret": self.client_secret,
                         "scope": self.scopes,
                     },
-                    headers={"Content-Type": "application/x-www-form-urlencoded"},
+                    headers=inject_trace_headers(
+                        {"Content-Type": "application/x-www-form-urlencoded"}
+                    ),
                     timeout=10.0,
                 )
 
@@ -96,6 +110,7 @@ class OAuthClient:
                         status_code=response.status_code,
                         response=response.text,
                     )
+                    OAUTH_TOKEN_REFRESHES.labels(outcome="error").inc()
                     return None
 
                 data = response.json()
@@ -104,10 +119,12 @@ class OAuthClient:
 
                 if not access_token:
                     logger.error("OAuth response missing access_token")
+                    OAUTH_TOKEN_REFRESHES.labels(outcome="error").inc()
                     return None
 
                 # Cache token
                 self._cache.set_token(access_token, expires_in)
+                OAUTH_TOKEN_REFRESHES.labels(outcome="success").inc()
 
                 logger.info(
                     "OAuth token retrieved successfully",
@@ -118,6 +135,7 @@ class OAuthClient:
 
         except httpx.TimeoutException:
             logger.error("OAuth token request timeout")
+            OAUTH_TOKEN_REFRESHES.labels(outcome="timeout").inc()
             return None
         except Exception as e:
             logger.error(
@@ -125,4 +143,9 @@ class OAuthClient:
                 error=str(e),
                 error_type=type(e).__name__,
             )
+            OAUTH_TOKEN_REFRESHES.labels(outcome="error").inc()
             return None
+
+
+# Shared instance, so the cached token is reused across requests
+oauth_client = OAuthClient()
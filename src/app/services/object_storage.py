@@ -0,0 +1,170 @@
+"""S3 object storage reads for scan-by-reference.
+
+Objects are read from S3 with the size limit checked on the declared length
+before any of the body is downloaded. Their share of the
+image memory budget is reserved between the response headers and the body,
+so objects waiting for room hold no image memory. ``boto3`` is imported
+lazily and its blocking calls run on the ``blocking`` executor.
+"""
+import mimetypes
+import threading
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from app.config import settings
+from app.core import executors
+from app.core.exceptions import NotFoundError, ValidationError
+from app.core.logging import get_logger
+from app.core.timing import phase
+from app.services.memory_budget import image_memory, scan_footprint_bytes
+
+logger = get_logger(__name__)
+
+
+class StoredObject:
+    """Object read from storage."""
+
+    __slots__ = ("key", "data", "content_type")
+
+    def __init__(self, key: str, data: bytes, content_type: str) -> None:
+        """Initialize stored object.
+
+        Args:
+            key: Object key
+            data: Object bytes
+            content_type: MIME type (from the object metadata or the key's extension)
+        """
+        self.key = key
+        self.data = data
+        self.content_type = content_type
+
+
+class ObjectStorage:
+    """Read objects from an S3 bucket (AWS, LocalStack or moto)."""
+
+    def __init__(self, bucket: str, region: str, endpoint_url: str | None = None) -> None:
+        """Initialize object storage.
+
+        Args:
+            bucket: Bucket name
+            region: AWS region
+            endpoint_url: Custom endpoint (e.g. LocalStack), or None for AWS
+        """
+        self.bucket = bucket
+        self.region = region
+        self.endpoint_url = endpoint_url
+        self._client: Any = None
+        self._client_lock = threading.Lock()
+
+    @asynccontextmanager
+    async def open(self, key: str, max_bytes: int) -> AsyncIterator[StoredObject]:
+        """Read an object, enforcing a size limit, within the image memory budget.
+
+        The reservation is taken from the declared length before the body
+        is downloaded and held until the block exits, so it covers the scan
+        of the object too (the scan's own reservation nests inside it).
+
+        Args:
+            key: Object key
+            max_bytes: Maximum object size in bytes
+
+        Yields:
+            The object's bytes and content type
+
+        Raises:
+            NotFoundError: If the object does not exist
+            ValidationError: If the object is larger than ``max_bytes``
+            ServiceUnavailableError: If the image memory budget stays exhausted
+        """
+        with phase("object_read"):
+            response = await executors.blocking.run(self._get, key, max_bytes)
+        try:
+            async with image_memory.reserve(scan_footprint_bytes(response["ContentLength"])):
+                with phase("object_read"):
+                    stored = await executors.blocking.run(self._read_body, key, response)
+                yield stored
+        finally:
+            response["Body"].close()
+
+    def _get_client(self) -> Any:
+        """Get the S3 client, creating it on first use.
+
+        Returns:
+            boto3 S3 client
+        """
+        with self._client_lock:
+            if self._client is None:
+                import boto3
+
+                self._client = boto3.session.Session().client(
+                    "s3", region_name=self.region, endpoint_url=self.endpoint_url
+                )
+            return self._client
+
+    def _get(self, key: str, max_bytes: int) -> dict[str, Any]:
+        """Request an object and check its declared length (runs in a worker thread).
+
+        Args:
+            key: Object key
+            max_bytes: Maximum object size in bytes
+
+        Returns:
+            ``get_object`` response, with the body not read yet
+        """
+        from botocore.exceptions import ClientError
+
+        try:
+            response: dict[str, Any] = self._get_client().get_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                raise NotFoundError("Object", key) from e
+            raise
+
+        if response["ContentLength"] > max_bytes:
+            response["Body"].close()
+            raise _too_large(max_bytes)
+        return response
+
+    def _read_body(self, key: str, response: dict[str, Any]) -> StoredObject:
+        """Download an object's body (runs in a worker thread).
+
+        Args:
+            key: Object key
+            response: ``get_object`` response from ``_get``
+
+        Returns:
+            The object's bytes and content type
+        """
+        # The declared length was checked in _get and urllib3 reads no further, so a
+        # single read fills one bytes object of the final size: no chunk buffer to
+        # regrow and no final copy. botocore checks the length read.
+        data: bytes = response["Body"].read()
+
+        # Uploads without an explicit type get S3's default; fall back to the extension
+        content_type = response.get("ContentType", "")
+        if not content_type.startswith("image/"):
+            content_type = mimetypes.guess_type(key)[0] or content_type or "application/octet-stream"
+
+        logger.debug("Object read", key=key, size_bytes=len(data), content_type=content_type)
+        return StoredObject(key=key, data=data, content_type=content_type)
+
+
+def _too_large(max_bytes: int) -> ValidationError:
+    """Build the error for an object over the size limit.
+
+    Args:
+        max_bytes: Maximum object size in bytes
+
+    Returns:
+        Validation error
+    """
+    return ValidationError(f"Image too large. Maximum size: {max_bytes / 1024 / 1024:g}MB")
+
+
+# Shared instance for the scan bucket (client created on first use)
+object_storage = ObjectStorage(
+    bucket=settings.scan_s3_bucket,
+    region=settings.aws_region,
+    endpoint_url=settings.aws_endpoint_url,
+)
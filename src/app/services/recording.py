@@ -0,0 +1,370 @@
+"""Record/replay of Claude and catalog responses.
+
+In ``record`` mode every Claude Messages call and catalog request is passed
+through and its response stored, with the time it took, under a hash of the
+request. In ``replay`` mode those stored responses are served back instead,
+after the recorded delay (scaled by ``upstream_replay_time_scale``), so a
+production latency or parsing issue can be reproduced, and the full pipeline
+tested or benchmarked, offline and deterministically.
+
+Claude responses describe a patient, so they are never stored as received:
+with ``upstream_recording_key`` set they are encrypted (Fernet) and replay
+the exact original; without it the patient, doctor and clinical-note values
+are replaced by synthetic ones before the response is written. Catalog
+responses contain no patient data and are stored as received.
+
+Recordings are files (``<dir>/<kind>/<request hash>.json``), so a set
+captured on one machine can be committed as fixtures or copied elsewhere.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Literal
+
+import httpx
+
+from app.config import settings
+from app.core import executors
+from app.core.exceptions import NotFoundError
+from app.core.logging import get_logger
+from app.core.pii import scrub_text
+
+if TYPE_CHECKING:
+    from anthropic.types import Message
+
+logger = get_logger(__name__)
+
+RecordingMode = Literal["off", "record", "replay"]
+
+# Values written in place of extracted PII when recordings are not encrypted
+SYNTHETIC_PATIENT = {
+    "firstName": "JANE",
+    "lastName": "CITIZEN",
+    "dateOfBirth": "1970-01-01",
+    "medicareNumber": "0000000000",
+    "address": "1 Example Street, Sydney NSW 2000",
+}
+SYNTHETIC_DOCTOR = {
+    "name": "Dr. Example",
+    "providerNumber": "0000000A",
+    "practice": "Example Medical Centre",
+    "phone": "0200000000",
+    "address": "2 Example Street, Sydney NSW 2000",
+}
+SYNTHETIC_TEXT = "[SYNTHETIC]"
+
+# Request headers that select a different catalog response
+CATALOG_KEY_HEADERS = ("x-organization-code",)
+
+
+def request_key(*parts: bytes | str) -> str:
+    """Hash the parts of a request that determine its response.
+
+    Args:
+        *parts: Request parts (method, path, body, ...)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part.encode() if isinstance(part, str) else part
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def synthesize_message(payload: dict[str, Any]) -> dict[str, Any]:
+    """Replace the PII in a Claude message with synthetic values.
+
+    Only the values inside each text block's JSON are replaced: the text
+    around it (markdown fences, commentary) and the reply's keys are kept
+    as received, so a compact reply is replayed compact and goes through
+    the same parsing, matching and response code.
+
+    Args:
+        payload: Claude message (``Message.model_dump(mode="json")``)
+
+    Returns:
+        Message with synthetic patient, doctor and clinical-note values
+    """
+    # Imported here: the module pulls in the anthropic SDK
+    from app.services.claude_vision import COMPACT_DOCTOR_KEYS, COMPACT_PATIENT_KEYS
+
+    sections = (
+        ("patient", SYNTHETIC_PATIENT, None),
+        ("doctor", SYNTHETIC_DOCTOR, None),
+        ("p", SYNTHETIC_PATIENT, COMPACT_PATIENT_KEYS),
+        ("d", SYNTHETIC_DOCTOR, COMPACT_DOCTOR_KEYS),
+    )
+    content = []
+    for block in payload.get("content", []):
+        if block.get("type") != "text":
+            content.append(block)
+            continue
+        text = block["text"]
+        start, end = text.find("{"), text.rfind("}") + 1
+        try:
+            extraction = json.loads(text[start:end])
+            if start < 0 or not isinstance(extraction, dict):
+                raise ValueError("No JSON object")
+        except ValueError:
+            # Unparseable replies are kept (to reproduce the parse failure), scrubbed
+            content.append({**block, "text": scrub_text(text)})
+            continue
+        for field, synthetic, names in sections:
+            if isinstance(extraction.get(field), dict):
+                extraction[field] = {
+                    key: value if value is None else synthetic.get((names or {}).get(key, key), value)
+                    for key, value in extraction[field].items()
+                }
+        for field in ("clinicalNotes", "cn"):
+            if extraction.get(field):
+                extraction[field] = SYNTHETIC_TEXT
+        content.append({**block, "text": text[:start] + json.dumps(extraction) + text[end:]})
+    return {**payload, "content": content}
+
+
+class UpstreamRecorder:
+    """Record or replay upstream responses as files keyed by request hash."""
+
+    def __init__(
+        self,
+        mode: RecordingMode,
+        directory: Path,
+        encryption_key: str = "",
+        time_scale: float = 1.0,
+    ) -> None:
+        """Initialize recorder.
+
+        Args:
+            mode: ``off``, ``record`` or ``replay``
+            directory: Recordings directory
+            encryption_key: Fernet key for Claude responses (empty: synthetic PII)
+            time_scale: Replayed delay = recorded duration x this (0: no delay)
+        """
+        self.mode = mode
+        self.directory = directory
+        self.encryption_key = encryption_key
+        self.time_scale = time_scale
+
+    def create_message(self, params: dict[str, Any], create: Callable[[], "Message"]) -> "Message":
+        """Call the Messages API through the recorder (blocking; run in a thread).
+
+        Args:
+            params: ``messages.create`` keyword arguments (the request)
+            create: Makes the real call
+
+        Returns:
+            Claude message (recorded one in replay mode)
+
+        Raises:
+            NotFoundError: In replay mode, if the request was never recorded
+        """
+        if self.mode == "off":
+            return create()
+
+        from anthropic.types import Message
+
+        key = request_key(json.dumps(params, sort_keys=True))
+        if self.mode == "replay":
+            recording = self.load("claude", key)
+            time.sleep(recording["durationMs"] / 1000 * self.time_scale)
+            return Message.model_validate(self._decrypt(recording))
+
+        start_time = time.perf_counter()
+        message = create()
+        duration_ms = (time.perf_counter() - start_time) * 1000
+        payload = message.model_dump(mode="json")
+        if self.encryption_key:
+            self.save("claude", key, duration_ms, encrypted=self._encrypt(payload))
+        else:
+            self.save("claude", key, duration_ms, payload=synthesize_message(payload))
+        return message
+
+    def catalog_transport(self) -> httpx.AsyncBaseTransport | None:
+        """Get the transport for catalog HTTP clients.
+
+        Returns:
+            Recording transport, or None (httpx default) when off
+        """
+        if self.mode == "off":
+            return None
+        return RecordingTransport(self)
+
+    def save(self, kind: str, key: str, duration_ms: float, **body: Any) -> None:
+        """Write a recording atomically.
+
+        Args:
+            kind: ``claude`` or ``catalog``
+            key: Request hash
+            duration_ms: Time the real call took
+            **body: ``payload`` (plain) or ``encrypted`` (Fernet token)
+        """
+        path = self.directory / kind / f"{key}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_text(
+            json.dumps({"kind": kind, "key": key, "durationMs": round(duration_ms, 1), **body})
+        )
+        os.replace(tmp_path, path)
+        logger.debug("Upstream response recorded", kind=kind, key=key)
+
+    def load(self, kind: str, key: str) -> dict[str, Any]:
+        """Read a recording.
+
+        Args:
+            kind: ``claude`` or ``catalog``
+            key: Request hash
+
+        Returns:
+            Recording
+
+        Raises:
+            NotFoundError: If the request was never recorded
+        """
+        path = self.directory / kind / f"{key}.json"
+        try:
+            recording: dict[str, Any] = json.loads(path.read_text())
+        except FileNotFoundError:
+            logger.warning("No recorded upstream response", kind=kind, key=key)
+            raise NotFoundError("Recorded response", f"{kind}/{key}") from None
+        return recording
+
+    def _encrypt(self, payload: dict[str, Any]) -> str:
+        """Encrypt a payload with the recording key.
+
+        Args:
+            payload: Response payload
+
+        Returns:
+            Fernet token
+        """
+        from cryptography.fernet import Fernet
+
+        return Fernet(self.encryption_key).encrypt(json.dumps(payload).encode()).decode()
+
+    def _decrypt(self, recording: dict[str, Any]) -> dict[str, Any]:
+        """Get a recording's payload, decrypting it if needed.
+
+        Args:
+            recording: Recording
+
+        Returns:
+            Response payload
+        """
+        if "encrypted" not in recording:
+            payload: dict[str, Any] = recording["payload"]
+            return payload
+
+        from cryptography.fernet import Fernet
+
+        decrypted: dict[str, Any] = json.loads(
+            Fernet(self.encryption_key).decrypt(recording["encrypted"].encode())
+        )
+        return decrypted
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """httpx transport recording or replaying the responses it carries."""
+
+    def __init__(
+        self, recorder: UpstreamRecorder, transport: httpx.AsyncBaseTransport | None = None
+    ) -> None:
+        """Initialize transport.
+
+        Args:
+            recorder: Recorder (mode and storage)
+            transport: Transport for real requests (default: ``httpx.AsyncHTTPTransport``)
+        """
+        self.recorder = recorder
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Serve a request from the recordings or record its response.
+
+        Args:
+            request: Outgoing request
+
+        Returns:
+            Response (recorded one in replay mode)
+        """
+        body = await request.aread()
+        key = request_key(
+            request.method,
+            request.url.path,
+            str(sorted(request.url.params.multi_items())),
+            *(request.headers.get(name, "") for name in CATALOG_KEY_HEADERS),
+            body,
+        )
+        if self.recorder.mode == "replay":
+            recording = await executors.blocking.run(self.recorder.load, "catalog", key)
+            await asyncio.sleep(recording["durationMs"] / 1000 * self.recorder.time_scale)
+            return _response(recording["payload"], request)
+
+        start_time = time.perf_counter()
+        response = await self.transport.handle_async_request(request)
+        content = await response.aread()
+        duration_ms = (time.perf_counter() - start_time) * 1000
+        payload = {
+            "status_code": response.status_code,
+            "content_type": response.headers.get("content-type", "application/json"),
+            "body": content.decode("utf-8", errors="replace"),
+        }
+        await executors.blocking.run(self.recorder.save, "catalog", key, duration_ms, payload=payload)
+        return _response(payload, request)
+
+    async def aclose(self) -> None:
+        """Close the underlying transport."""
+        await self.transport.aclose()
+
+
+def _response(payload: dict[str, Any], request: httpx.Request) -> httpx.Response:
+    """Build the response for a recorded catalog payload.
+
+    Recorded and live responses are both rebuilt from the payload, so a
+    recording run sees exactly what a replay will.
+
+    Args:
+        payload: Status code, content type and (decoded) body
+        request: Request being answered
+
+    Returns:
+        httpx response
+    """
+    return httpx.Response(
+        payload["status_code"],
+        headers={"content-type": payload["content_type"]},
+        content=payload["body"].encode(),
+        request=request,
+    )
+
+
+def build_recorder() -> UpstreamRecorder:
+    """Create the recorder configured in settings.
+
+    Returns:
+        Upstream recorder
+    """
+    if settings.upstream_recording_mode != "off":
+        logger.warning(
+            "Upstream record/replay enabled",
+            mode=settings.upstream_recording_mode,
+            directory=settings.upstream_recording_dir,
+            encrypted=bool(settings.upstream_recording_key),
+        )
+    return UpstreamRecorder(
+        mode=settings.upstream_recording_mode,
+        directory=Path(settings.upstream_recording_dir),
+        encryption_key=settings.upstream_recording_key,
+        time_scale=settings.upstream_replay_time_scale,
+    )
+
+
+# Shared instance
+recorder = build_recorder()
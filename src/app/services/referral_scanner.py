@@ -0,0 +1,166 @@
+"""Referral scan pipeline shared by the scan endpoints.
+
+Validates the image, extracts data with Claude Vision and matches the
+extracted test names to the catalog, independent of where the image bytes
+came from (multipart upload or object storage).
+"""
+from typing import Any
+
+from app.config import settings
+from app.core.exceptions import ValidationError
+from app.core.logging import get_logger
+from app.core.timing import phase
+from app.schemas.referral import ConfidenceScores, MatchedTest, ReferralData
+from app.services.claude_vision import ClaudeVisionService, model_routing
+from app.services.image_quality import check_image, detect_image_type
+from app.services.memory_budget import image_memory, scan_footprint_bytes
+from app.services.test_matcher import TestMatcherService
+
+logger = get_logger(__name__)
+
+SUPPORTED_IMAGE_TYPES = ("image/jpeg", "image/jpg", "image/png", "image/gif", "image/webp")
+
+
+def max_image_size_bytes() -> int:
+    """Get the configured image size limit.
+
+    Returns:
+        Maximum image size in bytes
+    """
+    return int(settings.max_image_size_mb * 1024 * 1024)
+
+
+def validate_image(data: bytes, declared_type: str, organization_id: str) -> str:
+    """Check an image against the size and type limits.
+
+    The type is taken from the file's magic bytes when they are recognised,
+    so a supported image declared as ``application/octet-stream`` (or with
+    the wrong image type) is accepted; the declared type only decides for
+    files that are not recognised (and then fail the format check later).
+
+    Args:
+        data: Image bytes
+        declared_type: MIME type declared by the client
+        organization_id: Organization ID (for logging)
+
+    Returns:
+        MIME type to scan the image as
+
+    Raises:
+        ValidationError: If the image is too large or of an unsupported type
+    """
+    if len(data) > max_image_size_bytes():
+        logger.warning(
+            "Image too large",
+            file_size_mb=len(data) / 1024 / 1024,
+            max_size_mb=settings.max_image_size_mb,
+            organization_id=organization_id,
+        )
+        raise ValidationError(
+            f"Image too large. Maximum size: {settings.max_image_size_mb}MB (Claude Vision API limit: 5MB when base64 encoded)"
+        )
+
+    image_type = detect_image_type(data) or declared_type
+    if image_type not in SUPPORTED_IMAGE_TYPES:
+        logger.warning(
+            "Invalid image content type",
+            content_type=declared_type,
+            organization_id=organization_id,
+        )
+        raise ValidationError(
+            f"Invalid image type: {declared_type}. Supported types: JPEG, PNG, GIF, WebP"
+        )
+    return image_type
+
+
+class ReferralScanService:
+    """Service running the extraction and test matching for one referral image."""
+
+    def __init__(self, organization_id: str, route: str = "") -> None:
+        """Initialize referral scan service.
+
+        Args:
+            organization_id: Organization ID for multi-tenancy (from JWT context)
+            route: Route path, or ``scan-worker`` / ``scan-dir`` (selects the model routing)
+        """
+        self.organization_id = organization_id
+        self.route = route
+
+    async def scan(self, image_bytes: bytes, image_type: str) -> ReferralData:
+        """Extract referral data from an image and match its tests.
+
+        Args:
+            image_bytes: Image bytes (already validated)
+            image_type: MIME type of the image
+
+        Returns:
+            Extracted referral data with matched tests and confidence scores
+
+        Raises:
+            ValidationError: If the image fails the quality checks, or Claude
+                reports it is not a usable referral
+            ServiceUnavailableError: If the image memory budget stays exhausted
+        """
+        # Reject unusable images before paying for a Claude call
+        with phase("quality_check"):
+            image_type = await check_image(image_bytes, image_type, self.organization_id)
+
+        # Extract data using Claude Vision, within the in-flight image memory budget
+        vision_service = ClaudeVisionService(model_routing(self.route, self.organization_id))
+        async with image_memory.reserve(scan_footprint_bytes(len(image_bytes))):
+            extracted_data = await vision_service.extract_referral_data(image_bytes, image_type)
+
+        # Check for error in extraction
+        if "error" in extracted_data:
+            logger.warning(
+                "Extraction error",
+                error=extracted_data["error"],
+                organization_id=self.organization_id,
+            )
+            raise ValidationError(extracted_data["error"])
+
+        # Fuzzy match tests to catalog if tests were extracted
+        matched_tests: list[MatchedTest] = []
+        if "tests" in extracted_data and extracted_data["tests"]:
+            test_matcher = TestMatcherService(organization_id=self.organization_id)
+            matched_tests = await test_matcher.match_tests(extracted_data["tests"])
+
+        # Build response data
+        with phase("build_response"):
+            return build_referral_data(extracted_data, matched_tests)
+
+
+def build_referral_data(
+    extracted_data: dict[str, Any], matched_tests: list[MatchedTest]
+) -> ReferralData:
+    """Build referral data from Claude's extraction and the matched tests.
+
+    Args:
+        extracted_data: Parsed extraction response
+        matched_tests: Catalog matches for the extracted tests
+
+    Returns:
+        Referral data with overall confidence
+    """
+    # Calculate overall confidence
+    confidence_data = extracted_data.get("confidence", {})
+    patient_conf = confidence_data.get("patient", 0.0)
+    doctor_conf = confidence_data.get("doctor", 0.0)
+    tests_conf = confidence_data.get("tests", 0.0)
+    overall_conf = (patient_conf + doctor_conf + tests_conf) / 3.0
+
+    return ReferralData(
+        patient=extracted_data.get("patient", {}),
+        doctor=extracted_data.get("doctor", {}),
+        tests=extracted_data.get("tests", []),
+        matched_tests=matched_tests,
+        clinical_notes=extracted_data.get("clinicalNotes"),
+        urgent=extracted_data.get("urgent", False),
+        collection_date=extracted_data.get("collectionDate"),
+        confidence=ConfidenceScores(
+            patient=patient_conf,
+            doctor=doctor_conf,
+            tests=tests_conf,
+            overall=overall_conf,
+        ),
+    )
@@ -0,0 +1,86 @@
+"""Local image inputs and JSONL result files for the offline scan CLIs.
+
+Both offline paths (Message Batches and direct directory scans) take a
+directory, glob or manifest of images and append one JSON line per image
+to an output file, which is read back to resume an interrupted run.
+"""
+import glob
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".gif", ".webp")
+
+# Output statuses that are final; anything else is retried on the next run
+FINAL_STATUSES = ("succeeded", "rejected")
+
+
+def collect_images(source: str | Path) -> list[tuple[str, Path]]:
+    """List the images of a directory (recursively), glob or manifest file.
+
+    A manifest lists one image path per line, relative to the manifest's
+    directory; blank lines and lines starting with ``#`` are ignored.
+
+    Args:
+        source: Directory, glob pattern (``**`` matches subdirectories) or manifest file
+
+    Returns:
+        (key, path) pairs, where the key is the path relative to the
+        directory, as matched by the glob or as written in the manifest
+    """
+    source_path = Path(source)
+    if source_path.is_dir():
+        return [
+            (path.relative_to(source_path).as_posix(), path)
+            for path in sorted(source_path.rglob("*"))
+            if path.suffix.lower() in IMAGE_SUFFIXES and path.is_file()
+        ]
+
+    if glob.has_magic(str(source)):
+        return [
+            (Path(match).as_posix(), Path(match))
+            for match in sorted(glob.glob(str(source), recursive=True))
+            if Path(match).suffix.lower() in IMAGE_SUFFIXES and Path(match).is_file()
+        ]
+
+    images = []
+    for line in source_path.read_text().splitlines():
+        entry = line.strip()
+        if entry and not entry.startswith("#"):
+            images.append((entry, source_path.parent / entry))
+    return images
+
+
+def read_jsonl(path: Path) -> Iterator[dict[str, Any]]:
+    """Read a JSONL file, ignoring unparseable (e.g. truncated) lines.
+
+    Args:
+        path: JSONL file
+
+    Yields:
+        Parsed records
+    """
+    if not path.exists():
+        return
+    with path.open(encoding="utf-8") as lines:
+        for line in lines:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("Skipping unparseable output line", path=str(path))
+
+
+def append_jsonl(path: Path, record: dict[str, Any]) -> None:
+    """Append a record to a JSONL file.
+
+    Args:
+        path: JSONL file
+        record: Record
+    """
+    with path.open("a", encoding="utf-8") as output:
+        output.write(json.dumps(record, ensure_ascii=False) + "\n")
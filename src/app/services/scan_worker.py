@@ -0,0 +1,452 @@
+"""SQS-driven scan worker.
+
+Consumes scan requests (object key + organization) from an SQS queue, runs
+the same pipeline as ``/scan/object`` with bounded concurrency and publishes
+each result to an output SQS queue and/or SNS topic. Scan throughput then
+scales with the number of worker processes, independently of the HTTP tier.
+
+- Receives in batches (up to 10 messages, long polling) only while there is
+  a free concurrency slot, so messages never wait locally while invisible.
+- Extends the visibility timeout of in-flight messages in batches, so slow
+  scans are not redelivered to another worker.
+- Deletes finished messages in batches.
+- On ``stop()`` (SIGTERM) stops receiving, lets in-flight scans finish and
+  flushes pending deletes; anything unfinished is redelivered by SQS.
+
+Transient failures leave the message on the queue for redelivery; after
+``max_attempts`` receives the request gets a ``failed`` result instead.
+Scans shed locally (``ServiceUnavailableError``: the image memory budget is
+exhausted) are back-pressure, not failures: the message is made visible
+again after the ``Retry-After`` delay and never gets a ``failed`` result
+for it (the queue's redrive policy still bounds redeliveries).
+"""
+import asyncio
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from typing import Any, Literal
+
+from pydantic import ValidationError as PydanticValidationError
+
+from app.config import settings
+from app.core import executors
+from app.core.exceptions import (
+    ForbiddenError,
+    NotFoundError,
+    ServiceUnavailableError,
+    ValidationError,
+)
+from app.core.logging import get_logger
+from app.core.metrics import SCAN_WORKER_IN_FLIGHT, SCAN_WORKER_MESSAGES
+from app.schemas.referral import ReferralData, ScanJobRequest, ScanJobResult
+from app.services.object_storage import object_storage
+from app.services.referral_scanner import (
+    ReferralScanService,
+    max_image_size_bytes,
+    validate_image,
+)
+
+logger = get_logger(__name__)
+
+# SQS batch API limit
+SQS_BATCH_SIZE = 10
+
+# Pause after a failed receive (e.g. SQS unreachable)
+RECEIVE_RETRY_SECONDS = 5.0
+
+ScanProcessor = Callable[[ScanJobRequest], Awaitable[ReferralData]]
+
+
+async def scan_object(request: ScanJobRequest) -> ReferralData:
+    """Scan a referral image from the scan bucket.
+
+    Args:
+        request: Scan request
+
+    Returns:
+        Extracted referral data with matched tests
+
+    Raises:
+        ForbiddenError: If the key is outside the organization's prefix
+        NotFoundError: If the object does not exist
+        ValidationError: If the image is invalid or not a referral
+    """
+    prefix = settings.scan_s3_key_prefix.format(organization_id=request.organization_id)
+    if not request.object_key.startswith(prefix):
+        raise ForbiddenError("Object key is not accessible to this organization")
+
+    async with object_storage.open(request.object_key, max_image_size_bytes()) as stored:
+        image_type = validate_image(stored.data, stored.content_type, request.organization_id)
+        scanner = ReferralScanService(organization_id=request.organization_id, route="scan-worker")
+        return await scanner.scan(stored.data, image_type)
+
+
+class ScanWorker:
+    """Consume scan requests from SQS and publish their results."""
+
+    def __init__(
+        self,
+        input_queue_url: str,
+        process: ScanProcessor = scan_object,
+        output_queue_url: str = "",
+        output_topic_arn: str = "",
+        concurrency: int = 8,
+        visibility_timeout_seconds: int = 60,
+        wait_time_seconds: int = 20,
+        max_attempts: int = 5,
+        drain_timeout_seconds: float = 120.0,
+        region: str = "us-east-1",
+        endpoint_url: str | None = None,
+    ) -> None:
+        """Initialize worker.
+
+        Args:
+            input_queue_url: Queue the scan requests are read from
+            process: Scan pipeline (defaults to ``scan_object``)
+            output_queue_url: Queue results are sent to (empty: none)
+            output_topic_arn: SNS topic results are published to (empty: none)
+            concurrency: Maximum scans in flight
+            visibility_timeout_seconds: Visibility timeout, extended while a scan runs
+            wait_time_seconds: SQS long-polling wait (0-20)
+            max_attempts: Receives after which a failing request gets a ``failed`` result
+            drain_timeout_seconds: Time in-flight scans get to finish on stop
+            region: AWS region
+            endpoint_url: Custom endpoint (e.g. LocalStack), or None for AWS
+        """
+        self.input_queue_url = input_queue_url
+        self.process = process
+        self.output_queue_url = output_queue_url
+        self.output_topic_arn = output_topic_arn
+        self.concurrency = concurrency
+        self.visibility_timeout_seconds = visibility_timeout_seconds
+        self.wait_time_seconds = wait_time_seconds
+        self.max_attempts = max_attempts
+        self.drain_timeout_seconds = drain_timeout_seconds
+        self.region = region
+        self.endpoint_url = endpoint_url
+        self._clients: dict[str, Any] = {}
+        self._clients_lock = threading.Lock()
+        self._in_flight: dict[str, str] = {}  # Message ID -> receipt handle
+        self._pending_deletes: list[str] = []
+        self._delete_wanted = asyncio.Event()
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        """Stop receiving and drain (safe to call from a signal handler)."""
+        if not self._stopping.is_set():
+            logger.info("Scan worker draining", in_flight=len(self._in_flight))
+            self._stopping.set()
+
+    async def run(self) -> None:
+        """Process messages until ``stop()`` is called, then drain."""
+        logger.info(
+            "Scan worker started",
+            concurrency=self.concurrency,
+            visibility_timeout_seconds=self.visibility_timeout_seconds,
+        )
+        heartbeat = asyncio.create_task(self._heartbeat_loop(), name="scan-worker-heartbeat")
+        deleter = asyncio.create_task(self._delete_loop(), name="scan-worker-deleter")
+        tasks: set[asyncio.Task[None]] = set()
+        stop_wait = asyncio.create_task(self._stopping.wait())
+
+        while not self._stopping.is_set():
+            free = self.concurrency - len(tasks)
+            if free <= 0:
+                await asyncio.wait(tasks | {stop_wait}, return_when=asyncio.FIRST_COMPLETED)
+                continue
+
+            receive = asyncio.create_task(
+                executors.blocking.run(self._receive, min(free, SQS_BATCH_SIZE))
+            )
+            await asyncio.wait({receive, stop_wait}, return_when=asyncio.FIRST_COMPLETED)
+            if not receive.done():
+                # Stopping during a long poll: hand back whatever it returns
+                tasks.add(asyncio.create_task(self._release(receive)))
+                break
+
+            try:
+                messages = receive.result()
+            except Exception as e:
+                logger.error("Failed to receive messages", error=str(e))
+                await asyncio.wait({stop_wait}, timeout=RECEIVE_RETRY_SECONDS)
+                continue
+
+            for message in messages:
+                task = asyncio.create_task(self._handle(message))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+        # Drain: in-flight scans finish; unfinished messages are redelivered by SQS
+        stop_wait.cancel()
+        if tasks:
+            _, unfinished = await asyncio.wait(tasks, timeout=self.drain_timeout_seconds)
+            if unfinished:
+                logger.warning("Drain timed out", unfinished=len(unfinished))
+                for task in unfinished:
+                    task.cancel()
+                await asyncio.wait(unfinished)
+
+        heartbeat.cancel()
+        deleter.cancel()
+        await asyncio.gather(heartbeat, deleter, return_exceptions=True)
+        await self._flush_deletes()
+        logger.info("Scan worker stopped")
+
+    async def _handle(self, message: dict[str, Any]) -> None:
+        """Process one message, publish its result and schedule its deletion.
+
+        Args:
+            message: SQS message
+        """
+        message_id = message["MessageId"]
+        self._in_flight[message_id] = message["ReceiptHandle"]
+        SCAN_WORKER_IN_FLIGHT.inc()
+        try:
+            result = await self._process_message(message)
+            if result is None:
+                return  # Left for redelivery
+
+            await self._publish(result)
+            SCAN_WORKER_MESSAGES.labels(outcome=result.status).inc()
+            self._pending_deletes.append(message["ReceiptHandle"])
+            self._delete_wanted.set()
+        except Exception as e:
+            # Publishing failed; the message is redelivered and scanned again
+            logger.error("Failed to publish scan result", error=str(e), message_id=message_id)
+        finally:
+            self._in_flight.pop(message_id, None)
+            SCAN_WORKER_IN_FLIGHT.dec()
+
+    async def _process_message(self, message: dict[str, Any]) -> ScanJobResult | None:
+        """Run the scan for a message.
+
+        Args:
+            message: SQS message
+
+        Returns:
+            Result to publish, or None to leave the message for redelivery
+        """
+        start = time.perf_counter()
+
+        def result(status: str, **fields: Any) -> ScanJobResult:
+            return ScanJobResult.model_validate(
+                {
+                    "status": status,
+                    "processing_time_ms": int((time.perf_counter() - start) * 1000),
+                    "timestamp": datetime.now(UTC),
+                    **fields,
+                }
+            )
+
+        try:
+            request = ScanJobRequest.model_validate_json(message["Body"])
+        except PydanticValidationError as e:
+            logger.warning("Invalid scan request", message_id=message["MessageId"])
+            return result("rejected", error=f"Invalid scan request: {e.error_count()} errors")
+
+        ids = {
+            "request_id": request.request_id,
+            "object_key": request.object_key,
+            "organization_id": request.organization_id,
+        }
+        try:
+            data = await self.process(request)
+        except (ForbiddenError, NotFoundError, ValidationError) as e:
+            logger.warning(
+                "Scan request rejected", error=e.detail, organization_id=request.organization_id
+            )
+            return result("rejected", error=e.detail, **ids)
+        except ServiceUnavailableError as e:
+            logger.info(
+                "Scan deferred, worker overloaded",
+                error=e.detail,
+                retry_after=e.retry_after,
+                organization_id=request.organization_id,
+            )
+            SCAN_WORKER_MESSAGES.labels(outcome="deferred").inc()
+            await self._defer(message, e.retry_after or 0)
+            return None
+        except Exception as e:
+            attempts = int(message.get("Attributes", {}).get("ApproximateReceiveCount", "1"))
+            logger.error(
+                "Scan failed",
+                error=str(e),
+                error_type=type(e).__name__,
+                attempt=attempts,
+                organization_id=request.organization_id,
+            )
+            if attempts < self.max_attempts:
+                SCAN_WORKER_MESSAGES.labels(outcome="retried").inc()
+                return None
+            return result("failed", error=str(e), **ids)
+
+        logger.info(
+            "Scan request complete",
+            tests_matched=len(data.matched_tests),
+            organization_id=request.organization_id,
+        )
+        return result("succeeded", data=data, **ids)
+
+    async def _publish(self, result: ScanJobResult) -> None:
+        """Send a result to the output queue and/or topic.
+
+        Args:
+            result: Scan result
+        """
+        body = result.model_dump_json(by_alias=True)
+        if self.output_queue_url:
+            await executors.blocking.run(
+                self._client("sqs").send_message, QueueUrl=self.output_queue_url, MessageBody=body
+            )
+        if self.output_topic_arn:
+            await executors.blocking.run(
+                self._client("sns").publish,
+                TopicArn=self.output_topic_arn,
+                Message=body,
+                MessageAttributes={
+                    "status": {"DataType": "String", "StringValue": result.status},
+                },
+            )
+
+    def _receive(self, max_messages: int) -> list[dict[str, Any]]:
+        """Receive a batch of messages (blocking, runs in a worker thread).
+
+        Args:
+            max_messages: Maximum messages to receive (1-10)
+
+        Returns:
+            Messages
+        """
+        response = self._client("sqs").receive_message(
+            QueueUrl=self.input_queue_url,
+            MaxNumberOfMessages=max_messages,
+            WaitTimeSeconds=self.wait_time_seconds,
+            VisibilityTimeout=self.visibility_timeout_seconds,
+            MessageSystemAttributeNames=["ApproximateReceiveCount"],
+        )
+        messages: list[dict[str, Any]] = response.get("Messages", [])
+        return messages
+
+    async def _release(self, receive: "asyncio.Task[list[dict[str, Any]]]") -> None:
+        """Make messages from an abandoned receive visible again right away.
+
+        Args:
+            receive: Receive still running when the worker stopped
+        """
+        messages = await receive
+        if messages:
+            await self._change_visibility(
+                {message["MessageId"]: message["ReceiptHandle"] for message in messages}, 0
+            )
+
+    async def _defer(self, message: dict[str, Any], delay: int) -> None:
+        """Stop extending a message's visibility and make it visible after ``delay``.
+
+        Args:
+            message: SQS message
+            delay: Seconds until the message may be received again
+        """
+        handle = self._in_flight.pop(message["MessageId"])
+        await self._change_visibility({message["MessageId"]: handle}, delay)
+
+    async def _heartbeat_loop(self) -> None:
+        """Extend the visibility timeout of in-flight messages periodically."""
+        while True:
+            await asyncio.sleep(self.visibility_timeout_seconds / 3)
+            if self._in_flight:
+                await self._change_visibility(
+                    dict(self._in_flight), self.visibility_timeout_seconds
+                )
+
+    async def _change_visibility(self, handles: dict[str, str], timeout: int) -> None:
+        """Set the visibility timeout of messages, in batches.
+
+        Args:
+            handles: Receipt handle by message ID
+            timeout: New visibility timeout in seconds
+        """
+        items = list(handles.items())
+        for start in range(0, len(items), SQS_BATCH_SIZE):
+            entries = [
+                {"Id": str(i), "ReceiptHandle": handle, "VisibilityTimeout": timeout}
+                for i, (_, handle) in enumerate(items[start : start + SQS_BATCH_SIZE])
+            ]
+            try:
+                response = await executors.blocking.run(
+                    self._client("sqs").change_message_visibility_batch,
+                    QueueUrl=self.input_queue_url,
+                    Entries=entries,
+                )
+            except Exception as e:
+                logger.warning("Failed to change message visibility", error=str(e))
+                continue
+            if response.get("Failed"):
+                logger.warning("Failed to change message visibility", failed=len(response["Failed"]))
+
+    async def _delete_loop(self) -> None:
+        """Delete finished messages in batches as they accumulate."""
+        while True:
+            await self._delete_wanted.wait()
+            # Give concurrent scans a moment to finish, so deletes share a batch
+            if len(self._pending_deletes) < SQS_BATCH_SIZE:
+                await asyncio.sleep(0.5)
+            self._delete_wanted.clear()
+            await self._flush_deletes()
+
+    async def _flush_deletes(self) -> None:
+        """Delete all pending messages, in batches."""
+        while self._pending_deletes:
+            batch = self._pending_deletes[:SQS_BATCH_SIZE]
+            del self._pending_deletes[:SQS_BATCH_SIZE]
+            entries = [{"Id": str(i), "ReceiptHandle": handle} for i, handle in enumerate(batch)]
+            try:
+                response = await executors.blocking.run(
+                    self._client("sqs").delete_message_batch,
+                    QueueUrl=self.input_queue_url,
+                    Entries=entries,
+                )
+            except Exception as e:
+                # Redelivered and scanned again; the result is published twice
+                logger.error("Failed to delete messages", error=str(e), count=len(batch))
+                continue
+            if response.get("Failed"):
+                logger.error("Failed to delete messages", count=len(response["Failed"]))
+
+    def _client(self, service: Literal["sqs", "sns"]) -> Any:
+        """Get a boto3 client, creating it on first use.
+
+        Args:
+            service: AWS service name ("sqs" or "sns")
+
+        Returns:
+            boto3 client
+        """
+        with self._clients_lock:
+            if service not in self._clients:
+                import boto3
+
+                self._clients[service] = boto3.session.Session().client(
+                    service, region_name=self.region, endpoint_url=self.endpoint_url
+                )
+            return self._clients[service]
+
+
+def build_scan_worker() -> ScanWorker:
+    """Create a scan worker from settings.
+
+    Returns:
+        Scan worker (not running)
+    """
+    return ScanWorker(
+        input_queue_url=settings.scan_worker_input_queue_url,
+        output_queue_url=settings.scan_worker_output_queue_url,
+        output_topic_arn=settings.scan_worker_output_topic_arn,
+        concurrency=settings.scan_worker_concurrency,
+        visibility_timeout_seconds=settings.scan_worker_visibility_timeout_seconds,
+        wait_time_seconds=settings.scan_worker_wait_time_seconds,
+        max_attempts=settings.scan_worker_max_attempts,
+        drain_timeout_seconds=settings.scan_worker_drain_timeout_seconds,
+        region=settings.aws_region,
+        endpoint_url=settings.aws_endpoint_url,
+    )
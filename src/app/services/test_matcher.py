@@ -1,13 +1,23 @@
 """Test name fuzzy matching service using test-catalog-service."""
+import asyncio
+import time
+from collections.abc import Awaitable
+
 import httpx
+from opentelemetry import trace
 
 from app.config import settings
 from app.core.logging import get_logger
+from app.core.metrics import CATALOG_REQUEST_SECONDS, TEST_MATCH_CONFIDENCE
+from app.core.timing import phase
+from app.core.tracing import get_tracer, inject_trace_headers
 from app.schemas.referral import MatchedTest
-from app.services.oauth_client import OAuthClient
+from app.services.oauth_client import oauth_client
+from app.services.recording import recorder
 from app.services.test_preprocessor import TestPreprocessor
 
 logger = get_logger(__name__)
+tracer = get_tracer()
 
 
 class TestMatcherService:
@@ -21,9 +31,10 @@ class TestMatcherService:
         """
         self.organization_id = organization_id
         self.catalog_url = settings.test_catalog_service_url
-        self.oauth_client = OAuthClient()
+        self.oauth_client = oauth_client
         self.preprocessor = TestPreprocessor()
 
+    @tracer.start_as_current_span("catalog.match_test")
     async def match_test(self, test_name: str) -> MatchedTest:
         """Match a single test name to the catalog.
 
@@ -49,19 +60,25 @@ class TestMatcherService:
 
         try:
             # Get OAuth token for service-to-service auth
-            access_token = await self.oauth_client.get_access_token()
+            with phase("oauth"):
+                access_token = await self.oauth_client.get_access_token()
 
             headers = {"X-Organization-Code": self.organization_id}
             if access_token:
                 headers["Authorization"] = f"Bearer {access_token}"
+            inject_trace_headers(headers)
 
-            async with httpx.AsyncClient() as client:
+            async with httpx.AsyncClient(transport=recorder.catalog_transport()) as client:
                 # Call test-catalog-service search endpoint
-                response = await client.get(
-                    f"{self.catalog_url}/api/v1/tests",
-                    params={"q": test_stripped},
-                    headers=headers,
-                    timeout=5.0,
+                response = await self._catalog_call(
+                    "single",
+                    "catalog_search",
+                    client.get(
+                        f"{self.catalog_url}/api/v1/tests",
+                        params={"q": test_stripped},
+                        headers=headers,
+                        timeout=5.0,
+                    ),
                 )
 
                 if response.status_code != 200:
@@ -136,6 +153,7 @@ class TestMatcherService:
                 confidence=0.2,
             )
 
+    @tracer.start_as_current_span("catalog.match_tests")
     async def match_tests(self, test_names: list[str]) -> list[MatchedTest]:
         """Match multiple test names to the catalog using batch endpoint.
 
@@ -156,35 +174,45 @@ class TestMatcherService:
         preprocessed_mapping = {}  # original -> [preprocessed terms]
         all_preprocessed_terms = []
 
-        for original_name in test_names:
-            preprocessed_terms = self.preprocessor.preprocess(original_name)
-            preprocessed_mapping[original_name] = preprocessed_terms
-            all_preprocessed_terms.extend(preprocessed_terms)
+        with phase("preprocess"):
+            for original_name in test_names:
+                preprocessed_terms = self.preprocessor.preprocess(original_name)
+                preprocessed_mapping[original_name] = preprocessed_terms
+                all_preprocessed_terms.extend(preprocessed_terms)
 
         logger.info(
             "Preprocessing complete",
             original_count=len(test_names),
             preprocessed_count=len(all_preprocessed_terms),
         )
+        trace.get_current_span().set_attributes(
+            {"test_count": len(test_names), "preprocessed_count": len(all_preprocessed_terms)}
+        )
 
         # Use batch matching endpoint for better performance
         try:
             # Get OAuth token for service-to-service auth
-            access_token = await self.oauth_client.get_access_token()
+            with phase("oauth"):
+                access_token = await self.oauth_client.get_access_token()
 
             headers = {"X-Organization-Code": self.organization_id}
             if access_token:
                 headers["Authorization"] = f"Bearer {access_token}"
-
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.catalog_url}/api/v1/tests/match",
-                    json={
-                        "testNames": all_preprocessed_terms,  # Use preprocessed terms
-                        "region": "DEFAULT",  # Can be made configurable
-                    },
-                    headers=headers,
-                    timeout=10.0,  # Longer timeout for batch operation
+            inject_trace_headers(headers)
+
+            async with httpx.AsyncClient(transport=recorder.catalog_transport()) as client:
+                response = await self._catalog_call(
+                    "batch",
+                    "catalog_match",
+                    client.post(
+                        f"{self.catalog_url}/api/v1/tests/match",
+                        json={
+                            "testNames": all_preprocessed_terms,  # Use preprocessed terms
+                            "region": "DEFAULT",  # Can be made configurable
+                        },
+                        headers=headers,
+                        timeout=10.0,  # Longer timeout for batch operation
+                    ),
                 )
 
                 if response.status_code != 200:
@@ -194,10 +222,7 @@ class TestMatcherService:
                         test_count=len(test_names),
                     )
                     # Fallback to individual matching
-                    import asyncio
-
-                    tasks = [self.match_test(test_name) for test_name in test_names]
-                    return await asyncio.gather(*tasks)
+                    return await self._match_individually(test_names)
 
                 data = response.json()
                 matches = data.get("matches", [])
@@ -235,6 +260,7 @@ class TestMatcherService:
                     matched_count=sum(1 for m in matches if m.get("matched", False)),
                 )
 
+                self._observe_confidence(results)
                 return results
 
         except httpx.TimeoutException:
@@ -243,10 +269,7 @@ class TestMatcherService:
                 test_count=len(test_names),
             )
             # Fallback to individual matching
-            import asyncio
-
-            tasks = [self.match_test(test_name) for test_name in test_names]
-            return await asyncio.gather(*tasks)
+            return await self._match_individually(test_names)
 
         except Exception as e:
             logger.error(
@@ -255,7 +278,98 @@ class TestMatcherService:
                 error=str(e),
             )
             # Fallback to individual matching
-            import asyncio
+            return await self._match_individually(test_names)
+
+    @tracer.start_as_current_span("catalog.match_test_lists")
+    async def match_test_lists(
+        self, test_lists: list[list[str]], chunk_size: int = 25
+    ) -> list[list[MatchedTest]]:
+        """Match the tests of many referrals with as few catalog calls as possible.
+
+        Distinct test names across all referrals are matched once, in chunks
+        (kept below the batch endpoint's 50 item limit, since compound tests
+        expand), and the matches are mapped back to each referral.
 
+        Args:
+            test_lists: Extracted test names of each referral
+            chunk_size: Distinct test names per batch call
+
+        Returns:
+            Matched tests of each referral, in input order
+        """
+        unique_names = list(dict.fromkeys(name for names in test_lists for name in names))
+        by_query: dict[str, MatchedTest] = {}
+        for start in range(0, len(unique_names), chunk_size):
+            for match in await self.match_tests(unique_names[start : start + chunk_size]):
+                by_query.setdefault(match.original, match)
+
+        results = []
+        for names in test_lists:
+            matched: list[MatchedTest] = []
+            for name in names:
+                terms = [term for term in self.preprocessor.preprocess(name) if term in by_query]
+                # The individual-match fallback reports the original name, not the terms
+                if not terms and name in by_query:
+                    terms = [name]
+                matched.extend(by_query[term] for term in terms)
+            results.append(matched)
+        return results
+
+    @tracer.start_as_current_span("catalog.match_individually")
+    async def _match_individually(self, test_names: list[str]) -> list[MatchedTest]:
+        """Match test names one at a time (fallback when the batch call fails).
+
+        Args:
+            test_names: List of test names to match
+
+        Returns:
+            List of matched tests in input order
+        """
+        with phase("catalog_fallback"):
             tasks = [self.match_test(test_name) for test_name in test_names]
-            return await asyncio.gather(*tasks)
+            results = await asyncio.gather(*tasks)
+
+        self._observe_confidence(results)
+        return results
+
+    async def _catalog_call(
+        self, operation: str, phase_name: str, request: Awaitable[httpx.Response]
+    ) -> httpx.Response:
+        """Await a test-catalog-service call, timing it as a phase and in the latency histogram.
+
+        Responses other than 200 are recorded with outcome ``error``, like
+        failed requests; timeouts with ``timeout``.
+
+        Args:
+            operation: Metric operation label ("batch" or "single")
+            phase_name: Request phase name
+            request: The pending HTTP request
+
+        Returns:
+            Catalog response
+        """
+        start_time = time.perf_counter()
+        outcome = "error"
+        try:
+            with phase(phase_name):
+                response = await request
+            if response.status_code == 200:
+                outcome = "success"
+            return response
+        except httpx.TimeoutException:
+            outcome = "timeout"
+            raise
+        finally:
+            CATALOG_REQUEST_SECONDS.labels(operation=operation, outcome=outcome).observe(
+                time.perf_counter() - start_time
+            )
+
+    @staticmethod
+    def _observe_confidence(results: list[MatchedTest]) -> None:
+        """Record match confidences in the confidence histogram.
+
+        Args:
+            results: Matched tests
+        """
+        for result in results:
+            TEST_MATCH_CONFIDENCE.observe(result.confidence)
@@ -81,18 +81,18 @@ class TestPreprocessor:
 
         original = test_name.strip()
 
-        logger.debug(f"Preprocessing test name: {original}")
+        logger.debug("Preprocessing test name", test_name=original)
 
         # Step 1: Check for panel recognition (exact match)
         panel_tests = self._recognize_panel(original)
         if panel_tests:
-            logger.info(f"Recognized panel '{original}' → {panel_tests}")
+            logger.info("Recognized panel", test_name=original, panel_tests=panel_tests)
             return panel_tests
 
         # Step 2: Check for compound tests (contains separators)
         compound_tests = self._split_compound(original)
         if len(compound_tests) > 1:
-            logger.info(f"Split compound test '{original}' → {compound_tests}")
+            logger.info("Split compound test", test_name=original, parts=compound_tests)
             # Recursively preprocess each part (they might have abbreviations)
             result = []
             for part in compound_tests:
@@ -102,7 +102,7 @@ class TestPreprocessor:
         # Step 3: Expand abbreviations
         expanded = self._expand_abbreviations(original)
         if expanded != original:
-            logger.debug(f"Expanded abbreviations '{original}' → '{expanded}'")
+            logger.debug("Expanded abbreviations", test_name=original, expanded=expanded)
             return [expanded]
 
         # Step 4: Return original if no preprocessing needed
@@ -0,0 +1,130 @@
+"""Startup warm-up.
+
+Runs once in the background after startup, so the first real request does
+not pay for heavy imports, client construction, JWKS keys or the OAuth
+token. ``/ready`` reports not ready until the warm-up has finished.
+"""
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+
+from app.config import settings
+from app.core import executors
+from app.core.logging import get_logger
+from app.services.claude_vision import get_anthropic_client
+from app.services.oauth_client import oauth_client
+
+logger = get_logger(__name__)
+
+WarmupStep = Callable[[], Awaitable[object]]
+
+
+class Warmup:
+    """Run warm-up steps once in the background and track completion."""
+
+    def __init__(self, steps: dict[str, WarmupStep], timeout_seconds: float) -> None:
+        """Initialize warm-up.
+
+        Args:
+            steps: Step coroutine functions by name (run concurrently)
+            timeout_seconds: Time after which unfinished steps are abandoned
+        """
+        self.steps = steps
+        self.timeout_seconds = timeout_seconds
+        self.completed = False
+        self.durations_ms: dict[str, float] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Start the warm-up (completes immediately without steps)."""
+        if not self.steps:
+            self.completed = True
+            return
+        if self._task is None:
+            self._task = asyncio.create_task(self.run(), name="warmup")
+
+    async def stop(self) -> None:
+        """Cancel the warm-up if it is still running."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self) -> None:
+        """Run all steps; failures are logged and do not block readiness."""
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(self._step(name, step) for name, step in self.steps.items())),
+                timeout=self.timeout_seconds,
+            )
+        except TimeoutError:
+            logger.warning(
+                "Warm-up timed out",
+                timeout_seconds=self.timeout_seconds,
+                pending=[name for name in self.steps if name not in self.durations_ms],
+            )
+
+        self.completed = True
+        logger.info(
+            "Warm-up complete",
+            duration_ms=round((time.perf_counter() - start) * 1000, 2),
+            step_ms=self.durations_ms,
+        )
+
+    async def _step(self, name: str, step: WarmupStep) -> None:
+        """Run one step and record its duration.
+
+        Args:
+            name: Step name
+            step: Step coroutine function
+        """
+        start = time.perf_counter()
+        try:
+            await step()
+        except Exception as e:
+            logger.warning("Warm-up step failed", step=name, error=str(e))
+        self.durations_ms[name] = round((time.perf_counter() - start) * 1000, 2)
+
+
+async def warm_anthropic() -> None:
+    """Import the SDK, create the shared client and open its connection.
+
+    Runs in a worker thread, since the import and the sync client block.
+    """
+
+    def warm() -> None:
+        client = get_anthropic_client()
+        if settings.anthropic_api_key:
+            client.models.list(limit=1)
+
+    await executors.blocking.run(warm)
+
+
+async def warm_oauth() -> None:
+    """Fetch the OAuth token into the shared token cache."""
+    if settings.oauth_enabled:
+        await oauth_client.get_access_token()
+
+
+def build_warmup() -> Warmup:
+    """Create the warm-up for the steps enabled in settings.
+
+    The JWKS step needs the application's JWKS client and is registered
+    by ``app.main`` when JWT authentication is enabled.
+
+    Returns:
+        Warm-up (not started)
+    """
+    available: dict[str, WarmupStep] = {"anthropic": warm_anthropic, "oauth": warm_oauth}
+    steps: dict[str, WarmupStep] = {
+        name: available[name] for name in settings.warmup_steps if name in available
+    }
+    return Warmup(steps=steps, timeout_seconds=settings.warmup_timeout_seconds)
+
+
+# Shared instance, started and stopped by the application lifespan
+warmup = build_warmup()
@@ -1,6 +1,11 @@
 """Pytest configuration and fixtures."""
+from collections.abc import Iterator
+
 import pytest
 
+from tests.fakes import serve
+from tests.fakes.messages import FakeMessages
+
 
 @pytest.fixture
 def sample_organization_id() -> str:
@@ -20,3 +25,16 @@ def sample_user_id() -> str:
         User ID
     """
     return "user-456"
+
+
+@pytest.fixture(scope="module")
+def fake_messages() -> Iterator[FakeMessages]:
+    """Running fake Messages API (replies set per test with ``reset``).
+
+    Yields:
+        Fake Messages API
+    """
+    fake = FakeMessages()
+    for base_url in serve(fake.app):
+        fake.base_url = base_url
+        yield fake
@@ -0,0 +1,128 @@
+"""Fake Anthropic Message Batches API.
+
+Implements create, retrieve and results for ``/v1/messages/batches``.
+Batches end after ``polls_until_ended`` retrieves; every request gets the
+reply produced by ``reply`` for its ``custom_id``.
+
+Run standalone for manual testing of the bulk scan CLI:
+    uvicorn tests.fakes.anthropic_batches:app --port 8090
+    ANTHROPIC_BASE_URL=http://localhost:8090 python -m app.cli.batch_scan ...
+"""
+import json
+from collections.abc import Callable
+from datetime import UTC, datetime
+from typing import Any
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+SAMPLE_EXTRACTION = {
+    "patient": {"firstName": "JOHN", "lastName": "SMITH", "dateOfBirth": "1970-01-01", "sex": "M"},
+    "doctor": {"name": "Dr. Sarah Jane"},
+    "tests": ["FBC", "LFT"],
+    "clinicalNotes": "Routine screening",
+    "urgent": False,
+    "confidence": {"patient": 0.9, "doctor": 0.8, "tests": 0.95},
+}
+
+Reply = Callable[[str], dict[str, Any]]
+
+
+def extraction_reply(custom_id: str) -> dict[str, Any]:
+    """Reply with a successful extraction of the sample referral.
+
+    Args:
+        custom_id: Request custom ID
+
+    Returns:
+        Batch result (``succeeded`` with a Message)
+    """
+    return {
+        "type": "succeeded",
+        "message": {
+            "id": f"msg_{custom_id}",
+            "type": "message",
+            "role": "assistant",
+            "model": "claude-sonnet-4-5-20250929",
+            "content": [{"type": "text", "text": json.dumps(SAMPLE_EXTRACTION)}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": 1500, "output_tokens": 300},
+        },
+    }
+
+
+def create_app(reply: Reply = extraction_reply, polls_until_ended: int = 1) -> Starlette:
+    """Create the fake API.
+
+    Args:
+        reply: Result for each custom ID
+        polls_until_ended: Retrieves answered with ``in_progress`` before a batch ends
+
+    Returns:
+        ASGI app; ``app.state.batches`` holds the submitted requests by batch ID
+    """
+    batches: dict[str, list[dict[str, Any]]] = {}
+    polls: dict[str, int] = {}
+
+    def batch_body(request: Request, batch_id: str) -> dict[str, Any]:
+        count = len(batches[batch_id])
+        ended = polls[batch_id] >= polls_until_ended
+        now = datetime.now(UTC).isoformat()
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else count,
+                "succeeded": count if ended else 0,
+                "errored": 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "created_at": now,
+            "expires_at": now,
+            "ended_at": now if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": (
+                str(request.url_for("results", batch_id=batch_id)) if ended else None
+            ),
+        }
+
+    async def create(request: Request) -> JSONResponse:
+        body = await request.json()
+        batch_id = f"msgbatch_{len(batches) + 1:04d}"
+        batches[batch_id] = body["requests"]
+        polls[batch_id] = 0
+        return JSONResponse(batch_body(request, batch_id))
+
+    async def retrieve(request: Request) -> JSONResponse:
+        batch_id = request.path_params["batch_id"]
+        if batch_id not in batches:
+            return JSONResponse({"type": "error", "error": {"type": "not_found_error"}}, 404)
+        polls[batch_id] += 1
+        return JSONResponse(batch_body(request, batch_id))
+
+    async def results(request: Request) -> Response:
+        batch_id = request.path_params["batch_id"]
+        lines = [
+            json.dumps({"custom_id": item["custom_id"], "result": reply(item["custom_id"])})
+            for item in batches[batch_id]
+        ]
+        return Response("\n".join(lines) + "\n", media_type="application/binary")
+
+    app = Starlette(
+        routes=[
+            Route("/v1/messages/batches", create, methods=["POST"]),
+            Route("/v1/messages/batches/{batch_id}", retrieve, methods=["GET"]),
+            Route("/v1/messages/batches/{batch_id}/results", results, name="results"),
+        ]
+    )
+    app.state.batches = batches
+    return app
+
+
+app = create_app()
@@ -0,0 +1,47 @@
+"""Synthetic referral images that pass the pre-flight quality checks."""
+from io import BytesIO
+
+from PIL import Image, ImageDraw, ImageFont
+
+LINES = [
+    "PATHOLOGY REQUEST",
+    "Patient: JANE CITIZEN    DOB: 01/01/1970    Sex: F",
+    "Medicare: 0000 00000 0",
+    "Tests: FBC  E/LFT  TFT  HbA1c  Iron studies",
+    "Clinical notes: Fatigue. Query anaemia.",
+    "Requesting doctor: Dr. Example (0000000A)",
+]
+
+
+def referral_image(
+    image_format: str = "PNG", size: tuple[int, int] = (850, 1100), grain: float = 0.0
+) -> bytes:
+    """Render a printed-looking referral form.
+
+    Args:
+        image_format: Pillow format name (PNG, JPEG, GIF or WEBP)
+        size: Width and height in pixels
+        grain: Sensor-like noise blended in (0-1); makes files as large as phone photos
+
+    Returns:
+        Encoded image
+    """
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default(size=max(12, size[0] // 40))
+    step = size[1] // (len(LINES) * 3)
+    for row in range(len(LINES) * 2):
+        draw.text(
+            (size[0] // 12, step * (row + 1)), LINES[row % len(LINES)], fill="black", font=font
+        )
+    draw.rectangle(
+        (size[0] // 20, size[1] // 20, size[0] * 19 // 20, size[1] * 19 // 20),
+        outline="black",
+        width=3,
+    )
+    if grain:
+        noise = Image.effect_noise(size, 40).convert("RGB")
+        image = Image.blend(image, noise, grain)
+    buffer = BytesIO()
+    image.save(buffer, image_format, quality=95)
+    return buffer.getvalue()
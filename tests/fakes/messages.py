@@ -0,0 +1,76 @@
+"""Fake Messages API answering each model with a fixed reply."""
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+CHARS_PER_TOKEN = 4
+
+
+class FakeMessages:
+    """Messages API answering each model with a fixed reply (text, or an HTTP error status).
+
+    Output tokens are counted as one per four characters; replies longer than
+    the request's ``max_tokens`` are cut off with ``stop_reason: max_tokens``.
+    Serve ``app`` with ``tests.fakes.serve`` and set ``base_url``.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with no replies."""
+        self.replies: dict[str, str | int] = {}
+        self.requests: list[dict[str, object]] = []
+        self.base_url = ""
+        self.app = Starlette(routes=[Route("/v1/messages", self.create, methods=["POST"])])
+
+    def reset(self, replies: dict[str, str | int]) -> None:
+        """Set the replies and forget earlier requests.
+
+        Args:
+            replies: Reply text or HTTP error status by model
+        """
+        self.replies = replies
+        self.requests = []
+
+    @property
+    def models(self) -> list[str]:
+        """Get the models called, in order.
+
+        Returns:
+            Model IDs
+        """
+        return [str(request["model"]) for request in self.requests]
+
+    async def create(self, request: Request) -> JSONResponse:
+        """Answer ``POST /v1/messages``.
+
+        Args:
+            request: Messages API request
+
+        Returns:
+            Message, or an API error
+        """
+        body = await request.json()
+        self.requests.append(body)
+        reply = self.replies[body["model"]]
+        if isinstance(reply, int):
+            return JSONResponse(
+                {"type": "error", "error": {"type": "api_error", "message": "Fake"}}, reply
+            )
+        output_tokens = len(reply) // CHARS_PER_TOKEN + 1
+        stop_reason = "end_turn"
+        if output_tokens > body["max_tokens"]:
+            output_tokens = body["max_tokens"]
+            reply = reply[: output_tokens * CHARS_PER_TOKEN]
+            stop_reason = "max_tokens"
+        return JSONResponse(
+            {
+                "id": "msg_1",
+                "type": "message",
+                "role": "assistant",
+                "model": body["model"],
+                "content": [{"type": "text", "text": reply}],
+                "stop_reason": stop_reason,
+                "stop_sequence": None,
+                "usage": {"input_tokens": 1500, "output_tokens": output_tokens},
+            }
+        )
@@ -0,0 +1,232 @@
+"""Fake upstreams of the scan endpoints: Claude Messages API, catalog and auth.
+
+One server stands in for every dependency the service calls on a request:
+
+- ``POST /v1/messages`` and ``GET /v1/models`` (Anthropic API), answering
+  with the sample extraction after a configurable latency (per model),
+  failing a configurable fraction of calls, answering a configurable
+  fraction with low confidence (per model) and reporting configurable token
+  usage
+- ``GET /api/v1/tests``, ``POST /api/v1/tests/match`` and ``GET /health``
+  (test catalog), matching every name with a configurable latency
+- ``POST /oauth/token`` (client credentials) and ``GET /.well-known/jwks.json``
+  (the key that verifies tokens from ``POST /_fake/user-token``)
+
+``GET /_fake/referral-image`` renders a referral image that passes the
+service's quality checks, for clients to upload. ``GET``/``PUT /_fake/config`` read and replace the behaviour (and reset the
+call counts) at runtime, so a load test can run several scenarios against
+one server.
+
+Run standalone:
+    uvicorn tests.fakes.upstreams:app --port 8091
+"""
+import asyncio
+import json
+import random
+import time
+import uuid
+from typing import Any
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from tests.fakes.anthropic_batches import SAMPLE_EXTRACTION
+from tests.fakes.images import referral_image
+
+KEY_ID = "fake-upstreams"
+ISSUER = "fake-upstreams"
+
+DEFAULT_CONFIG: dict[str, Any] = {
+    "claude_latency_ms": 500.0,  # Mean Messages API latency
+    "claude_jitter_ms": 100.0,  # Latency standard deviation
+    "claude_error_rate": 0.0,  # Fraction of calls answered with claude_error_status
+    "claude_error_status": 529,  # 529 overloaded, 500 api error, 429 rate limited
+    "claude_input_tokens": 1600,
+    "claude_output_tokens": 350,
+    "claude_model_latency_ms": {},  # Mean latency by model, overriding claude_latency_ms
+    "claude_low_confidence_rates": {},  # Fraction of answers with low confidence, by model
+    "catalog_latency_ms": 20.0,
+}
+
+
+def _sleep_seconds(mean_ms: float, jitter_ms: float = 0.0) -> float:
+    """Draw a latency from a normal distribution, never below zero.
+
+    Args:
+        mean_ms: Mean latency in milliseconds
+        jitter_ms: Standard deviation in milliseconds
+
+    Returns:
+        Latency in seconds
+    """
+    return max(0.0, random.gauss(mean_ms, jitter_ms)) / 1000
+
+
+def _match(name: str) -> dict[str, Any]:
+    """Build a catalog match for a test name.
+
+    Args:
+        name: Test name
+
+    Returns:
+        Match in the catalog's batch response format
+    """
+    return {
+        "query": name,
+        "matched": True,
+        "name": name,
+        "code": name.upper().replace(" ", "_"),
+        "searchScore": 90,
+    }
+
+
+def create_app(**config: Any) -> Starlette:
+    """Create the fake upstreams.
+
+    Args:
+        **config: Overrides of ``DEFAULT_CONFIG``
+
+    Returns:
+        ASGI app; ``app.state.config`` holds the current behaviour and
+        ``app.state.calls`` counts calls by upstream
+    """
+    current = {**DEFAULT_CONFIG, **config}
+    calls = {"claude": 0, "catalog": 0, "oauth": 0}
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public_pem = (
+        private_key.public_key()
+        .public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo)
+        .decode()
+    )
+    public_jwk = {**jwk.construct(public_pem, "RS256").to_dict(), "kid": KEY_ID, "use": "sig"}
+
+    async def messages(request: Request) -> JSONResponse:
+        calls["claude"] += 1
+        body = await request.json()
+        model = body.get("model", "claude-sonnet-4-5-20250929")
+        latency_ms = current["claude_model_latency_ms"].get(model, current["claude_latency_ms"])
+        await asyncio.sleep(_sleep_seconds(latency_ms, current["claude_jitter_ms"]))
+        if random.random() < current["claude_error_rate"]:
+            error_type = {429: "rate_limit_error", 529: "overloaded_error"}.get(
+                current["claude_error_status"], "api_error"
+            )
+            return JSONResponse(
+                {"type": "error", "error": {"type": error_type, "message": "Fake failure"}},
+                current["claude_error_status"],
+            )
+        extraction = SAMPLE_EXTRACTION
+        if random.random() < current["claude_low_confidence_rates"].get(model, 0.0):
+            extraction = {**extraction, "confidence": {"patient": 0.4, "doctor": 0.4, "tests": 0.5}}
+        return JSONResponse(
+            {
+                "id": f"msg_{uuid.uuid4().hex}",
+                "type": "message",
+                "role": "assistant",
+                "model": model,
+                "content": [{"type": "text", "text": json.dumps(extraction)}],
+                "stop_reason": "end_turn",
+                "stop_sequence": None,
+                "usage": {
+                    "input_tokens": current["claude_input_tokens"],
+                    "output_tokens": current["claude_output_tokens"],
+                },
+            }
+        )
+
+    async def models(request: Request) -> JSONResponse:
+        model = {
+            "id": "claude-sonnet-4-5-20250929",
+            "type": "model",
+            "display_name": "Claude Sonnet 4.5",
+            "created_at": "2025-09-29T00:00:00Z",
+        }
+        return JSONResponse({"data": [model], "has_more": False, "first_id": None, "last_id": None})
+
+    async def search(request: Request) -> JSONResponse:
+        calls["catalog"] += 1
+        await asyncio.sleep(_sleep_seconds(current["catalog_latency_ms"]))
+        return JSONResponse({"tests": [_match(request.query_params.get("q", ""))]})
+
+    async def match(request: Request) -> JSONResponse:
+        calls["catalog"] += 1
+        body = await request.json()
+        await asyncio.sleep(_sleep_seconds(current["catalog_latency_ms"]))
+        return JSONResponse({"matches": [_match(name) for name in body.get("testNames", [])]})
+
+    async def health(request: Request) -> JSONResponse:
+        return JSONResponse({"status": "healthy"})
+
+    async def oauth_token(request: Request) -> JSONResponse:
+        calls["oauth"] += 1
+        return JSONResponse(
+            {"access_token": uuid.uuid4().hex, "token_type": "Bearer", "expires_in": 3600}
+        )
+
+    async def jwks(request: Request) -> JSONResponse:
+        return JSONResponse({"keys": [public_jwk]})
+
+    async def user_token(request: Request) -> JSONResponse:
+        body = await request.json() if await request.body() else {}
+        claims = {
+            "sub": body.get("sub", "load-test-user"),
+            "organization_id": body.get("organization_id", "load-test-org"),
+            "roles": body.get("roles", []),
+            "iss": ISSUER,
+            "iat": int(time.time()),
+            "exp": int(time.time()) + 3600,
+        }
+        token = jwt.encode(claims, private_pem, algorithm="RS256", headers={"kid": KEY_ID})
+        return JSONResponse({"access_token": token})
+
+    async def referral(request: Request) -> Response:
+        image_format = request.query_params.get("format", "JPEG").upper()
+        width = int(request.query_params.get("width", "1275"))
+        grain = float(request.query_params.get("grain", "0"))
+        # A4 portrait proportions
+        data = referral_image(image_format, (width, width * 297 // 210), grain)
+        return Response(data, media_type=f"image/{image_format.lower()}")
+
+    async def config_endpoint(request: Request) -> JSONResponse:
+        if request.method == "PUT":
+            updates = await request.json()
+            unknown = set(updates) - set(DEFAULT_CONFIG)
+            if unknown:
+                return JSONResponse({"error": f"Unknown settings: {sorted(unknown)}"}, 400)
+            # Each PUT describes a whole scenario: unspecified settings revert to defaults
+            current.clear()
+            current.update({**DEFAULT_CONFIG, **config, **updates})
+            for name in calls:
+                calls[name] = 0
+        return JSONResponse({"config": current, "calls": calls})
+
+    app = Starlette(
+        routes=[
+            Route("/v1/messages", messages, methods=["POST"]),
+            Route("/v1/models", models),
+            Route("/api/v1/tests", search),
+            Route("/api/v1/tests/match", match, methods=["POST"]),
+            Route("/health", health),
+            Route("/oauth/token", oauth_token, methods=["POST"]),
+            Route("/.well-known/jwks.json", jwks),
+            Route("/_fake/user-token", user_token, methods=["POST"]),
+            Route("/_fake/referral-image", referral),
+            Route("/_fake/config", config_endpoint, methods=["GET", "PUT"]),
+        ]
+    )
+    app.state.config = current
+    app.state.calls = calls
+    return app
+
+
+app = create_app()
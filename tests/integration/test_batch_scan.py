@@ -0,0 +1,153 @@
+"""Bulk scanning against the local fake Message Batches server."""
+import asyncio
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import anthropic
+import pytest
+from starlette.applications import Starlette
+
+from app.schemas.referral import MatchedTest
+from app.services import test_matcher
+from app.services.batch_scanner import BatchScanJob, custom_id
+from app.services.scan_files import collect_images
+from tests.fakes import serve
+from tests.fakes.anthropic_batches import create_app, extraction_reply
+from tests.fakes.images import referral_image
+
+
+class EchoMatcher(test_matcher.TestMatcherService):
+    """Matcher answering every test name with itself (no catalog service)."""
+
+    def __init__(self) -> None:
+        super().__init__(organization_id="org-123")
+        self.calls = 0
+
+    async def match_tests(self, test_names: list[str]) -> list[MatchedTest]:
+        self.calls += 1
+        return [
+            MatchedTest(original=name, matched=name, test_id=name, confidence=1.0)
+            for name in test_names
+        ]
+
+
+@pytest.fixture
+def fake_app() -> Starlette:
+    """Fake batches API whose batches end on the second poll."""
+    return create_app(polls_until_ended=2)
+
+
+@pytest.fixture
+def base_url(fake_app: Starlette) -> Iterator[str]:
+    """Base URL of the running fake batches API."""
+    yield from serve(fake_app)
+
+
+@pytest.fixture
+def images(tmp_path: Path) -> Path:
+    """Directory with three referral images and one non-image file."""
+    source = tmp_path / "referrals"
+    (source / "clinic-b").mkdir(parents=True)
+    (source / "a.png").write_bytes(referral_image("PNG"))
+    (source / "b.jpg").write_bytes(referral_image("JPEG"))
+    (source / "clinic-b" / "c.png").write_bytes(referral_image("PNG"))
+    (source / "notes.txt").write_text("not an image")
+    return source
+
+
+def _job(base_url: str, output: Path) -> BatchScanJob:
+    client = anthropic.AsyncAnthropic(api_key="test", base_url=base_url, max_retries=0)
+    return BatchScanJob(
+        client=client,
+        output_path=output,
+        organization_id="org-123",
+        matcher=EchoMatcher(),
+        poll_interval_seconds=0,
+        max_batch_requests=2,
+    )
+
+
+def _read(output: Path) -> list[dict[str, Any]]:
+    return [json.loads(line) for line in output.read_text().splitlines()]
+
+
+async def test_bulk_scan_writes_results(
+    base_url: str, fake_app: Starlette, images: Path, tmp_path: Path
+) -> None:
+    """Images are submitted in batches and their matched results written."""
+    output = tmp_path / "results.jsonl"
+    job = _job(base_url, output)
+
+    summary = await job.run(collect_images(images))
+
+    assert summary.as_dict() == {
+        "skipped": 0,
+        "submitted": 3,
+        "succeeded": 3,
+        "rejected": 0,
+        "failed": 0,
+    }
+    assert len(fake_app.state.batches) == 2  # max_batch_requests=2
+    records = _read(output)
+    assert {record["path"] for record in records} == {"a.png", "b.jpg", "clinic-b/c.png"}
+    data = records[0]["data"]
+    assert data["tests"] == ["FBC", "LFT"]
+    assert data["matchedTests"]
+    assert data["confidence"]["overall"] == pytest.approx((0.9 + 0.8 + 0.95) / 3)
+    assert json.loads(job.state_path.read_text()) == {"batches": {}, "outputFormats": {}}
+
+
+async def test_bulk_scan_resumes_after_interruption(
+    base_url: str, fake_app: Starlette, images: Path, tmp_path: Path
+) -> None:
+    """A re-run collects already submitted batches instead of resubmitting."""
+    output = tmp_path / "results.jsonl"
+    interrupted = _job(base_url, output)
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(_cancel_after_submit(interrupted, collect_images(images)), 5)
+    assert len(fake_app.state.batches) == 2
+
+    summary = await _job(base_url, output).run(collect_images(images))
+
+    assert summary.skipped == 3
+    assert summary.submitted == 0
+    assert summary.succeeded == 3
+    assert len(fake_app.state.batches) == 2
+
+    rerun = await _job(base_url, output).run(collect_images(images))
+    assert rerun.skipped == 3
+    assert len(_read(output)) == 3
+
+
+async def _cancel_after_submit(job: BatchScanJob, images: list[tuple[str, Path]]) -> None:
+    """Run a job but cancel it once its batches are submitted."""
+
+    async def interrupt() -> None:
+        raise asyncio.CancelledError
+
+    job._collect = interrupt  # type: ignore[method-assign]
+    await job.run(images)
+
+
+async def test_bulk_scan_records_rejections(tmp_path: Path, images: Path) -> None:
+    """Non-referrals and unsupported files get a final ``rejected`` result."""
+
+    def reply(cid: str) -> dict[str, Any]:
+        if cid == custom_id("b.jpg"):
+            result = extraction_reply(cid)
+            result["message"]["content"][0]["text"] = '{"error": "Not a pathology referral"}'
+            return result
+        return extraction_reply(cid)
+
+    manifest = images / "manifest.txt"
+    manifest.write_text("a.png\nb.jpg\n# comment\nnotes.txt\n")
+    output = tmp_path / "results.jsonl"
+
+    for url in serve(create_app(reply=reply)):
+        summary = await _job(url, output).run(collect_images(manifest))
+
+    assert (summary.succeeded, summary.rejected) == (1, 2)
+    statuses = {record["path"]: record["status"] for record in _read(output)}
+    assert statuses == {"a.png": "succeeded", "b.jpg": "rejected", "notes.txt": "rejected"}
@@ -0,0 +1,99 @@
+"""JWT authentication middleware."""
+from collections.abc import Iterator
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from starlette.types import ASGIApp
+
+from app.core.security import JWKSClient, JWTValidator
+from app.middleware.auth import JWTAuthMiddleware
+from app.middleware.request_id import RequestIDMiddleware
+from tests.fakes import serve
+from tests.fakes.upstreams import ISSUER, create_app
+
+REQUEST_ID = "req-auth-1"
+
+
+@pytest.fixture(scope="module")
+def upstreams() -> Iterator[str]:
+    """Running fake upstreams serving the JWKS and issuing user tokens.
+
+    Yields:
+        Base URL
+    """
+    yield from serve(create_app())
+
+
+def _app(upstreams_url: str) -> ASGIApp:
+    app = FastAPI()
+
+    @app.get("/protected")
+    async def protected(request: Request) -> dict[str, str]:
+        return {"organizationId": request.state.organization_id}
+
+    validator = JWTValidator(
+        jwks_client=JWKSClient(f"{upstreams_url}/.well-known/jwks.json"),
+        issuer=ISSUER,
+        audience="",
+    )
+    return RequestIDMiddleware(JWTAuthMiddleware(app, jwt_validator=validator))
+
+
+async def _get(upstreams_url: str, headers: dict[str, str]) -> httpx.Response:
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=_app(upstreams_url)), base_url="http://test"
+    ) as client:
+        return await client.get("/protected", headers={"X-Request-ID": REQUEST_ID, **headers})
+
+
+async def _user_token(upstreams_url: str, **claims: str) -> str:
+    async with httpx.AsyncClient() as client:
+        response = await client.post(f"{upstreams_url}/_fake/user-token", json=claims)
+    return str(response.json()["access_token"])
+
+
+async def test_valid_token_is_admitted(upstreams: str) -> None:
+    """A signed token with the required claims reaches the endpoint."""
+    token = await _user_token(upstreams, organization_id="org-1")
+
+    response = await _get(upstreams, {"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert response.json() == {"organizationId": "org-1"}
+
+
+def _assert_unauthorized(response: httpx.Response, message: str) -> None:
+    assert response.status_code == 401
+    assert response.headers["X-Request-ID"] == REQUEST_ID
+    body = response.json()
+    assert body.keys() == {"error", "message", "details", "request_id", "timestamp"}
+    assert body["error"] == "UnauthorizedError"
+    assert body["message"] == message
+    assert body["details"] is None
+    assert body["request_id"] == REQUEST_ID
+
+
+@pytest.mark.parametrize(
+    ("headers", "message"),
+    [
+        ({}, "Missing Authorization header"),
+        ({"Authorization": "Basic dXNlcjpwYXNz"}, "Invalid Authorization header format"),
+        ({"Authorization": "Bearer not-a-jwt"}, "Invalid token"),
+    ],
+    ids=["missing", "not_bearer", "malformed"],
+)
+async def test_bad_tokens_get_401_error_response(
+    upstreams: str, headers: dict[str, str], message: str
+) -> None:
+    """Authentication failures are answered with 401 in the standard error format."""
+    _assert_unauthorized(await _get(upstreams, headers), message)
+
+
+async def test_token_without_organization_gets_401(upstreams: str) -> None:
+    """A valid signature is not enough; the organization claim is required."""
+    token = await _user_token(upstreams, organization_id="")
+
+    response = await _get(upstreams, {"Authorization": f"Bearer {token}"})
+
+    _assert_unauthorized(response, "Token missing 'organization_id' claim")
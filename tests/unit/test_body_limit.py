@@ -0,0 +1,97 @@
+"""Request body size limit middleware."""
+from collections.abc import AsyncIterator
+from io import BytesIO
+from typing import Annotated
+
+import httpx
+import pytest
+from fastapi import FastAPI, File, UploadFile
+
+from app.middleware.body_limit import BodySizeLimitMiddleware
+from app.routers.referral import _read_upload
+
+LIMIT = 64 * 1024
+
+
+def _app(received: list[int]) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(image: Annotated[UploadFile, File()]) -> dict[str, int]:
+        data = await image.read()
+        received.append(len(data))
+        return {"size": len(data)}
+
+    @app.post("/other")
+    async def other(image: Annotated[UploadFile, File()]) -> dict[str, int]:
+        return {"size": len(await image.read())}
+
+    app.add_middleware(BodySizeLimitMiddleware, paths=["/upload"], max_body_bytes=LIMIT)
+    return app
+
+
+def _client(app: FastAPI) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def test_upload_within_limit_passes() -> None:
+    """Uploads under the limit reach the endpoint intact."""
+    received: list[int] = []
+    async with _client(_app(received)) as client:
+        response = await client.post("/upload", files={"image": ("a.png", b"x" * 1000)})
+
+    assert response.status_code == 200
+    assert received == [1000]
+
+
+async def test_declared_oversized_body_is_rejected_unread() -> None:
+    """An oversized Content-Length is rejected before the endpoint runs."""
+    received: list[int] = []
+    async with _client(_app(received)) as client:
+        response = await client.post("/upload", files={"image": ("a.png", b"x" * LIMIT * 2)})
+
+    assert response.status_code == 413
+    assert response.json()["error"] == "PayloadTooLargeError"
+    assert received == []
+
+
+async def test_streamed_oversized_body_is_cut_off() -> None:
+    """Chunked uploads stop being read once they cross the limit."""
+    chunks_sent = 0
+
+    async def body() -> AsyncIterator[bytes]:
+        nonlocal chunks_sent
+        yield b'--b\r\nContent-Disposition: form-data; name="image"; filename="a.png"\r\n\r\n'
+        for _ in range(100):
+            chunks_sent += 1
+            yield b"x" * 16 * 1024
+
+    received: list[int] = []
+    async with _client(_app(received)) as client:
+        response = await client.post(
+            "/upload",
+            content=body(),
+            headers={"Content-Type": "multipart/form-data; boundary=b"},
+        )
+
+    assert response.status_code == 413
+    assert received == []
+    assert chunks_sent < 10
+
+
+async def test_other_paths_are_not_limited() -> None:
+    """Routes outside the configured paths accept any size."""
+    async with _client(_app([])) as client:
+        response = await client.post("/other", files={"image": ("a.png", b"x" * LIMIT * 2)})
+
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("size", [5, None], ids=["size_known", "size_unknown"])
+async def test_upload_spool_is_closed_after_read(size: int | None) -> None:
+    """Reading an upload closes its spool, so only the returned copy stays in memory."""
+    spool = BytesIO(b"image")
+    upload = UploadFile(spool, size=size)
+
+    assert await _read_upload(upload) == b"image"
+    assert spool.closed
@@ -0,0 +1,64 @@
+"""Catalog call latency metrics."""
+from collections.abc import Iterator
+
+import pytest
+from prometheus_client import REGISTRY
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.services import test_matcher
+from app.services.oauth_client import OAuthClient
+from tests.fakes import serve
+
+
+@pytest.fixture(scope="module")
+def failing_catalog() -> Iterator[str]:
+    """Running fake catalog answering every call with 503.
+
+    Yields:
+        Base URL
+    """
+
+    async def unavailable(request: Request) -> JSONResponse:
+        return JSONResponse({"detail": "unavailable"}, status_code=503)
+
+    app = Starlette(
+        routes=[
+            Route("/api/v1/tests/match", unavailable, methods=["POST"]),
+            Route("/api/v1/tests", unavailable),
+        ]
+    )
+    yield from serve(app)
+
+
+def _calls(operation: str, outcome: str) -> float:
+    return (
+        REGISTRY.get_sample_value(
+            "catalog_request_duration_seconds_count",
+            {"operation": operation, "outcome": outcome},
+        )
+        or 0.0
+    )
+
+
+async def test_non_200_responses_are_recorded_as_errors(failing_catalog: str) -> None:
+    """A catalog answering 503 shows up as errors, not successes, for both operations."""
+    matcher = test_matcher.TestMatcherService(organization_id="org-1")
+    matcher.catalog_url = failing_catalog
+    matcher.oauth_client = OAuthClient()
+    matcher.oauth_client.enabled = False
+    before = {
+        (operation, outcome): _calls(operation, outcome)
+        for operation in ("batch", "single")
+        for outcome in ("success", "error")
+    }
+
+    matched = await matcher.match_tests(["FBC"])
+
+    assert [test.test_id for test in matched] == [""]
+    assert _calls("batch", "error") == before["batch", "error"] + 1
+    assert _calls("single", "error") == before["single", "error"] + 1
+    assert _calls("batch", "success") == before["batch", "success"]
+    assert _calls("single", "success") == before["single", "success"]
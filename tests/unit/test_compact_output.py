@@ -0,0 +1,135 @@
+"""Compact extraction replies: short keys and omitted nulls, expanded locally."""
+import json
+
+import anthropic
+import pytest
+
+from app.services import claude_vision
+from app.services.claude_vision import (
+    COMPACT_EXTRACTION_PROMPT,
+    MAX_TOKENS,
+    ClaudeVisionService,
+    ExtractionParseError,
+    OutputFormat,
+    build_message_params,
+    parse_extraction_response,
+)
+from tests.fakes.messages import FakeMessages
+
+MODEL = "claude-large"
+
+VERBOSE = {
+    "patient": {
+        "firstName": "JANE",
+        "lastName": "CITIZEN",
+        "dateOfBirth": "1970-01-01",
+        "sex": "F",
+        "medicareNumber": None,
+        "address": None,
+    },
+    "doctor": {
+        "name": "Dr. Example",
+        "providerNumber": "0000000A",
+        "practice": None,
+        "phone": None,
+        "address": None,
+    },
+    "tests": ["FBC", "E/LFT", "HbA1c"],
+    "clinicalNotes": "Fatigue",
+    "urgent": True,
+    "collectionDate": None,
+    "confidence": {"patient": 0.92, "doctor": 0.85, "tests": 0.9},
+}
+
+COMPACT = {
+    "p": {"fn": "JANE", "ln": "CITIZEN", "dob": "1970-01-01", "sex": "F"},
+    "d": {"n": "Dr. Example", "pn": "0000000A"},
+    "t": ["FBC", "E/LFT", "HbA1c"],
+    "cn": "Fatigue",
+    "u": 1,
+    "c": [0.92, 0.85, 0.9],
+}
+
+
+@pytest.mark.parametrize(
+    "text",
+    [json.dumps(COMPACT, separators=(",", ":")), f"```json\n{json.dumps(COMPACT)}\n```"],
+    ids=["bare", "fenced"],
+)
+def test_compact_reply_expands_to_verbose(text: str) -> None:
+    """Compact replies parse into the same dictionary as verbose ones."""
+    assert parse_extraction_response(text, "compact") == VERBOSE
+    assert parse_extraction_response(json.dumps(VERBOSE)) == VERBOSE
+
+
+def test_compact_rejection_and_empty_reply() -> None:
+    """The short error key maps to ``error``; an empty reply means nothing was found."""
+    assert parse_extraction_response('{"e":"Not a pathology referral"}', "compact") == {
+        "error": "Not a pathology referral"
+    }
+    empty = parse_extraction_response("{}", "compact")
+    assert empty["tests"] == []
+    assert empty["urgent"] is False
+    assert empty["confidence"] == {}
+
+
+@pytest.mark.parametrize(
+    ("text", "output_format"),
+    [
+        ("{}", "verbose"),
+        ("[]", "verbose"),
+        (json.dumps(COMPACT), "verbose"),
+        (json.dumps(VERBOSE), "compact"),
+        (json.dumps({**COMPACT, "c": ["high", 0.9, 0.9]}), "compact"),
+        (json.dumps({**COMPACT, "c": [0.9, 0.9]}), "compact"),
+        (json.dumps({**COMPACT, "c": 0.9}), "compact"),
+        (json.dumps({**COMPACT, "t": "FBC"}), "compact"),
+        (json.dumps({**COMPACT, "t": [{"name": "FBC"}]}), "compact"),
+        (json.dumps({**COMPACT, "u": "yes"}), "compact"),
+        (json.dumps({**COMPACT, "p": ["JANE"]}), "compact"),
+        (json.dumps({**COMPACT, "p": {"fn": 1}}), "compact"),
+    ],
+    ids=[
+        "empty_verbose",
+        "array",
+        "compact_as_verbose",
+        "verbose_as_compact",
+        "confidence_text",
+        "confidence_short",
+        "confidence_scalar",
+        "tests_string",
+        "tests_objects",
+        "urgent_text",
+        "patient_list",
+        "patient_number",
+    ],
+)
+def test_malformed_replies_are_parse_errors(text: str, output_format: OutputFormat) -> None:
+    """Replies not shaped like the requested format are rejected, not half-expanded."""
+    with pytest.raises(ExtractionParseError):
+        parse_extraction_response(text, output_format)
+
+
+def test_compact_params() -> None:
+    """Compact requests send the compact prompt and the given token limit."""
+    params = build_message_params(MODEL, "aW1hZ2U=", "image/png", "compact", 512)
+
+    assert params["max_tokens"] == 512
+    assert params["messages"][0]["content"][1]["text"] == COMPACT_EXTRACTION_PROMPT
+
+
+async def test_truncated_compact_reply_is_retried_with_full_budget(
+    fake_messages: FakeMessages, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A reply cut off at the compact limit is requested again with ``MAX_TOKENS``."""
+    monkeypatch.setattr(claude_vision.settings, "anthropic_output_format", "compact")
+    monkeypatch.setattr(claude_vision.settings, "anthropic_compact_max_tokens", 16)
+    fake_messages.reset({MODEL: json.dumps(COMPACT)})
+    service = ClaudeVisionService("direct")
+    service.model = MODEL
+    service.client = anthropic.Anthropic(
+        api_key="test", base_url=fake_messages.base_url, max_retries=0
+    )
+
+    assert await service.extract_referral_data(b"image") == VERBOSE
+    assert [request["max_tokens"] for request in fake_messages.requests] == [16, MAX_TOKENS]
@@ -0,0 +1,102 @@
+"""Concurrent directory scanning into JSONL."""
+import asyncio
+import json
+from pathlib import Path
+
+from app.core.exceptions import ValidationError
+from app.schemas.referral import ConfidenceScores, DoctorInfo, PatientInfo, ReferralData
+from app.services.directory_scanner import DirectoryScanJob
+from app.services.scan_files import collect_images
+
+
+class FakeScan:
+    """Scan stand-in tracking its peak concurrency."""
+
+    def __init__(self, delay: float = 0.02) -> None:
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.peak = 0
+
+    async def __call__(self, image_bytes: bytes, image_type: str) -> ReferralData:
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if image_bytes == b"not a referral":
+                raise ValidationError("Not a referral")
+            if image_bytes == b"boom":
+                raise RuntimeError("Claude unavailable")
+            if image_bytes == b"stale handle":
+                raise OSError(116, "Stale file handle")
+            return ReferralData(
+                patient=PatientInfo(),
+                doctor=DoctorInfo(),
+                confidence=ConfidenceScores(patient=1.0, doctor=1.0, tests=1.0, overall=1.0),
+            )
+        finally:
+            self.in_flight -= 1
+
+
+def _images(root: Path, contents: dict[str, bytes]) -> Path:
+    for name, data in contents.items():
+        path = root / "images" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    return root / "images"
+
+
+def _records(output: Path) -> dict[str, dict]:
+    return {record["path"]: record for record in map(json.loads, output.read_text().splitlines())}
+
+
+async def test_scans_with_bounded_concurrency(tmp_path: Path) -> None:
+    """All images are scanned, never more than ``concurrency`` at once."""
+    source = _images(tmp_path, {f"clinic/{i:03}.png": b"image" for i in range(10)})
+    output = tmp_path / "results.jsonl"
+    scan = FakeScan()
+
+    summary = await DirectoryScanJob(output, "org-123", concurrency=3, scan=scan).run(
+        collect_images(source)
+    )
+
+    assert scan.calls == 10
+    assert scan.peak == 3
+    assert summary.succeeded == 10
+    assert {record["status"] for record in _records(output).values()} == {"succeeded"}
+    assert set(summary.as_dict()["latencyMs"]) == {"p50", "p90", "p99", "max"}
+
+
+async def test_classifies_failures_and_resumes(tmp_path: Path) -> None:
+    """Rejected images are final; failed ones (including I/O errors) are scanned again."""
+    source = _images(
+        tmp_path,
+        {
+            "ok.png": b"image",
+            "letter.png": b"not a referral",
+            "notes.txt.gif": b"x" * (11 * 1024 * 1024),
+            "flaky.jpg": b"boom",
+            "share/remote.png": b"stale handle",
+        },
+    )
+    output = tmp_path / "results.jsonl"
+
+    first = await DirectoryScanJob(output, "org-123", scan=FakeScan()).run(collect_images(source))
+    assert (first.succeeded, first.rejected, first.failed) == (1, 2, 2)
+    assert _records(output)["flaky.jpg"]["status"] == "failed"
+    assert _records(output)["share/remote.png"]["status"] == "failed"
+
+    scan = FakeScan()
+    second = await DirectoryScanJob(output, "org-123", scan=scan).run(collect_images(source))
+    assert second.skipped == 3
+    assert scan.calls == 2
+
+
+def test_collect_images_glob(tmp_path: Path) -> None:
+    """Globs match images in subdirectories and ignore other files."""
+    _images(tmp_path, {"a/1.png": b"", "a/b/2.JPG": b"", "a/notes.txt": b""})
+
+    images = collect_images(f"{tmp_path}/images/**/*")
+
+    assert [path.name for _, path in images] == ["1.png", "2.JPG"]
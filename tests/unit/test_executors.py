@@ -0,0 +1,60 @@
+"""Managed offload executors."""
+import asyncio
+import threading
+from contextvars import ContextVar
+
+import pytest
+
+from app.core.executors import ManagedExecutor
+from app.services import image_quality
+from tests.fakes.images import referral_image
+
+request_id: ContextVar[str] = ContextVar("request_id", default="")
+
+
+async def test_thread_pool_keeps_the_callers_context() -> None:
+    """Thread pool tasks see the request's context variables."""
+    pool = ManagedExecutor("test", "thread", max_workers=2)
+    request_id.set("req-1")
+
+    try:
+        assert await pool.run(request_id.get) == "req-1"
+        assert pool.in_flight == 0
+    finally:
+        pool.shutdown()
+
+
+async def test_abandoned_request_drops_its_queued_task() -> None:
+    """Cancelling the caller removes a task that has not started yet."""
+    pool = ManagedExecutor("test", "thread", max_workers=1)
+    release = threading.Event()
+    ran: list[str] = []
+
+    try:
+        busy = asyncio.create_task(pool.run(release.wait))
+        queued = asyncio.create_task(pool.run(ran.append, "queued"))
+        await asyncio.sleep(0.01)
+        assert pool.in_flight == 2
+
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        release.set()
+        await busy
+
+        assert ran == []
+        assert pool.in_flight == 0
+    finally:
+        pool.shutdown()
+
+
+async def test_image_check_on_process_pool(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The pixel checks can run in worker processes."""
+    monkeypatch.setattr(image_quality.settings, "image_quality_executor", "process")
+    pool = ManagedExecutor("test", "process", max_workers=1)
+    monkeypatch.setattr(image_quality.executors, "process", pool)
+
+    try:
+        assert await image_quality.check_image(referral_image(), "image/png", "org-1") == "image/png"
+    finally:
+        pool.shutdown()
@@ -0,0 +1,200 @@
+"""Idempotency-Key deduplication and record stores."""
+import asyncio
+from collections.abc import Iterator
+
+import boto3
+import pytest
+from cryptography.fernet import Fernet
+from fastapi import HTTPException, Response
+from moto import mock_aws
+
+from app.core.exceptions import ValidationError
+from app.repositories.idempotency import (
+    DynamoDBIdempotencyStore,
+    IdempotencyRecord,
+    InMemoryIdempotencyStore,
+)
+from app.services.idempotency import (
+    REPLAYED_HEADER,
+    UNENCRYPTED_RETENTION_SECONDS,
+    IdempotencyService,
+)
+
+TABLE = "test-idempotency-keys"
+REGION = "us-east-1"
+
+
+class CountingOperation:
+    """Scan stand-in counting its executions."""
+
+    def __init__(self, status_code: int = 200, delay: float = 0.0) -> None:
+        self.status_code = status_code
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self) -> Response:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return Response(content=b'{"success":true}', status_code=self.status_code)
+
+
+@pytest.fixture
+def service() -> IdempotencyService:
+    """Service backed by the in-memory store."""
+    return IdempotencyService(
+        store=InMemoryIdempotencyStore(), retention_seconds=60, lock_seconds=5
+    )
+
+
+async def test_duplicate_gets_stored_response(service: IdempotencyService) -> None:
+    """A retry after completion replays the stored response."""
+    operation = CountingOperation()
+
+    first = await service.execute("org-1", "key-1", "fp", operation)
+    second = await service.execute("org-1", "key-1", "fp", operation)
+
+    assert operation.calls == 1
+    assert second.body == first.body
+    assert second.headers[REPLAYED_HEADER] == "true"
+
+
+async def test_concurrent_duplicates_attach_to_in_flight(service: IdempotencyService) -> None:
+    """Duplicates arriving while the first request runs share its execution."""
+    operation = CountingOperation(delay=0.05)
+
+    responses = await asyncio.gather(
+        *(service.execute("org-1", "key-1", "fp", operation) for _ in range(5))
+    )
+
+    assert operation.calls == 1
+    assert {response.body for response in responses} == {b'{"success":true}'}
+
+
+async def test_keys_are_scoped_by_organization(service: IdempotencyService) -> None:
+    """The same key from different organizations runs separately."""
+    operation = CountingOperation()
+
+    await service.execute("org-1", "key-1", "fp", operation)
+    await service.execute("org-2", "key-1", "fp", operation)
+
+    assert operation.calls == 2
+
+
+async def test_key_reused_for_different_request(service: IdempotencyService) -> None:
+    """Reusing a key for a different request is rejected."""
+    await service.execute("org-1", "key-1", "fp-a", CountingOperation())
+
+    with pytest.raises(ValidationError):
+        await service.execute("org-1", "key-1", "fp-b", CountingOperation())
+
+
+async def test_failure_releases_key(service: IdempotencyService) -> None:
+    """Failed requests are not stored, so a retry runs again."""
+
+    async def fail() -> Response:
+        raise HTTPException(status_code=500, detail="boom")
+
+    with pytest.raises(HTTPException):
+        await service.execute("org-1", "key-1", "fp", fail)
+
+    operation = CountingOperation()
+    await service.execute("org-1", "key-1", "fp", operation)
+    assert operation.calls == 1
+
+
+async def test_error_response_not_stored(service: IdempotencyService) -> None:
+    """Non-2xx responses are returned but not replayed."""
+    operation = CountingOperation(status_code=400)
+
+    await service.execute("org-1", "key-1", "fp", operation)
+    await service.execute("org-1", "key-1", "fp", operation)
+
+    assert operation.calls == 2
+
+
+async def test_stored_body_is_encrypted() -> None:
+    """With a key the store only sees ciphertext, and rotated keys still replay."""
+    old_key, new_key = Fernet.generate_key().decode(), Fernet.generate_key().decode()
+    store = InMemoryIdempotencyStore()
+    operation = CountingOperation()
+    await IdempotencyService(store, 60, 5, encryption_key=old_key).execute(
+        "org-1", "key-1", "fp", operation
+    )
+
+    record = await store.get("org-1", "key-1")
+    assert record is not None and record.response is not None
+    assert b"success" not in record.response.body
+
+    rotated = IdempotencyService(store, 60, 5, encryption_key=f"{new_key},{old_key}")
+    replay = await rotated.execute("org-1", "key-1", "fp", operation)
+    assert operation.calls == 1
+    assert replay.body == b'{"success":true}'
+
+
+def test_unencrypted_retention_is_capped() -> None:
+    """Without a key, responses are kept for the retry window only."""
+    service = IdempotencyService(InMemoryIdempotencyStore(), 86400, 5)
+
+    assert service.retention_seconds == UNENCRYPTED_RETENTION_SECONDS
+
+
+@pytest.fixture
+def dynamodb_store(monkeypatch: pytest.MonkeyPatch) -> Iterator[DynamoDBIdempotencyStore]:
+    """DynamoDB store backed by a moto-mocked table.
+
+    Yields:
+        DynamoDB idempotency store
+    """
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        boto3.client("dynamodb", region_name=REGION).create_table(
+            TableName=TABLE,
+            AttributeDefinitions=[{"AttributeName": "PK", "AttributeType": "S"}],
+            KeySchema=[{"AttributeName": "PK", "KeyType": "HASH"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        yield DynamoDBIdempotencyStore(table_name=TABLE, region=REGION)
+
+
+def _claim(expires_at: float) -> IdempotencyRecord:
+    return IdempotencyRecord(
+        organization_id="org-1",
+        key="key-1",
+        fingerprint="fp",
+        status="in_progress",
+        expires_at=expires_at,
+    )
+
+
+async def test_dynamodb_claim_is_exclusive(dynamodb_store: DynamoDBIdempotencyStore) -> None:
+    """Only one claim succeeds until the claim expires or is released."""
+    assert await dynamodb_store.claim(_claim(expires_at=2e9))
+    assert not await dynamodb_store.claim(_claim(expires_at=2e9))
+
+    await dynamodb_store.release("org-1", "key-1")
+    assert await dynamodb_store.claim(_claim(expires_at=2e9))
+
+
+async def test_dynamodb_expired_claim_can_be_taken(
+    dynamodb_store: DynamoDBIdempotencyStore,
+) -> None:
+    """Claims left by a crashed instance expire."""
+    assert await dynamodb_store.claim(_claim(expires_at=1))
+    assert await dynamodb_store.get("org-1", "key-1") is None
+    assert await dynamodb_store.claim(_claim(expires_at=2e9))
+
+
+async def test_dynamodb_replays_stored_response(
+    dynamodb_store: DynamoDBIdempotencyStore,
+) -> None:
+    """Responses stored in DynamoDB are replayed."""
+    service = IdempotencyService(store=dynamodb_store, retention_seconds=60, lock_seconds=5)
+    operation = CountingOperation()
+
+    await service.execute("org-1", "key-1", "fp", operation)
+    replay = await service.execute("org-1", "key-1", "fp", operation)
+
+    assert operation.calls == 1
+    assert replay.body == b'{"success":true}'
+    assert replay.headers[REPLAYED_HEADER] == "true"
@@ -0,0 +1,65 @@
+"""Pre-flight image quality checks."""
+from io import BytesIO
+
+import pytest
+from PIL import Image, ImageFilter
+
+from app.core.exceptions import ValidationError
+from app.services.image_quality import check_image, detect_image_type, inspect_image
+from app.services.referral_scanner import validate_image
+from tests.fakes.images import referral_image
+
+
+def _encode(image: Image.Image, image_format: str = "PNG") -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, image_format)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize(
+    ("image_format", "image_type"),
+    [("PNG", "image/png"), ("JPEG", "image/jpeg"), ("GIF", "image/gif"), ("WEBP", "image/webp")],
+)
+def test_type_comes_from_magic_bytes(image_format: str, image_type: str) -> None:
+    """The detected type wins over the declared content type."""
+    data = referral_image(image_format)
+
+    assert detect_image_type(data) == image_type
+    assert inspect_image(data, "image/jpeg", "org-123") == image_type
+
+
+@pytest.mark.parametrize("declared_type", ["application/octet-stream", "image/jpeg", ""])
+def test_validation_uses_detected_type(declared_type: str) -> None:
+    """A supported image passes validation whatever content type it was sent with."""
+    assert validate_image(referral_image("PNG"), declared_type, "org-123") == "image/png"
+
+
+def test_validation_rejects_unsupported_undetected_type() -> None:
+    """Files not recognised by their magic bytes fall back to the declared type."""
+    with pytest.raises(ValidationError, match="Invalid image type: application/pdf"):
+        validate_image(b"%PDF-1.7 referral", "application/pdf", "org-123")
+
+
+@pytest.mark.parametrize(
+    ("data", "message"),
+    [
+        (b"%PDF-1.7 referral", "not a JPEG, PNG, GIF or WebP"),
+        (b"\x89PNG\r\n\x1a\ntruncated", "could not be decoded"),
+        (referral_image(size=(300, 400)), r"too small \(300x400 pixels\)"),
+        (_encode(Image.new("L", (850, 1100), 245)), "blank"),
+        (
+            _encode(Image.open(BytesIO(referral_image())).filter(ImageFilter.GaussianBlur(6))),
+            "too blurry",
+        ),
+    ],
+    ids=["format", "undecodable", "resolution", "blank", "blur"],
+)
+def test_unusable_images_are_rejected(data: bytes, message: str) -> None:
+    """Unusable images fail with an actionable error."""
+    with pytest.raises(ValidationError, match=message):
+        inspect_image(data, "image/png", "org-123")
+
+
+async def test_check_runs_on_pool() -> None:
+    """The async check gives the same answer as the blocking one."""
+    assert await check_image(referral_image("JPEG"), "image/jpg", "org-123") == "image/jpeg"
@@ -0,0 +1,68 @@
+"""Import-time budget for the application module.
+
+``import app.main`` runs on every worker start, CLI invocation and test
+session, so heavy SDKs must stay out of it (they are imported lazily and
+pre-loaded by the startup warm-up instead).
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Generous enough for slow CI runners; importing the anthropic SDK eagerly adds ~1 s
+IMPORT_TIME_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "1500"))
+
+# Heavy modules that must only be imported lazily
+LAZY_MODULES = {"anthropic", "boto3", "botocore"}
+
+
+def _import_times(module: str) -> dict[str, int]:
+    """Import a module in a fresh interpreter with ``-X importtime``.
+
+    Args:
+        module: Module to import
+
+    Returns:
+        Cumulative import time in microseconds by module name
+    """
+    # Compile bytecode first, so the measured run does not include it
+    subprocess.run([sys.executable, "-c", f"import {module}"], check=True, capture_output=True)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative_us)
+    return times
+
+
+@pytest.fixture(scope="module")
+def app_import_times() -> dict[str, int]:
+    """Import times for ``app.main``.
+
+    Returns:
+        Cumulative import time in microseconds by module name
+    """
+    return _import_times("app.main")
+
+
+def test_app_import_within_budget(app_import_times: dict[str, int]) -> None:
+    """Importing app.main stays within the import-time budget."""
+    duration_ms = app_import_times["app.main"] / 1000
+    assert duration_ms <= IMPORT_TIME_BUDGET_MS, (
+        f"import app.main took {duration_ms:.0f} ms (budget {IMPORT_TIME_BUDGET_MS:.0f} ms); "
+        "run `python -X importtime -c 'import app.main'` to find the slow import"
+    )
+
+
+def test_heavy_modules_imported_lazily(app_import_times: dict[str, int]) -> None:
+    """Heavy SDKs are not imported by app.main."""
+    assert LAZY_MODULES.isdisjoint(app_import_times)
@@ -0,0 +1,92 @@
+"""Load shedding middleware."""
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.config import settings
+from app.core.loop_monitor import LoopLagMonitor
+from app.middleware.load_shedding import LoadSheddingMiddleware
+
+UNSHED_PATHS = ["/health", "/ready", "/metrics"]
+
+
+def _app(release: asyncio.Event, entered: asyncio.Event) -> LoadSheddingMiddleware:
+    app = FastAPI()
+
+    @app.post("/scan")
+    async def scan() -> dict[str, bool]:
+        entered.set()
+        await release.wait()
+        return {"success": True}
+
+    @app.post("/fail")
+    async def fail() -> None:
+        raise RuntimeError("boom")
+
+    for path in UNSHED_PATHS:
+        app.add_api_route(path, lambda: {"status": "ok"})
+
+    return LoadSheddingMiddleware(
+        app,
+        lag_monitor=LoopLagMonitor(interval_seconds=1.0, watchdog_threshold_seconds=None),
+        paths=["/scan", "/fail"],
+        max_loop_lag_seconds=0.5,
+        max_in_flight=1,
+        max_in_flight_bytes=0,
+        retry_after_seconds=7,
+    )
+
+
+def _client(app: LoadSheddingMiddleware) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def test_in_flight_limit_sheds_with_retry_after() -> None:
+    """A request over the in-flight limit gets 503 and Retry-After; others are served."""
+    release, entered = asyncio.Event(), asyncio.Event()
+    app = _app(release, entered)
+    async with _client(app) as client:
+        first = asyncio.create_task(client.post("/scan"))
+        await entered.wait()
+
+        shed = await client.post("/scan")
+        unshed = [await client.get(path) for path in UNSHED_PATHS]
+
+        release.set()
+        assert (await first).status_code == 200
+
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == "7"
+    assert shed.json()["error"] == "ServiceUnavailableError"
+    assert [response.status_code for response in unshed] == [200, 200, 200]
+
+
+async def test_loop_lag_sheds_expensive_routes_only() -> None:
+    """Loop lag over the threshold sheds the scan routes but never health or metrics."""
+    app = _app(asyncio.Event(), asyncio.Event())
+    app.lag_monitor.lag_seconds = 0.75
+    async with _client(app) as client:
+        shed = await client.post("/scan")
+        unshed = [await client.get(path) for path in UNSHED_PATHS]
+
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == "7"
+    assert [response.status_code for response in unshed] == [200, 200, 200]
+    assert not set(UNSHED_PATHS) & set(settings.load_shedding_paths)
+
+
+async def test_in_flight_count_recovers_after_error() -> None:
+    """A request that raises is no longer counted, so the next one is admitted."""
+    release, entered = asyncio.Event(), asyncio.Event()
+    release.set()
+    app = _app(release, entered)
+    async with _client(app) as client:
+        with pytest.raises(RuntimeError):
+            await client.post("/fail")
+        assert app.in_flight == 0
+        response = await client.post("/scan")
+
+    assert response.status_code == 200
+    assert app.in_flight == 0
@@ -0,0 +1,101 @@
+"""In-flight image memory budget."""
+import asyncio
+
+import pytest
+
+from app.core.exceptions import ServiceUnavailableError
+from app.services.memory_budget import ImageMemoryBudget, scan_footprint_bytes
+
+MB = 1024 * 1024
+
+
+async def _hold(budget: ImageMemoryBudget, nbytes: int, release: asyncio.Event) -> None:
+    async with budget.reserve(nbytes):
+        await release.wait()
+
+
+def test_footprint_counts_base64_copies() -> None:
+    """A scan holds the image, its base64 string and the JSON request body."""
+    assert scan_footprint_bytes(3 * MB) == 3 * MB + 2 * 4 * MB
+
+
+async def test_scans_wait_in_order_for_room() -> None:
+    """Scans that do not fit wait, first come first served, until room is freed."""
+    budget = ImageMemoryBudget(max_bytes=10 * MB, wait_seconds=5, retry_after_seconds=5)
+    admitted: list[str] = []
+    release_first = asyncio.Event()
+
+    async def scan(name: str, nbytes: int, release: asyncio.Event | None = None) -> None:
+        async with budget.reserve(nbytes):
+            admitted.append(name)
+            if release is not None:
+                await release.wait()
+
+    first = asyncio.create_task(scan("first", 8 * MB, release_first))
+    await asyncio.sleep(0)
+    # "large" does not fit; "small" would, but must not overtake it
+    queued = [asyncio.create_task(scan("large", 6 * MB)), asyncio.create_task(scan("small", MB))]
+    await asyncio.sleep(0.01)
+    assert admitted == ["first"]
+    assert budget.reserved == 8 * MB
+
+    release_first.set()
+    await asyncio.gather(first, *queued)
+
+    assert admitted == ["first", "large", "small"]
+    assert budget.reserved == 0
+
+
+async def test_scan_is_rejected_when_no_room_in_time() -> None:
+    """A scan still queued after the wait limit gets a 503 with Retry-After."""
+    budget = ImageMemoryBudget(max_bytes=10 * MB, wait_seconds=0.01, retry_after_seconds=7)
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(budget, 10 * MB, release))
+    await asyncio.sleep(0)
+
+    with pytest.raises(ServiceUnavailableError) as exc_info:
+        async with budget.reserve(MB):
+            pass
+    release.set()
+    await holder
+
+    assert exc_info.value.retry_after == 7
+    assert budget.reserved == 0
+    assert not budget._waiters
+
+
+async def test_image_larger_than_budget_runs_alone() -> None:
+    """An image over the whole budget is admitted once nothing else is in flight."""
+    budget = ImageMemoryBudget(max_bytes=10 * MB, wait_seconds=1, retry_after_seconds=5)
+
+    async with budget.reserve(50 * MB):
+        assert budget.reserved == 10 * MB
+    assert budget.reserved == 0
+
+
+async def test_cancelled_waiter_leaves_the_queue() -> None:
+    """Cancelling a queued scan (client disconnect) frees its place."""
+    budget = ImageMemoryBudget(max_bytes=10 * MB, wait_seconds=5, retry_after_seconds=5)
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(budget, 10 * MB, release))
+    await asyncio.sleep(0)
+
+    waiting = asyncio.create_task(_hold(budget, MB, release))
+    await asyncio.sleep(0.01)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert not budget._waiters
+
+    release.set()
+    await holder
+    assert budget.reserved == 0
+
+
+async def test_nested_reservation_is_free() -> None:
+    """A scan whose caller already reserved (``/scan``) does not reserve twice."""
+    budget = ImageMemoryBudget(max_bytes=10 * MB, wait_seconds=0.01, retry_after_seconds=5)
+
+    async with budget.reserve(8 * MB):
+        async with budget.reserve(8 * MB):
+            assert budget.reserved == 8 * MB
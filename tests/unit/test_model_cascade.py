@@ -0,0 +1,81 @@
+"""Cascading model routing: fast model first, large model on doubtful answers."""
+import json
+from typing import Any
+
+import anthropic
+import pytest
+
+from app.services import claude_vision
+from app.services.claude_vision import ClaudeVisionService, escalation_reason, model_routing
+from tests.fakes.anthropic_batches import SAMPLE_EXTRACTION
+from tests.fakes.messages import FakeMessages
+
+FAST_MODEL = "claude-fast"
+LARGE_MODEL = "claude-large"
+
+LOW_CONFIDENCE = {**SAMPLE_EXTRACTION, "confidence": {"patient": 0.9, "doctor": 0.4, "tests": 0.9}}
+
+
+def _service(fake: FakeMessages, replies: dict[str, str | int]) -> ClaudeVisionService:
+    fake.reset(replies)
+    service = ClaudeVisionService("cascade")
+    service.model = LARGE_MODEL
+    service.fast_model = FAST_MODEL
+    service.client = anthropic.Anthropic(api_key="test", base_url=fake.base_url, max_retries=0)
+    return service
+
+
+@pytest.mark.parametrize(
+    ("extracted_data", "reason"),
+    [
+        (SAMPLE_EXTRACTION, None),
+        ({"error": "Not a pathology referral"}, "not_referral"),
+        (
+            {**SAMPLE_EXTRACTION, "patient": {"firstName": "JOHN", "lastName": None}},
+            "missing_fields",
+        ),
+        ({**SAMPLE_EXTRACTION, "tests": []}, "missing_fields"),
+        (LOW_CONFIDENCE, "low_confidence"),
+        ({k: v for k, v in SAMPLE_EXTRACTION.items() if k != "confidence"}, "low_confidence"),
+    ],
+)
+def test_escalation_reason(extracted_data: dict[str, Any], reason: str | None) -> None:
+    """Doubtful extractions name the reason they need the large model."""
+    assert escalation_reason(extracted_data) == reason
+
+
+def test_organization_routing_wins_over_route(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Organization overrides beat route overrides, which beat the default."""
+    settings = claude_vision.settings
+    monkeypatch.setattr(settings, "anthropic_model_routing", "direct")
+    monkeypatch.setattr(settings, "anthropic_model_routing_routes", {"scan-worker": "cascade"})
+    monkeypatch.setattr(settings, "anthropic_model_routing_organizations", {"org-vip": "direct"})
+
+    assert model_routing("/api/v1/referral/scan", "org-1") == "direct"
+    assert model_routing("scan-worker", "org-1") == "cascade"
+    assert model_routing("scan-worker", "org-vip") == "direct"
+
+
+async def test_confident_fast_answer_is_kept(fake_messages: FakeMessages) -> None:
+    """The large model is not called when the fast model's answer holds up."""
+    service = _service(fake_messages, {FAST_MODEL: json.dumps(SAMPLE_EXTRACTION)})
+
+    assert await service.extract_referral_data(b"image") == SAMPLE_EXTRACTION
+    assert fake_messages.models == [FAST_MODEL]
+
+
+@pytest.mark.parametrize(
+    "fast_reply",
+    [json.dumps(LOW_CONFIDENCE), "The referral shows a full blood count", 529],
+    ids=["low_confidence", "parse_error", "fast_model_error"],
+)
+async def test_doubtful_fast_answer_is_escalated(
+    fake_messages: FakeMessages, fast_reply: str | int
+) -> None:
+    """Low confidence, unparseable replies and failed calls go to the large model."""
+    large_answer = {**SAMPLE_EXTRACTION, "tests": ["FBC", "LFT", "TFT"]}
+    replies = {FAST_MODEL: fast_reply, LARGE_MODEL: json.dumps(large_answer)}
+    service = _service(fake_messages, replies)
+
+    assert await service.extract_referral_data(b"image") == large_answer
+    assert fake_messages.models == [FAST_MODEL, LARGE_MODEL]
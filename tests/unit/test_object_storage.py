@@ -0,0 +1,99 @@
+"""Object storage reads against a moto-mocked S3 bucket."""
+import asyncio
+from collections.abc import Iterator
+from typing import Any
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from app.core.exceptions import NotFoundError, ServiceUnavailableError, ValidationError
+from app.services import object_storage
+from app.services.memory_budget import ImageMemoryBudget, scan_footprint_bytes
+from app.services.object_storage import ObjectStorage
+
+BUCKET = "referral-uploads"
+REGION = "us-east-1"
+
+
+@pytest.fixture
+def s3(monkeypatch: pytest.MonkeyPatch) -> Iterator[Any]:
+    """Mocked S3 with an empty scan bucket.
+
+    Yields:
+        boto3 S3 client for seeding objects
+    """
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        client = boto3.client("s3", region_name=REGION)
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+@pytest.fixture
+def storage(s3: Any) -> ObjectStorage:
+    """Object storage for the mocked scan bucket."""
+    return ObjectStorage(bucket=BUCKET, region=REGION)
+
+
+async def test_read_returns_bytes_and_content_type(s3: Any, storage: ObjectStorage) -> None:
+    """Objects are read with their stored content type."""
+    s3.put_object(Bucket=BUCKET, Key="org-1/a.bin", Body=b"\x89PNG", ContentType="image/png")
+
+    async with storage.open("org-1/a.bin", max_bytes=1024) as stored:
+        assert stored.key == "org-1/a.bin"
+        assert stored.data == b"\x89PNG"
+        assert stored.content_type == "image/png"
+
+
+async def test_read_guesses_content_type_from_key(s3: Any, storage: ObjectStorage) -> None:
+    """Objects uploaded without an image type fall back to the key's extension."""
+    s3.put_object(Bucket=BUCKET, Key="org-1/scan.jpg", Body=b"jpeg")
+
+    async with storage.open("org-1/scan.jpg", max_bytes=1024) as stored:
+        assert stored.content_type == "image/jpeg"
+
+
+async def test_read_rejects_oversized_object(s3: Any, storage: ObjectStorage) -> None:
+    """Objects over the size limit are rejected."""
+    s3.put_object(Bucket=BUCKET, Key="org-1/big.png", Body=b"x" * 2048)
+
+    with pytest.raises(ValidationError, match="too large"):
+        async with storage.open("org-1/big.png", max_bytes=1024):
+            pass
+
+
+async def test_read_missing_object(storage: ObjectStorage) -> None:
+    """Missing objects raise NotFoundError."""
+    with pytest.raises(NotFoundError):
+        async with storage.open("org-1/missing.png", max_bytes=1024):
+            pass
+
+
+async def test_open_holds_image_memory_for_the_block(
+    s3: Any, storage: ObjectStorage, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The object's footprint is reserved from its declared length until the block exits."""
+    footprint = scan_footprint_bytes(1000)
+    budget = ImageMemoryBudget(max_bytes=footprint, wait_seconds=0.01, retry_after_seconds=1)
+    monkeypatch.setattr(object_storage, "image_memory", budget)
+    s3.put_object(Bucket=BUCKET, Key="org-1/a.png", Body=b"x" * 1000)
+    opened, release = asyncio.Event(), asyncio.Event()
+
+    async def hold() -> None:
+        async with storage.open("org-1/a.png", max_bytes=1024):
+            opened.set()
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await opened.wait()
+    assert budget.reserved == footprint
+    # No room for a second object while the first is held
+    with pytest.raises(ServiceUnavailableError):
+        async with storage.open("org-1/a.png", max_bytes=1024):
+            pass
+
+    release.set()
+    await holder
+    assert budget.reserved == 0
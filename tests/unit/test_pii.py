@@ -0,0 +1,98 @@
+"""PII masking of log events and logged dictionaries."""
+from typing import Any
+
+import pytest
+
+from app.core.pii import MASK, sanitize_for_logging, scrub_event
+
+
+@pytest.mark.parametrize(
+    ("text", "masked"),
+    [
+        ("medicare 2123 45670 1 on file", f"medicare {MASK} on file"),
+        ("medicare 2123456701/1", f"medicare {MASK}"),
+        ("call 0412 345 678", f"call {MASK}"),
+        ("call +61 2 9000 0000 today", f"call {MASK} today"),
+        ("mail jane.citizen@example.com", f"mail {MASK}"),
+    ],
+    ids=["medicare", "medicare_irn", "mobile", "landline_intl", "email"],
+)
+def test_value_patterns_are_masked(text: str, masked: str) -> None:
+    """Medicare numbers, phone numbers and emails are masked inside free text."""
+    assert scrub_event({"detail": text})["detail"] == masked
+
+
+def test_event_message_and_path_are_scrubbed() -> None:
+    """Messages and paths can interpolate PHI; only fixed fields are skipped."""
+    event = scrub_event(
+        {
+            "event": "Lookup failed for jane@example.com",
+            "path": "/patients/2123456701",
+            "request_id": "jane@example.com",
+            "level": "info",
+            "logger": "app.api",
+            "timestamp": "2026-01-01T00:00:00.000000000Z",
+        }
+    )
+
+    assert event["event"] == f"Lookup failed for {MASK}"
+    assert event["path"] == f"/patients/{MASK}"
+    assert event["request_id"] == MASK
+    assert event["level"] == "info"
+    assert event["timestamp"] == "2026-01-01T00:00:00.000000000Z"
+
+
+def test_pii_keys_are_masked_in_nested_containers() -> None:
+    """PII keys are masked at any depth, in dicts and lists alike."""
+    event = scrub_event(
+        {
+            "medicare_number": "2123456701",
+            "extraction": {
+                "patient": {"firstName": "JANE", "dateOfBirth": "1970-01-01"},
+                "tests": ["FBC", "call 0412345678"],
+            },
+            "contacts": [{"email": "a@example.com"}, ("ok", "b@example.com")],
+        }
+    )
+
+    assert event["medicare_number"] == MASK
+    assert event["extraction"] == {
+        "patient": {"firstName": "JANE", "dateOfBirth": MASK},
+        "tests": ["FBC", f"call {MASK}"],
+    }
+    assert event["contacts"] == [{"email": MASK}, ["ok", MASK]]
+
+
+def test_no_phi_event_is_left_untouched() -> None:
+    """Events without PII keep every value, including short digit strings."""
+    fields: dict[str, Any] = {
+        "event": "Scan completed",
+        "path": "/api/v1/referral/scan",
+        "status_code": 200,
+        "duration_ms": 1234.5,
+        "image_size": 123456789,
+        "organization_id": "org-1",
+        "phases": {"claude": 1.2, "tests": ["FBC"]},
+    }
+    event = dict(fields)
+
+    assert scrub_event(event) is event
+    assert event == fields
+
+
+def test_sanitize_for_logging_masks_partially_without_mutating() -> None:
+    """Logged dictionaries get partial masks and the input is not modified."""
+    data = {
+        "patient": {"medicareNumber": "2123456701", "email": "jane@example.com"},
+        "notes": ["ring 0412 345 678"],
+        "password": "hunter2",
+    }
+
+    sanitized = sanitize_for_logging(data)
+
+    assert sanitized == {
+        "patient": {"medicareNumber": "2***1", "email": "j***e@example.com"},
+        "notes": ["ring ***5678"],
+        "password": MASK,
+    }
+    assert data["patient"]["medicareNumber"] == "2123456701"  # type: ignore[index]
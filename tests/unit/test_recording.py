@@ -0,0 +1,130 @@
+"""Record/replay of Claude and catalog responses."""
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+from anthropic.types import Message
+from cryptography.fernet import Fernet
+
+from app.core.exceptions import NotFoundError
+from app.services.claude_vision import parse_extraction_response
+from app.services.recording import RecordingTransport, UpstreamRecorder
+from tests.fakes.anthropic_batches import SAMPLE_EXTRACTION
+
+PARAMS = {"model": "claude-sonnet-4-5-20250929", "max_tokens": 2048, "messages": []}
+
+EXTRACTION = {
+    **SAMPLE_EXTRACTION,
+    "patient": {"firstName": "JOHN", "lastName": "SMITH", "medicareNumber": "2123456701"},
+}
+
+
+COMPACT_TEXT = json.dumps(
+    {"p": {"fn": "JOHN", "ln": "SMITH", "mc": "2123456701"}, "t": ["FBC"], "cn": "Fatigue"},
+    separators=(",", ":"),
+)
+
+
+def _message(text: str = f"```json\n{json.dumps(EXTRACTION)}\n```") -> Message:
+    return Message.model_validate(
+        {
+            "id": "msg_1",
+            "type": "message",
+            "role": "assistant",
+            "model": PARAMS["model"],
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": 1500, "output_tokens": 300},
+        }
+    )
+
+
+def _recorded_files(directory: Path) -> str:
+    return "".join(path.read_text() for path in directory.rglob("*.json"))
+
+
+def test_claude_replay_uses_synthetic_pii(tmp_path: Path) -> None:
+    """Unencrypted recordings hold no extracted PII but keep the tests."""
+    UpstreamRecorder("record", tmp_path).create_message(PARAMS, _message)
+
+    assert "SMITH" not in _recorded_files(tmp_path)
+    assert "2123456701" not in _recorded_files(tmp_path)
+
+    def unexpected() -> Message:
+        raise AssertionError("replay must not call Claude")
+
+    replayed = UpstreamRecorder("replay", tmp_path, time_scale=0).create_message(PARAMS, unexpected)
+    text = replayed.content[0].text  # type: ignore[union-attr]
+    assert text.startswith("```json\n")
+    extraction = parse_extraction_response(text)
+    assert extraction["patient"]["lastName"] == "CITIZEN"
+    assert extraction["tests"] == EXTRACTION["tests"]
+    assert replayed.usage.input_tokens == 1500
+
+
+def test_compact_reply_is_recorded_compact(tmp_path: Path) -> None:
+    """Synthetic values replace the PII of a compact reply without expanding it."""
+    UpstreamRecorder("record", tmp_path).create_message(PARAMS, lambda: _message(COMPACT_TEXT))
+
+    replayed = UpstreamRecorder("replay", tmp_path, time_scale=0).create_message(
+        PARAMS, lambda: _message()
+    )
+    text = replayed.content[0].text  # type: ignore[union-attr]
+    assert json.loads(text) == {
+        "p": {"fn": "JANE", "ln": "CITIZEN", "mc": "0000000000"},
+        "t": ["FBC"],
+        "cn": "[SYNTHETIC]",
+    }
+    assert parse_extraction_response(text, "compact")["patient"]["lastName"] == "CITIZEN"
+
+
+def test_claude_replay_encrypted_is_exact(tmp_path: Path) -> None:
+    """Encrypted recordings replay the original response."""
+    key = Fernet.generate_key().decode()
+    original = UpstreamRecorder("record", tmp_path, encryption_key=key).create_message(
+        PARAMS, _message
+    )
+
+    assert "SMITH" not in _recorded_files(tmp_path)
+    replayed = UpstreamRecorder(
+        "replay", tmp_path, encryption_key=key, time_scale=0
+    ).create_message(PARAMS, _message)
+    assert replayed == original
+
+
+def test_replay_of_unrecorded_request_fails(tmp_path: Path) -> None:
+    """Replay never falls through to the real upstream."""
+    with pytest.raises(NotFoundError):
+        UpstreamRecorder("replay", tmp_path).create_message(PARAMS, _message)
+
+
+async def test_catalog_replay(tmp_path: Path) -> None:
+    """Catalog responses are replayed by method, path, query, organization and body."""
+    calls = []
+
+    def catalog(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json={"tests": [{"code": request.url.params["q"]}]})
+
+    live = RecordingTransport(
+        UpstreamRecorder("record", tmp_path), transport=httpx.MockTransport(catalog)
+    )
+    replay = RecordingTransport(
+        UpstreamRecorder("replay", tmp_path, time_scale=0),
+        transport=httpx.MockTransport(catalog),
+    )
+    headers = {"X-Organization-Code": "org-1"}
+
+    async with httpx.AsyncClient(transport=live, base_url="http://catalog") as client:
+        await client.get("/api/v1/tests", params={"q": "FBC"}, headers=headers)
+    async with httpx.AsyncClient(transport=replay, base_url="http://catalog-2") as client:
+        response = await client.get("/api/v1/tests", params={"q": "FBC"}, headers=headers)
+        assert response.json() == {"tests": [{"code": "FBC"}]}
+        with pytest.raises(NotFoundError):
+            await client.get(
+                "/api/v1/tests", params={"q": "FBC"}, headers={"X-Organization-Code": "org-2"}
+            )
+
+    assert len(calls) == 1
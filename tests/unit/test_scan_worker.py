@@ -0,0 +1,177 @@
+"""SQS scan worker against moto-mocked queues."""
+import asyncio
+import json
+from collections.abc import Iterator
+from typing import Any
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from app.core.exceptions import ServiceUnavailableError, ValidationError
+from app.schemas.referral import ReferralData, ScanJobRequest
+from app.services.referral_scanner import build_referral_data
+from app.services.scan_worker import ScanWorker
+
+REGION = "us-east-1"
+
+
+@pytest.fixture
+def sqs(monkeypatch: pytest.MonkeyPatch) -> Iterator[Any]:
+    """Mocked SQS.
+
+    Yields:
+        boto3 SQS client
+    """
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        yield boto3.client("sqs", region_name=REGION)
+
+
+@pytest.fixture
+def queues(sqs: Any) -> tuple[str, str]:
+    """Input and output queue URLs."""
+    return (
+        sqs.create_queue(QueueName="scan-requests")["QueueUrl"],
+        sqs.create_queue(QueueName="scan-results")["QueueUrl"],
+    )
+
+
+async def process(request: ScanJobRequest) -> ReferralData:
+    """Scan stand-in: ``bad`` keys are rejected, ``flaky`` keys fail."""
+    await asyncio.sleep(0.05)
+    if "bad" in request.object_key:
+        raise ValidationError("Not a pathology referral")
+    if "flaky" in request.object_key:
+        raise RuntimeError("Claude API error")
+    return build_referral_data({"tests": ["FBC"]}, [])
+
+
+def _worker(queues: tuple[str, str], **kwargs: Any) -> ScanWorker:
+    return ScanWorker(
+        input_queue_url=queues[0],
+        output_queue_url=queues[1],
+        process=process,
+        wait_time_seconds=0,
+        region=REGION,
+        **kwargs,
+    )
+
+
+def _send(sqs: Any, queue_url: str, *bodies: str) -> None:
+    for body in bodies:
+        sqs.send_message(QueueUrl=queue_url, MessageBody=body)
+
+
+def _request(key: str) -> str:
+    return json.dumps({"objectKey": key, "organizationId": "org-1", "requestId": key})
+
+
+async def _results(sqs: Any, queue_url: str, count: int) -> list[dict[str, Any]]:
+    """Wait for ``count`` results on the output queue."""
+    results: list[dict[str, Any]] = []
+    for _ in range(200):
+        response = await asyncio.to_thread(
+            sqs.receive_message, QueueUrl=queue_url, MaxNumberOfMessages=10
+        )
+        results += [json.loads(message["Body"]) for message in response.get("Messages", [])]
+        if len(results) >= count:
+            return results
+        await asyncio.sleep(0.05)
+    raise AssertionError(f"got {len(results)} of {count} results")
+
+
+def _remaining(sqs: Any, queue_url: str) -> int:
+    attributes = sqs.get_queue_attributes(
+        QueueUrl=queue_url,
+        AttributeNames=["ApproximateNumberOfMessages", "ApproximateNumberOfMessagesNotVisible"],
+    )["Attributes"]
+    return sum(int(value) for value in attributes.values())
+
+
+async def test_worker_publishes_results_and_deletes(sqs: Any, queues: tuple[str, str]) -> None:
+    """Results are published for every request and the requests deleted."""
+    _send(
+        sqs,
+        queues[0],
+        _request("org-1/a.png"),
+        _request("org-1/b.png"),
+        _request("org-1/bad.png"),
+        "not json",
+    )
+    worker = _worker(queues)
+    run = asyncio.create_task(worker.run())
+
+    results = await _results(sqs, queues[1], 4)
+    worker.stop()
+    await run
+
+    statuses = sorted((r.get("requestId") or "", r["status"]) for r in results)
+    assert statuses == [
+        ("", "rejected"),
+        ("org-1/a.png", "succeeded"),
+        ("org-1/b.png", "succeeded"),
+        ("org-1/bad.png", "rejected"),
+    ]
+    succeeded = next(r for r in results if r["status"] == "succeeded")
+    assert succeeded["data"]["tests"] == ["FBC"]
+    assert succeeded["organizationId"] == "org-1"
+    assert _remaining(sqs, queues[0]) == 0
+
+
+async def test_transient_failure_fails_after_max_attempts(
+    sqs: Any, queues: tuple[str, str]
+) -> None:
+    """Failing requests are retried, then get a ``failed`` result."""
+    _send(sqs, queues[0], _request("org-1/flaky.png"))
+    worker = _worker(queues, max_attempts=2, visibility_timeout_seconds=1)
+    run = asyncio.create_task(worker.run())
+
+    results = await _results(sqs, queues[1], 1)
+    worker.stop()
+    await run
+
+    assert results[0]["status"] == "failed"
+    assert results[0]["error"] == "Claude API error"
+    assert _remaining(sqs, queues[0]) == 0
+
+
+async def test_shed_scan_is_deferred_not_failed(sqs: Any, queues: tuple[str, str]) -> None:
+    """A scan shed by the memory budget is redelivered without using up its attempts."""
+    shed: list[str] = []
+
+    async def busy_process(request: ScanJobRequest) -> ReferralData:
+        if len(shed) < 2:
+            shed.append(request.object_key)
+            raise ServiceUnavailableError("Too many large images in flight", retry_after=0)
+        return await process(request)
+
+    _send(sqs, queues[0], _request("org-1/large.png"))
+    worker = _worker(queues, max_attempts=1)
+    worker.process = busy_process
+    run = asyncio.create_task(worker.run())
+
+    results = await _results(sqs, queues[1], 1)
+    worker.stop()
+    await run
+
+    assert shed == ["org-1/large.png", "org-1/large.png"]
+    assert results[0]["status"] == "succeeded"
+    assert _remaining(sqs, queues[0]) == 0
+
+
+async def test_stop_drains_in_flight_scans(sqs: Any, queues: tuple[str, str]) -> None:
+    """Scans in flight when the worker stops still finish and are deleted."""
+    _send(sqs, queues[0], *(_request(f"org-1/{i}.png") for i in range(3)))
+    worker = _worker(queues)
+    run = asyncio.create_task(worker.run())
+    while not worker._in_flight:
+        await asyncio.sleep(0.005)
+
+    worker.stop()
+    await run
+
+    results = await _results(sqs, queues[1], 3)
+    assert {r["status"] for r in results} == {"succeeded"}
+    assert _remaining(sqs, queues[0]) == 0
@@ -0,0 +1,54 @@
+"""Response and log serialization."""
+from datetime import UTC, datetime
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core import serialization
+from app.core.serialization import FastJSONResponse
+from app.schemas.referral import (
+    ConfidenceScores,
+    DoctorInfo,
+    MatchedTest,
+    PatientInfo,
+    ReferralData,
+    ScanResponse,
+)
+
+
+def _scan_response(confidence: float) -> ScanResponse:
+    return ScanResponse(
+        data=ReferralData(
+            patient=PatientInfo(firstName="JANE", lastName="CITIZEN", sex="F"),
+            doctor=DoctorInfo(name="Dr. Müller"),
+            tests=["FBC", "Vit B12"],
+            matched_tests=[
+                MatchedTest(
+                    original="FBC", matched="Full Blood Count", test_id="t-1", confidence=1.0
+                ),
+                MatchedTest(original="B12", matched="Vitamin B12", test_id="t-2", confidence=1e-7),
+            ],
+            confidence=ConfidenceScores(
+                patient=confidence, doctor=0.00001, tests=0.9, overall=2 / 3
+            ),
+        ),
+        processingTimeMs=1234,
+        timestamp=datetime(2026, 1, 1, 9, 30, 15, 123456, tzinfo=UTC),
+    )
+
+
+@pytest.mark.parametrize("backend", ["orjson", "json"])
+@pytest.mark.parametrize("confidence", [0.92, 1e-7, 0.0, 1.0])
+def test_model_body_matches_fastapi(
+    backend: str, confidence: float, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A response model renders to the same bytes as FastAPI's default response."""
+    if backend == "json":
+        monkeypatch.setattr(serialization, "orjson", None)
+    response = _scan_response(confidence)
+
+    expected = JSONResponse(jsonable_encoder(response, by_alias=True)).body
+
+    assert FastJSONResponse(response).body == expected
+    assert FastJSONResponse(jsonable_encoder(response, by_alias=True)).body == expected
@@ -0,0 +1,148 @@
+"""Tracing: server spans, child spans of upstream calls and trace context propagation."""
+import json
+from collections.abc import Iterator
+from typing import Any
+
+import anthropic
+import httpx
+import pytest
+from fastapi import FastAPI
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import SpanKind
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.core.tracing import setup_tracing
+from app.middleware.tracing import TracingMiddleware, fastapi_telemetry_options
+from app.services import test_matcher
+from app.services.claude_vision import ClaudeVisionService
+from app.services.oauth_client import OAuthClient
+from tests.fakes import serve
+from tests.fakes.anthropic_batches import SAMPLE_EXTRACTION
+from tests.fakes.messages import FakeMessages
+
+MODEL = "claude-large"
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_SPAN_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture(scope="module")
+def spans() -> InMemorySpanExporter:
+    """In-memory exporter behind the global tracer provider (sampling everything).
+
+    Returns:
+        Span exporter
+    """
+    exporter = InMemorySpanExporter()
+    setup_tracing("ai-referral-service", "test", sample_rate=1.0, exporter=exporter)
+    return exporter
+
+
+@pytest.fixture(scope="module")
+def catalog() -> Iterator[tuple[str, list[dict[str, str]]]]:
+    """Running fake catalog and OAuth token endpoint recording request headers.
+
+    Yields:
+        Base URL and the headers of each request received
+    """
+    received: list[dict[str, str]] = []
+
+    async def match(request: Request) -> JSONResponse:
+        received.append(dict(request.headers))
+        names = (await request.json())["testNames"]
+        return JSONResponse({"matches": [{"query": name, "matched": False} for name in names]})
+
+    async def token(request: Request) -> JSONResponse:
+        received.append(dict(request.headers))
+        return JSONResponse({"access_token": "token", "expires_in": 3600})
+
+    app = Starlette(
+        routes=[
+            Route("/api/v1/tests/match", match, methods=["POST"]),
+            Route("/oauth/token", token, methods=["POST"]),
+        ]
+    )
+    for base_url in serve(app):
+        yield base_url, received
+
+
+def _app(fake: FakeMessages, catalog_url: str) -> FastAPI:
+    app = FastAPI(**fastapi_telemetry_options())
+
+    @app.post("/referrals/{organization_id}/scan")
+    async def scan(organization_id: str) -> dict[str, Any]:
+        vision = ClaudeVisionService("direct")
+        vision.model = MODEL
+        vision.client = anthropic.Anthropic(api_key="test", base_url=fake.base_url, max_retries=0)
+        extracted = await vision.extract_referral_data(b"image")
+
+        matcher = test_matcher.TestMatcherService(organization_id=organization_id)
+        matcher.catalog_url = catalog_url
+        matcher.oauth_client = OAuthClient()
+        matcher.oauth_client.enabled = True
+        matcher.oauth_client.token_url = f"{catalog_url}/oauth/token"
+        return {"matched": len(await matcher.match_tests(extracted["tests"]))}
+
+    app.add_middleware(TracingMiddleware)
+    return app
+
+
+def _by_name(finished: tuple[ReadableSpan, ...]) -> dict[str, ReadableSpan]:
+    return {span.name: span for span in finished}
+
+
+async def test_request_spans_and_outbound_trace_context(
+    spans: InMemorySpanExporter,
+    fake_messages: FakeMessages,
+    catalog: tuple[str, list[dict[str, str]]],
+) -> None:
+    """The request joins the caller's trace and every upstream call is a child span."""
+    catalog_url, received = catalog
+    received.clear()
+    spans.clear()
+    fake_messages.reset({MODEL: json.dumps(SAMPLE_EXTRACTION)})
+    app = _app(fake_messages, catalog_url)
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.post(
+            "/referrals/org-1/scan",
+            headers={"traceparent": f"00-{TRACE_ID}-{PARENT_SPAN_ID}-01"},
+        )
+    assert response.status_code == 200
+
+    finished = _by_name(spans.get_finished_spans())
+    server = finished["POST /referrals/{organization_id}/scan"]
+    # The middleware's span is the only server span (FastAPI's own is disabled)
+    assert [s for s in spans.get_finished_spans() if s.kind == SpanKind.SERVER] == [server]
+    assert server.parent is not None
+    assert format(server.parent.span_id, "016x") == PARENT_SPAN_ID
+    assert dict(server.attributes or {}) == {
+        "http.request.method": "POST",
+        "url.path": "/referrals/org-1/scan",
+        "request_id": "",
+        "http.response.status_code": 200,
+        "http.route": "/referrals/{organization_id}/scan",
+    }
+
+    extract = finished["claude.extract_referral_data"]
+    claude_call = finished["claude.messages.create"]
+    match_tests = finished["catalog.match_tests"]
+    token = finished["oauth.fetch_token"]
+    assert {format(span.context.trace_id, "032x") for span in finished.values()} == {TRACE_ID}
+    assert extract.parent is not None and extract.parent.span_id == server.context.span_id
+    assert claude_call.kind == SpanKind.CLIENT
+    assert claude_call.parent is not None
+    assert claude_call.parent.span_id == extract.context.span_id
+    assert match_tests.parent is not None and match_tests.parent.span_id == server.context.span_id
+    assert token.parent is not None and token.parent.span_id == match_tests.context.span_id
+
+    # Outbound httpx calls carry the context of the span they were made in
+    token_headers, match_headers = received
+    assert token_headers["traceparent"] == f"00-{TRACE_ID}-{token.context.span_id:016x}-01"
+    assert match_headers["traceparent"] == f"00-{TRACE_ID}-{match_tests.context.span_id:016x}-01"